@@ -0,0 +1,49 @@
+"""
+Per-request cost of admission control on an /api/ view, enabled vs disabled.
+
+    SECRET_KEY=bench python -m benchmarks.bench_admission
+"""
+
+from benchmarks.common import bench, setup_django
+
+
+def main():
+    setup_django(migrate=True)
+
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    from myauthservice.handlers import ProfiledWSGIHandler
+    from oauth2.admission import admission_controller
+
+    handler = ProfiledWSGIHandler()
+    factory = RequestFactory()
+    base = settings.OAUTH2
+
+    print("acquire() + release()")
+    bench(
+        "  controller",
+        lambda: admission_controller.release(
+            admission_controller.acquire("/api/clients/")[1], 0.001
+        ),
+        number=100_000,
+    )
+
+    # /api/version/ is exempt by default; count it here to time the full path.
+    print("GET /api/version/ through the /api/ profile")
+    for label, enabled in (("disabled", False), ("enabled", True)):
+        settings.OAUTH2 = {
+            **base,
+            "ADMISSION_ENABLED": enabled,
+            "ADMISSION_EXEMPT_PATHS": [],
+        }
+        bench(
+            f"  {label}",
+            lambda: handler.get_response(factory.get("/api/version/")),
+            number=5_000,
+        )
+    settings.OAUTH2 = base
+
+
+if __name__ == "__main__":
+    main()
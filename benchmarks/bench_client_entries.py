@@ -0,0 +1,91 @@
+"""
+Cached clients as ClientEntry records vs Client model instances.
+
+    SECRET_KEY=bench python -m benchmarks.bench_client_entries
+
+Memory is measured with tracemalloc over 10,000 loaded clients; lookups
+compare loading one client and checking a redirect URI on a loaded one.
+"""
+
+import gc
+import tracemalloc
+
+from benchmarks.common import bench, setup_django
+
+COUNT = 10_000
+
+
+def allocated_per_item(build):
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(items)
+
+
+def main():
+    setup_django(migrate=True)
+
+    from oauth2.entries import ENTRY_FIELDS, ClientEntry, group_scope_rows
+    from oauth2.models import Client, Scope
+    from oauth2.registry import ClientRegistry
+
+    scopes = [Scope.objects.create(name=f"scope:{number}") for number in range(4)]
+    clients = Client.objects.bulk_create(
+        Client(
+            client_id=f"client-{number:05d}",
+            client_type="confidential",
+            client_secret=f"secret-{number}",
+            name=f"Client {number}",
+            redirect_uris=[
+                "https://example.com/callback",
+                f"https://app{number}.example.com/oauth/callback",
+            ],
+        )
+        for number in range(COUNT)
+    )
+    Grant = Client.scopes.through
+    Grant.objects.bulk_create(
+        Grant(client_id=client.pk, scope_id=scope.pk)
+        for client in clients
+        for scope in scopes[:2]
+    )
+
+    def load_models():
+        return list(Client.objects.order_by("id"))
+
+    def load_entries():
+        rows = Client.objects.order_by("id").values(*ENTRY_FIELDS)
+        return [
+            ClientEntry.from_values(row, scope_mask)
+            for row, scope_mask in group_scope_rows(rows.iterator())
+        ]
+
+    print(f"Memory per cached client ({COUNT:,} loaded)")
+    print(f"  {'Client instance':<48} {allocated_per_item(load_models):8.0f} B")
+    print(f"  {'ClientEntry':<48} {allocated_per_item(load_entries):8.0f} B")
+
+    client_id = clients[COUNT // 2].client_id
+    registry = ClientRegistry()
+    print("Load one client")
+    bench(
+        "  Client get() + ClientEntry.from_client()",
+        lambda: ClientEntry.from_client(Client.objects.get(client_id=client_id)),
+        2_000,
+    )
+    bench("  ClientRegistry.load() (values)", lambda: registry.load(client_id), 2_000)
+
+    model = Client.objects.get(client_id=client_id)
+    entry = registry.load(client_id)
+    uri = model.redirect_uris[-1]
+    print("Redirect URI check on a loaded client")
+    bench("  Client.is_valid_redirect_uri()", lambda: model.is_valid_redirect_uri(uri))
+    bench(
+        "  ClientEntry.is_valid_redirect_uri()",
+        lambda: entry.is_valid_redirect_uri(uri),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Client listing pages: keyset cursor vs OFFSET, near the start and deep in.
+
+    SECRET_KEY=bench python -m benchmarks.bench_client_listing
+
+Lists 10 clients per page out of 100,000, so page 10,000 is the last one.
+Both sides select the same columns through ClientSerializer.
+"""
+
+from datetime import timedelta
+
+from benchmarks.common import bench, setup_django
+
+COUNT = 100_000
+LIMIT = 10
+PAGES = [1, 100, 10_000]
+
+
+def main():
+    setup_django(migrate=True)
+
+    from django.utils import timezone
+
+    from oauth2.listing import PageCursor, list_clients
+    from oauth2.models import Client
+    from oauth2.serializers import ClientSerializer
+
+    now = timezone.now()
+    Client.objects.bulk_create(
+        (
+            Client(
+                client_id=f"client-{number:06d}",
+                client_type="public",
+                name=f"Client {number}",
+                description="x" * 500,
+                redirect_uris=["https://example.com/callback"],
+                created_at=now - timedelta(seconds=number),
+            )
+            for number in range(COUNT)
+        ),
+        batch_size=5_000,
+    )
+    keys = list(
+        Client.objects.order_by("-created_at", "-id").values_list("created_at", "id")
+    )
+
+    fields = ["client_id", "name", "client_type", "is_active", "created_at"]
+    serializer = ClientSerializer(fields)
+    ordered = Client.objects.order_by("-created_at", "-id")
+    for page in PAGES:
+        start = (page - 1) * LIMIT
+        cursor = PageCursor(*keys[start - 1]) if start else None
+        print(f"Page {page:,}")
+        bench(
+            "  OFFSET",
+            lambda: serializer.serialize(
+                ordered.values(*serializer.columns)[start : start + LIMIT]
+            ),
+            200,
+        )
+        bench(
+            "  keyset cursor (list_clients)",
+            lambda: list_clients(cursor, limit=LIMIT, fields=fields),
+            200,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-request cost of a connect/query/close cycle with and without the pool.
+
+    SECRET_KEY=bench python -m benchmarks.bench_db_pool
+
+Uses a SQLite file, where opening a connection is cheap; against MySQL the
+connect-per-request cost also includes the TCP and authentication handshake.
+"""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import bench, setup_django
+
+
+def main():
+    setup_django()
+
+    from django.db.utils import ConnectionHandler
+
+    from myauthservice.db.pool import close_pools
+
+    with tempfile.TemporaryDirectory() as directory:
+        name = str(Path(directory) / "bench.sqlite3")
+        handler = ConnectionHandler(
+            {
+                "default": {},
+                "unpooled": {
+                    "ENGINE": "myauthservice.db.backends.sqlite3",
+                    "NAME": name,
+                },
+                "pooled": {
+                    "ENGINE": "myauthservice.db.backends.sqlite3",
+                    "NAME": name,
+                    "POOL": {"SIZE": 4},
+                },
+            }
+        )
+
+        def request(alias):
+            connection = handler[alias]
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close()
+
+        bench(
+            "connect per request (CONN_MAX_AGE=0)", lambda: request("unpooled"), 5_000
+        )
+        bench("pooled (POOL SIZE=4)", lambda: request("pooled"), 5_000)
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
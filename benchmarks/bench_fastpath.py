@@ -0,0 +1,51 @@
+"""
+Per-request cost of /api/health/ through Django vs the WSGI fast path.
+
+    SECRET_KEY=bench python -m benchmarks.bench_fastpath
+"""
+
+import io
+
+from benchmarks.common import bench, setup_django
+
+
+def main():
+    setup_django()
+
+    from django.core.wsgi import get_wsgi_application
+
+    from myauthservice.fastpath import FastPathWSGI
+
+    django_app = get_wsgi_application()
+    fast_app = FastPathWSGI(django_app)
+
+    def environ(path):
+        return {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+        }
+
+    def start_response(status, headers):
+        pass
+
+    def request(app, path):
+        response = app(environ(path), start_response)
+        b"".join(response)
+        close = getattr(response, "close", None)
+        if close is not None:
+            close()
+
+    for path in ("/api/health/", "/api/version/"):
+        print(f"GET {path}")
+        bench(
+            "  django: middleware + DRF view", lambda: request(django_app, path), 5_000
+        )
+        bench("  fast path: pre-encoded bytes", lambda: request(fast_app, path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Per-request cost of an /api/ view under the full vs the lean middleware chain.
+
+    SECRET_KEY=bench python -m benchmarks.bench_middleware
+"""
+
+from benchmarks.common import bench, setup_django
+
+
+def main():
+    setup_django(migrate=True)
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    from myauthservice.handlers import ProfiledWSGIHandler
+
+    full = WSGIHandler()
+    profiled = ProfiledWSGIHandler()
+    factory = RequestFactory()
+
+    print(f"Full chain: {len(settings.MIDDLEWARE)} middleware")
+    print(f"/api/ profile: {len(settings.MIDDLEWARE_PROFILES['/api/'])} middleware")
+
+    # A browser that visited the admin sends its session cookie; under the
+    # full chain DRF's SessionAuthentication then loads the session from
+    # the database.
+    cases = [
+        ("GET /api/version/", {}),
+        (
+            "GET /api/version/ with a session cookie",
+            {"HTTP_COOKIE": "sessionid=" + "x" * 32},
+        ),
+    ]
+    for title, headers in cases:
+        print(title)
+        for label, handler in (("full MIDDLEWARE", full), ("/api/ profile", profiled)):
+            bench(
+                f"  {label}",
+                lambda handler=handler: handler.get_response(
+                    factory.get("/api/version/", **headers)
+                ),
+                number=5_000,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Cost of one per-client rate limit check.
+
+    SECRET_KEY=bench python -m benchmarks.bench_ratelimit
+
+The local backend is the default per-worker dict; the shared backend goes
+through a locmem cache, the local stand-in for Redis or Memcached, so it
+shows the overhead of the cache API rather than network latency.
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.common import bench, setup_django
+
+CLIENTS = 10_000
+
+
+def main():
+    setup_django()
+
+    from oauth2.entries import ClientEntry
+    from oauth2.ratelimit import CacheBuckets, LocalBuckets, RateLimiter
+
+    entry = ClientEntry("client-00001", "public", None, [], 0, rate_limit=10**9)
+
+    print("One check (allowed)")
+    local = RateLimiter(LocalBuckets())
+    bench("  local buckets, check()", lambda: local.check("client-00001", 10**9, 100))
+    bench("  local buckets, check_entry()", lambda: local.check_entry(entry))
+    shared = RateLimiter(CacheBuckets("default"))
+    bench("  locmem cache buckets, check_entry()", lambda: shared.check_entry(entry))
+
+    buckets = LocalBuckets(max_clients=CLIENTS)
+    limiter = RateLimiter(buckets)
+    client_ids = [f"client-{number:05d}" for number in range(CLIENTS)]
+    tracemalloc.start()
+    for client_id in client_ids:
+        limiter.check(client_id, 60, 10)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Local state per client ({CLIENTS:,} clients)")
+    print(f"  {'dict slot + float':<48} {size / CLIENTS:8.0f} B")
+    print(f"  {'(float alone)':<48} {sys.getsizeof(1.0):8d} B")
+
+
+if __name__ == "__main__":
+    main()
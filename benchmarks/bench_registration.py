@@ -0,0 +1,53 @@
+"""
+Client registration throughput: one client per call vs batches.
+
+    SECRET_KEY=bench python -m benchmarks.bench_registration
+
+Calls oauth2.registration directly, so HTTP parsing and rendering are left
+out; each registered client has two redirect URIs and two scopes.
+"""
+
+from benchmarks.common import bench, setup_django
+
+SCOPE = "read write"
+
+
+def metadata(number):
+    return {
+        "client_name": f"Client {number}",
+        "redirect_uris": [
+            "https://example.com/callback",
+            f"https://app{number}.example.com/oauth/callback",
+        ],
+        "scope": SCOPE,
+    }
+
+
+def main():
+    setup_django(migrate=True)
+
+    from oauth2.models import Scope
+    from oauth2.registration import register_client, register_clients
+
+    for name in SCOPE.split():
+        Scope.objects.create(name=name)
+
+    def report(label, func, size, number):
+        per_call = bench(f"  {label}", func, number, repeat=3)
+        print(f"  {'':<48} {size / per_call:10.0f} clients/s")
+
+    print("Clients registered per second")
+    item = metadata(0)
+    report("register_client()", lambda: register_client(item), 1, 500)
+    for size, number in [(100, 20), (1000, 3)]:
+        batch = [metadata(number) for number in range(size)]
+        report(
+            f"register_clients(), batch of {size}",
+            lambda: register_clients(batch),
+            size,
+            number,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Rendering clients: DRF ModelSerializer vs oauth2.serializers.ClientSerializer.
+
+    SECRET_KEY=bench python -m benchmarks.bench_serializers
+
+Both sides include their queries: the ModelSerializer prefetches scopes, the
+ClientSerializer reads ``values()`` rows plus one grants query per chunk.
+"""
+
+from benchmarks.common import bench, setup_django
+
+SIZES = [(1, 2_000), (100, 100), (10_000, 2)]
+
+
+def main():
+    setup_django(migrate=True)
+
+    from rest_framework import serializers
+
+    from oauth2.models import Client, Scope
+    from oauth2.serializers import ClientSerializer
+
+    class ClientModelSerializer(serializers.ModelSerializer):
+        scope = serializers.SerializerMethodField()
+
+        class Meta:
+            model = Client
+            fields = [
+                "client_id",
+                "client_type",
+                "name",
+                "description",
+                "redirect_uris",
+                "scope",
+                "is_active",
+                "created_at",
+                "updated_at",
+            ]
+
+        def get_scope(self, client):
+            return " ".join(scope.name for scope in client.scopes.all())
+
+    scopes = [Scope.objects.create(name=f"scope:{number}") for number in range(8)]
+    clients = Client.objects.bulk_create(
+        Client(
+            client_id=f"client-{number:05d}",
+            client_type="confidential",
+            client_secret="secret",
+            name=f"Client {number}",
+            redirect_uris=["https://example.com/callback"],
+        )
+        for number in range(max(size for size, _ in SIZES))
+    )
+    Grant = Client.scopes.through
+    Grant.objects.bulk_create(
+        Grant(client_id=client.pk, scope_id=scope.pk)
+        for number, client in enumerate(clients)
+        for scope in scopes[number % 4 : number % 4 + 3]
+    )
+
+    fast = ClientSerializer()
+    for size, number in SIZES:
+        queryset = Client.objects.order_by("id")[:size]
+        print(f"{size} client(s)")
+        bench(
+            "  ModelSerializer (prefetch scopes)",
+            lambda: ClientModelSerializer(
+                queryset.prefetch_related("scopes"), many=True
+            ).data,
+            number,
+        )
+        bench("  ClientSerializer", lambda: fast.serialize_queryset(queryset), number)
+
+
+if __name__ == "__main__":
+    main()
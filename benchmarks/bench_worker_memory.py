@@ -0,0 +1,139 @@
+"""
+Per-worker memory of forked workers: import after fork vs preload vs
+preload + gc.freeze() (PRELOAD_ENABLED=1). Linux only (reads smaps_rollup).
+
+    SECRET_KEY=bench python -m benchmarks.bench_worker_memory [--workers 4]
+
+Each worker serves a few requests and runs a full collection before its
+memory is read. USS (private pages) is what each extra worker really costs;
+PSS splits shared pages between the processes sharing them.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+
+MODES = {
+    "import per worker": {"preload": False, "PRELOAD_ENABLED": "0"},
+    "preload": {"preload": True, "PRELOAD_ENABLED": "0"},
+    "preload + freeze": {"preload": True, "PRELOAD_ENABLED": "1"},
+}
+PATHS = ["/schema/", "/admin/login/", "/api/clients/changes/", "/api/version/"]
+
+
+def read_memory():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def load_app():
+    from myauthservice.wsgi import application
+
+    return application
+
+
+def serve(application):
+    import gc
+
+    for path in PATHS:
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+        }
+        response = application(environ, lambda status, headers: None)
+        b"".join(response)
+        close = getattr(response, "close", None)
+        if close is not None:
+            close()
+    gc.collect()
+
+
+def run_master(preload, workers):
+    """Fork ``workers`` children and return their memory readings."""
+    application = load_app() if preload else None
+    readers = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                serve(application or load_app())
+                os.write(write_fd, json.dumps(read_memory()).encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        readers.append((pid, read_fd))
+
+    readings = []
+    for pid, read_fd in readers:
+        with os.fdopen(read_fd) as f:
+            readings.append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    return readings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myauthservice.settings.test")
+        readings = run_master(MODES[args.mode]["preload"], args.workers)
+        print(json.dumps(readings))
+        return
+
+    print(f"{args.workers} workers, average per worker (MiB)")
+    print(f"{'mode':<20} {'RSS':>8} {'PSS':>8} {'USS':>8}")
+    for mode, options in MODES.items():
+        env = {
+            **os.environ,
+            "PRELOAD_ENABLED": options["PRELOAD_ENABLED"],
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-only-secret-key"),
+        }
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_worker_memory",
+                "--mode",
+                mode,
+                "--workers",
+                str(args.workers),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        readings = json.loads(output.strip().splitlines()[-1])
+        averages = {
+            key: sum(reading[key] for reading in readings) / len(readings) / 1024
+            for key in ("rss", "pss", "uss")
+        }
+        print(
+            f"{mode:<20} {averages['rss']:8.1f} {averages['pss']:8.1f} "
+            f"{averages['uss']:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
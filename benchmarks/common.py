@@ -0,0 +1,38 @@
+"""
+Shared helpers for the micro-benchmarks in this directory.
+
+Benchmarks run against the test settings (in-memory SQLite) so they can be
+executed anywhere without external services:
+
+    SECRET_KEY=bench python -m benchmarks.bench_scopes
+"""
+
+import os
+import timeit
+
+
+def setup_django(migrate=False):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myauthservice.settings.test")
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key")
+
+    import django
+
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+
+
+def bench(label, func, number=100_000, repeat=5):
+    """Time ``func`` and print the best per-call cost."""
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    if best >= 1e-3:
+        cost = f"{best * 1e3:10.3f} ms"
+    elif best >= 1e-6:
+        cost = f"{best * 1e6:10.3f} us"
+    else:
+        cost = f"{best * 1e9:10.1f} ns"
+    print(f"{label:<50} {cost}/op")
+    return best
@@ -0,0 +1,13 @@
+"""
+Admin URLconf, imported on the first request routed to /admin/.
+
+The admin app is installed as SimpleAdminConfig, so the ``admin.py`` modules
+(and the forms and widgets they pull in) are only imported here rather than
+when every worker starts.
+"""
+
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,66 @@
+"""
+Database backends with optional connection pooling.
+
+Use ``myauthservice.db.backends.mysql`` or ``myauthservice.db.backends.sqlite3``
+as ENGINE and set ``POOL`` in the DATABASES entry:
+
+    "POOL": {"SIZE": 10, "TIMEOUT": 5, "MAX_LIFETIME": 1800, "CHECK_IDLE": 30}
+
+With ``SIZE`` 0 (the default) the backends behave exactly like Django's.
+"""
+
+from myauthservice.db.pool import ConnectionPool, get_pool
+
+POOL_DEFAULTS = {"SIZE": 0, "TIMEOUT": 5.0, "MAX_LIFETIME": 1800.0, "CHECK_IDLE": 30.0}
+
+
+def pool_options(settings_dict):
+    return {**POOL_DEFAULTS, **(settings_dict.get("POOL") or {})}
+
+
+class PooledDatabaseWrapperMixin:
+    """Takes connections from a process-wide pool and returns them on close."""
+
+    @property
+    def pool(self):
+        options = pool_options(self.settings_dict)
+        if not options["SIZE"]:
+            return None
+        return get_pool(
+            self.alias,
+            lambda: ConnectionPool(
+                connect=lambda: super(
+                    PooledDatabaseWrapperMixin, self
+                ).get_new_connection(self.get_connection_params()),
+                validate=self.validate_raw_connection,
+                size=options["SIZE"],
+                timeout=options["TIMEOUT"],
+                max_lifetime=options["MAX_LIFETIME"],
+                check_idle=options["CHECK_IDLE"],
+                alias=self.alias,
+            ),
+        )
+
+    def validate_raw_connection(self, connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+        return True
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.checkout()
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        # A connection left mid-transaction or after a database error is
+        # not handed to the next user.
+        discard = self.errors_occurred or not self.autocommit
+        with self.wrap_database_errors:
+            pool.checkin(self.connection, discard=discard)
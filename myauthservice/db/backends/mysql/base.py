@@ -0,0 +1,10 @@
+from django.db.backends.mysql import base
+
+from myauthservice.db.backends import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def validate_raw_connection(self, connection):
+        # mysqlclient's ping() raises if the server closed the connection.
+        connection.ping()
+        return True
@@ -0,0 +1,230 @@
+"""
+Process-wide database connection pool.
+
+Django opens a connection per thread and, with CONN_MAX_AGE=0, closes it at
+the end of every request, paying a TCP and authentication handshake each
+time. The pooled backends in ``myauthservice.db.backends`` instead take
+connections from a ``ConnectionPool`` and give them back on close, so
+connections are reused across requests and threads while at most
+``POOL["SIZE"]`` are open per process.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from oauth2.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available within POOL["TIMEOUT"] seconds."""
+
+
+def _metric_name(alias, name):
+    return f"db_pool_{name}" if alias == "default" else f"db_pool_{alias}_{name}"
+
+
+class PoolMetrics:
+    def __init__(self, alias):
+        self.checkouts = metrics.counter(
+            _metric_name(alias, "checkouts_total"), "Connections taken from the pool."
+        )
+        self.waits = metrics.counter(
+            _metric_name(alias, "waits_total"),
+            "Checkouts that waited for a connection to be returned.",
+        )
+        self.timeouts = metrics.counter(
+            _metric_name(alias, "timeouts_total"),
+            "Checkouts that gave up waiting for a connection.",
+        )
+        self.created = metrics.counter(
+            _metric_name(alias, "connections_created_total"),
+            "Database connections opened by the pool.",
+        )
+        self.discarded = metrics.counter(
+            _metric_name(alias, "connections_discarded_total"),
+            "Pooled connections closed as broken, expired or after errors.",
+        )
+        self.open = metrics.gauge(
+            _metric_name(alias, "connections_open"),
+            "Open pooled connections (idle and in use).",
+        )
+        self.idle = metrics.gauge(
+            _metric_name(alias, "connections_idle"), "Pooled connections not in use."
+        )
+
+
+class ConnectionPool:
+    """
+    A bounded pool of raw DB-API connections.
+
+    ``connect`` opens a new connection and ``validate`` returns whether an
+    idle one still works; it is only called for connections idle longer
+    than ``check_idle`` seconds. Connections older than ``max_lifetime``
+    seconds are closed instead of reused.
+    """
+
+    def __init__(
+        self,
+        connect,
+        validate,
+        size,
+        timeout=5.0,
+        max_lifetime=1800.0,
+        check_idle=30.0,
+        alias="default",
+    ):
+        self.connect = connect
+        self.validate = validate
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self.metrics = PoolMetrics(alias)
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        # Connections inherited across fork() share their sockets with the
+        # parent; they are dropped, not closed, in the child.
+        self._pid = os.getpid()
+        self._idle = deque()  # (connection, created_at, returned_at)
+        self._created_at = {}
+        self._open = 0
+        self._update_gauges()
+
+    def _update_gauges(self):
+        self.metrics.open.set(self._open)
+        self.metrics.idle.set(len(self._idle))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self.metrics.checkouts.value,
+                "waits": self.metrics.waits.value,
+                "timeouts": self.metrics.timeouts.value,
+            }
+
+    def checkout(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._pid != os.getpid():
+                    self._reset()
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.metrics.timeouts.inc()
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout}s "
+                            f"({self.size} in use)"
+                        )
+                    if not waited:
+                        waited = True
+                        self.metrics.waits.inc()
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    connection, created_at, returned_at = self._idle.pop()
+                else:
+                    connection = None
+                    self._open += 1
+                self._update_gauges()
+
+            if connection is None:
+                return self._create()
+
+            now = time.monotonic()
+            if now - created_at >= self.max_lifetime or (
+                now - returned_at >= self.check_idle and not self._usable(connection)
+            ):
+                self._discard(connection)
+                continue
+            self.metrics.checkouts.inc()
+            return connection
+
+    def _create(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._update_gauges()
+                self._cond.notify()
+            raise
+        self._created_at[id(connection)] = time.monotonic()
+        self.metrics.created.inc()
+        self.metrics.checkouts.inc()
+        return connection
+
+    def _usable(self, connection):
+        try:
+            return self.validate(connection)
+        except Exception:
+            return False
+
+    def checkin(self, connection, discard=False):
+        """Return a checked-out connection; ``discard`` closes it instead."""
+        if discard or self._pid != os.getpid():
+            self._discard(connection)
+            return
+        created_at = self._created_at.get(id(connection), 0.0)
+        with self._cond:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._update_gauges()
+            self._cond.notify()
+
+    def _discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Error closing discarded pooled connection", exc_info=True)
+        self.metrics.discarded.inc()
+        with self._cond:
+            if self._pid == os.getpid():
+                self._open -= 1
+            self._update_gauges()
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection; connections in use are closed on checkin."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """Return the process-wide pool for ``alias``, creating it with ``factory()``."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = factory()
+    return pool
+
+
+def all_pools():
+    return dict(_pools)
+
+
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
@@ -0,0 +1,21 @@
+"""
+OpenAPI schema and documentation URLconf, imported on first use.
+
+Keeps drf-spectacular's generator, renderers and views out of processes that
+only serve the API.
+"""
+
+from django.urls import path
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+from myauthservice.schema import CachedSchemaView
+
+urlpatterns = [
+    path("schema/", CachedSchemaView.as_view(), name="schema"),
+    path(
+        "swagger/",
+        SpectacularSwaggerView.as_view(url_name="schema"),
+        name="swagger-ui",
+    ),
+    path("redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+]
@@ -0,0 +1,115 @@
+"""
+Answer load-balancer probes before Django is invoked.
+
+``/api/health/`` and ``/api/version/`` return the same body for the lifetime
+of a process, so they are encoded once at startup and served directly by the
+ASGI/WSGI entry points, skipping the middleware stack, URL resolution and DRF
+content negotiation. Every other request (including other methods on these
+paths) is passed to Django unchanged. The DRF views stay routed for the
+OpenAPI schema and for deployments with FAST_PATH_ENABLED=0.
+
+Because Django never sees these requests, ALLOWED_HOSTS and
+SECURE_SSL_REDIRECT do not apply to them, so plain-HTTP probes from the load
+balancer get a 200 instead of a redirect.
+"""
+
+import json
+
+from django.conf import settings
+
+HEALTH_PATH = "/api/health/"
+VERSION_PATH = "/api/version/"
+METHODS = frozenset(["GET", "HEAD"])
+
+
+def _security_headers():
+    # Mirrors what SecurityMiddleware and XFrameOptionsMiddleware add to the
+    # Django-rendered responses.
+    headers = []
+    if getattr(settings, "SECURE_CONTENT_TYPE_NOSNIFF", True):
+        headers.append(("X-Content-Type-Options", "nosniff"))
+    referrer_policy = getattr(settings, "SECURE_REFERRER_POLICY", "same-origin")
+    if referrer_policy:
+        headers.append(("Referrer-Policy", referrer_policy))
+    opener_policy = getattr(
+        settings, "SECURE_CROSS_ORIGIN_OPENER_POLICY", "same-origin"
+    )
+    if opener_policy:
+        headers.append(("Cross-Origin-Opener-Policy", opener_policy))
+    headers.append(("X-Frame-Options", getattr(settings, "X_FRAME_OPTIONS", "DENY")))
+    return headers
+
+
+def _json_response(payload):
+    # Same compact encoding as DRF's JSONRenderer.
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    headers = [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(body))),
+        *_security_headers(),
+    ]
+    return body, headers
+
+
+def static_responses():
+    """Return ``{path: (body, headers)}`` for the paths served by the fast path."""
+    return {
+        HEALTH_PATH: _json_response({"status": "ok"}),
+        VERSION_PATH: _json_response(
+            {"service": "MyAuthService", "version": settings.SERVICE_VERSION}
+        ),
+    }
+
+
+class FastPathASGI:
+    def __init__(self, app, responses=None):
+        self.app = app
+        responses = static_responses() if responses is None else responses
+        self.responses = {
+            path: (
+                body,
+                [(name.lower().encode(), value.encode()) for name, value in headers],
+            )
+            for path, (body, headers) in responses.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in METHODS:
+            response = self.responses.get(scope["path"])
+            if response is not None:
+                body, headers = response
+                await send(
+                    {"type": "http.response.start", "status": 200, "headers": headers}
+                )
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"" if scope["method"] == "HEAD" else body,
+                    }
+                )
+                return
+        await self.app(scope, receive, send)
+
+
+class FastPathWSGI:
+    def __init__(self, app, responses=None):
+        self.app = app
+        self.responses = static_responses() if responses is None else responses
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        if method in METHODS:
+            response = self.responses.get(environ.get("PATH_INFO"))
+            if response is not None:
+                body, headers = response
+                start_response("200 OK", list(headers))
+                return [b"" if method == "HEAD" else body]
+        return self.app(environ, start_response)
+
+
+def wrap_asgi(app):
+    return FastPathASGI(app) if getattr(settings, "FAST_PATH_ENABLED", True) else app
+
+
+def wrap_wsgi(app):
+    return FastPathWSGI(app) if getattr(settings, "FAST_PATH_ENABLED", True) else app
@@ -0,0 +1,21 @@
+"""
+OpenAPI schema generator, imported only where the document is built.
+
+Views are created with ``myauthservice.openapi.DeferredSchema`` so API
+workers never import drf-spectacular's AutoSchema. Before a view is
+inspected, ``SchemaGenerator`` sets AutoSchema on its class; drf-spectacular
+then rebases ``@extend_schema`` overrides (built on ``DEFAULT_SCHEMA_CLASS``)
+onto it as it does for any view with a custom schema class.
+"""
+
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+from drf_spectacular.openapi import AutoSchema
+
+from myauthservice.openapi import DeferredSchema
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    def create_view(self, callback, method, request=None):
+        if isinstance(callback.cls.schema, DeferredSchema):
+            callback.cls.schema = AutoSchema()
+        return super().create_view(callback, method, request)
@@ -0,0 +1,96 @@
+"""
+WSGI/ASGI handlers that pick a middleware chain by URL prefix.
+
+Django applies ``settings.MIDDLEWARE`` to every request. The machine API
+under ``/api/`` never uses sessions, CSRF cookies, ``request.user`` or
+messages, so ``MIDDLEWARE_PROFILES`` maps path prefixes to shorter chains:
+
+    MIDDLEWARE_PROFILES = {
+        "/api/": ["django.middleware.security.SecurityMiddleware", ...],
+    }
+
+The longest matching prefix wins, and requests matching no prefix (admin,
+schema, docs) get the full ``MIDDLEWARE`` chain. Each profile is loaded once
+at startup into its own handler, with its own view and exception middleware.
+"""
+
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIHandler
+
+
+@contextmanager
+def _middleware(middleware):
+    # BaseHandler.load_middleware() only reads settings.MIDDLEWARE, so each
+    # profile is loaded with the setting swapped; this runs once at startup.
+    original = settings.MIDDLEWARE
+    settings.MIDDLEWARE = list(middleware)
+    try:
+        yield
+    finally:
+        settings.MIDDLEWARE = original
+
+
+class ProfileHandler(BaseHandler):
+    """Middleware chain for one profile; requests are created by the outer handler."""
+
+    def __init__(self, middleware, is_async=False):
+        super().__init__()
+        self.middleware = list(middleware)
+        with _middleware(self.middleware):
+            self.load_middleware(is_async=is_async)
+
+
+class ProfileRoutingMixin:
+    def load_middleware(self, is_async=False):
+        super().load_middleware(is_async=is_async)
+        profiles = getattr(settings, "MIDDLEWARE_PROFILES", {})
+        self.profiles = [
+            (prefix, ProfileHandler(middleware, is_async=is_async))
+            for prefix, middleware in sorted(
+                profiles.items(), key=lambda item: len(item[0]), reverse=True
+            )
+        ]
+
+    def profile_for(self, path):
+        """Return the ProfileHandler serving ``path``, or None for the full chain."""
+        for prefix, handler in self.profiles:
+            if path.startswith(prefix):
+                return handler
+        return None
+
+    def get_response(self, request):
+        handler = self.profile_for(request.path_info)
+        if handler is None:
+            return super().get_response(request)
+        return handler.get_response(request)
+
+    async def get_response_async(self, request):
+        handler = self.profile_for(request.path_info)
+        if handler is None:
+            return await super().get_response_async(request)
+        return await handler.get_response_async(request)
+
+
+class ProfiledWSGIHandler(ProfileRoutingMixin, WSGIHandler):
+    pass
+
+
+class ProfiledASGIHandler(ProfileRoutingMixin, ASGIHandler):
+    pass
+
+
+def get_wsgi_application():
+    """Like django.core.wsgi.get_wsgi_application(), with middleware profiles."""
+    django.setup(set_prefix=False)
+    return ProfiledWSGIHandler()
+
+
+def get_asgi_application():
+    """Like django.core.asgi.get_asgi_application(), with middleware profiles."""
+    django.setup(set_prefix=False)
+    return ProfiledASGIHandler()
@@ -0,0 +1,15 @@
+"""
+Placeholder for drf-spectacular's AutoSchema in API workers.
+
+DRF instantiates ``DEFAULT_SCHEMA_CLASS`` for every ``@api_view`` when the
+view module is imported, which would import drf-spectacular's whole
+generator stack into every worker. ``DeferredSchema`` is a plain
+ViewInspector that imports nothing; ``myauthservice.generators`` gives views
+holding it drf-spectacular's AutoSchema when the OpenAPI document is built.
+"""
+
+from rest_framework.schemas.inspectors import ViewInspector
+
+
+class DeferredSchema(ViewInspector):
+    """Schema inspector of views whose schema has not been generated yet."""
@@ -0,0 +1,107 @@
+"""
+Preload-and-freeze boot for prefork servers (e.g. ``gunicorn --preload``).
+
+With PRELOAD_ENABLED=1 the master process imports and fully initialises the
+app (URL resolvers including the lazily mounted admin and docs URLconfs,
+the client caches) and then calls ``gc.freeze()``, moving every object into
+the permanent generation. Workers forked from it share those pages
+copy-on-write: the collector no longer writes to the GC headers of the
+frozen objects, and disabling GC while booting avoids leaving freed holes
+across shared pages. GC is enabled again right after the freeze.
+
+Without preloading, ``boot()`` starts the per-process background services
+(oauth2.apps.start_background_services, including the warm-up) once the
+application exists. Threads do not survive ``fork()``, so with preloading
+they are started in each worker after fork instead of in the master, or on
+the first request if the preloaded process serves requests itself.
+
+GC_THRESHOLDS applies in either mode.
+"""
+
+import gc
+import logging
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.urls import get_resolver
+
+from myauthservice.db.pool import close_pools
+
+logger = logging.getLogger(__name__)
+
+
+def configure_gc():
+    thresholds = getattr(settings, "GC_THRESHOLDS", None)
+    if thresholds:
+        gc.set_threshold(*thresholds)
+
+
+def warm_master():
+    """Do the per-process setup that would otherwise run in every worker."""
+    from oauth2.conf import get_setting
+    from oauth2.warmup import run_warm_up
+
+    # Importing every URLconf and building the reverse lookup tables once.
+    get_resolver().reverse_dict
+    if get_setting("WARMUP_ENABLED"):
+        run_warm_up()
+    # Database connections must not be shared with the forked workers.
+    connections.close_all()
+    close_pools()
+
+
+_master_pid = None
+_services_pid = None
+
+
+def _start_services():
+    """Start the background services once in this process (after preload)."""
+    from oauth2.apps import start_background_services
+
+    global _services_pid
+    if _services_pid == os.getpid():
+        return
+    _services_pid = os.getpid()
+    start_background_services(warm_up=False)
+
+
+def _after_fork_in_child():
+    # Only workers forked by the master, not processes they fork themselves.
+    if os.getppid() == _master_pid:
+        _start_services()
+
+
+def _on_request_started(**kwargs):
+    # The preloaded process itself serves requests: nothing forked from it.
+    if os.getpid() == _master_pid:
+        _start_services()
+
+
+@contextmanager
+def boot():
+    """Wrap the creation of the WSGI/ASGI application."""
+    from oauth2.apps import start_background_services
+
+    configure_gc()
+    preload = getattr(settings, "PRELOAD_ENABLED", False)
+    if preload:
+        gc.disable()
+    yield
+    if not preload:
+        start_background_services()
+        return
+
+    global _master_pid
+    warm_master()
+    _master_pid = os.getpid()
+    gc.collect()
+    gc.freeze()
+    gc.enable()
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+    request_started.connect(_on_request_started, dispatch_uid=__name__)
+    logger.info(
+        "Preloaded app; froze %d objects for worker fork", gc.get_freeze_count()
+    )
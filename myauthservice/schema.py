@@ -0,0 +1,92 @@
+"""
+OpenAPI schema rendered once per deploy instead of on every request.
+
+``SpectacularAPIView`` introspects every view for each ``/schema/`` request.
+The schema only changes with the code, so it is rendered once, either ahead
+of time by ``manage.py render_schema`` into ``SCHEMA_CACHE_DIR`` or lazily on
+the first request, and then served from memory with an ETag.
+``/swagger/`` and ``/redoc/`` load the document from ``/schema/``, so they
+benefit as well.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import parse_etags
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+
+def render_schema(fmt):
+    """Generate the public schema and return it rendered as ``fmt`` bytes."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=None, api_version=None
+    )
+    schema = generator.get_schema(request=None, public=True)
+    return RENDERERS[fmt]().render(schema, renderer_context={})
+
+
+def schema_file(directory, fmt):
+    return Path(directory) / f"openapi.{fmt}"
+
+
+class SchemaCache:
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def get(self, fmt):
+        """Return ``(body, etag)`` for ``fmt``, loading or rendering it once."""
+        document = self._documents.get(fmt)
+        if document is None:
+            with self._lock:
+                document = self._documents.get(fmt)
+                if document is None:
+                    document = self._documents[fmt] = self._load(fmt)
+        return document
+
+    def _load(self, fmt):
+        directory = getattr(settings, "SCHEMA_CACHE_DIR", None)
+        path = schema_file(directory, fmt) if directory else None
+        if path is not None and path.exists():
+            body = path.read_bytes()
+        else:
+            body = render_schema(fmt)
+        return body, '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+    def clear(self):
+        self._documents.clear()
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSchemaView(SpectacularAPIView):
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        body, etag = schema_cache.get(renderer.format)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if (
+            etag in if_none_match
+            or f"W/{etag}" in if_none_match
+            or "*" in if_none_match
+        ):
+            response = HttpResponseNotModified()
+        else:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(body, content_type=content_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="schema.{renderer.format}"'
+            )
+        response["ETag"] = etag
+        return response
@@ -29,6 +29,70 @@ if VERSION_FILE.exists():
 else:
     SERVICE_VERSION = DEFAULT_SERVICE_VERSION  # fallback if VERSION file is missing
 
+
+def env_flag(name, default=False):
+    """Read a boolean toggle such as OAUTH2_METRICS_ENABLED=1 from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def database_connection_settings(max_age=0, health_checks=False):
+    """
+    Connection reuse options for a DATABASES entry, read from the environment.
+
+    DB_CONN_MAX_AGE keeps a connection per thread open for that many seconds
+    ("none" for unlimited), DB_CONN_HEALTH_CHECKS checks a reused connection
+    before each request, and DB_POOL_SIZE > 0 shares a pool of connections
+    between threads (myauthservice.db.backends).
+    """
+    pool_size = int(os.environ.get("DB_POOL_SIZE", "0"))
+    if pool_size:
+        # Pooled connections go back to the pool when Django closes them at
+        # the end of each request.
+        max_age = 0
+    conn_max_age = os.environ.get("DB_CONN_MAX_AGE", str(max_age))
+    return {
+        "CONN_MAX_AGE": None if conn_max_age.lower() == "none" else int(conn_max_age),
+        "CONN_HEALTH_CHECKS": env_flag("DB_CONN_HEALTH_CHECKS", default=health_checks),
+        "POOL": {
+            "SIZE": pool_size,
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", "5")),
+            "MAX_LIFETIME": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+            "CHECK_IDLE": float(os.environ.get("DB_POOL_CHECK_IDLE", "30")),
+        },
+    }
+
+
+def replica_databases(primary, overrides):
+    """
+    DATABASES entries for read replicas of ``primary``: one alias per item of
+    ``overrides`` (e.g. ``{"HOST": ...}``), named replica1, replica2, ...
+
+    Replicas mirror the primary in tests and are used for oauth2 reads by
+    oauth2.routers.ReplicaRouter once listed in OAUTH2["READ_REPLICAS"].
+    """
+    return {
+        f"replica{number}": {**primary, **override, "TEST": {"MIRROR": "default"}}
+        for number, override in enumerate(overrides, start=1)
+    }
+
+
+def shard_databases(primary, overrides):
+    """
+    DATABASES entries for extra client shards modelled on ``primary``: one
+    alias per item of ``overrides``, named shard1, shard2, ...
+
+    Clients are spread over "default" and these aliases once they are listed
+    in OAUTH2["CLIENT_SHARDS"] (see oauth2.sharding).
+    """
+    return {
+        f"shard{number}": {**primary, **override}
+        for number, override in enumerate(overrides, start=1)
+    }
+
+
 if "SECRET_KEY" not in os.environ:
     raise ImproperlyConfigured("SECRET_KEY environment variable not set")
 
@@ -38,7 +102,9 @@ if "SECRET_KEY" not in os.environ:
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    # Admin modules are discovered when /admin/ is first routed
+    # (myauthservice.admin_urls), not at every worker boot.
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -50,10 +116,65 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_SCHEMA_CLASS": "myauthservice.openapi.DeferredSchema",
+}
+
+SPECTACULAR_SETTINGS = {
+    "DEFAULT_GENERATOR_CLASS": "myauthservice.generators.SchemaGenerator",
+}
+
+# Serve /api/health/ and /api/version/ from the ASGI/WSGI entry points
+# without running Django (see myauthservice.fastpath).
+FAST_PATH_ENABLED = env_flag("FAST_PATH_ENABLED", default=True)
+
+# Initialise the app and gc.freeze() it in the master of a prefork server
+# that imports the app before forking (see myauthservice.preload).
+PRELOAD_ENABLED = env_flag("PRELOAD_ENABLED")
+
+# "gen0,gen1,gen2" thresholds for gc.set_threshold(); unset keeps Python's.
+GC_THRESHOLDS = (
+    tuple(int(value) for value in os.environ["GC_THRESHOLDS"].split(","))
+    if os.environ.get("GC_THRESHOLDS")
+    else None
+)
+
+# Directory holding the OpenAPI schema pre-rendered by `manage.py render_schema`.
+# When unset (or empty), /schema/ renders it on first request instead.
+SCHEMA_CACHE_DIR = os.environ.get("SCHEMA_CACHE_DIR") or None
+
+# OAuth2 service tuning. Keys not listed here fall back to oauth2.conf.DEFAULTS.
+OAUTH2 = {
+    "CLIENT_CACHE_TTL": int(os.environ.get("OAUTH2_CLIENT_CACHE_TTL", "300")),
+    "CLIENT_FILTER_ENABLED": env_flag("OAUTH2_CLIENT_FILTER_ENABLED"),
+    "METRICS_ENABLED": env_flag("OAUTH2_METRICS_ENABLED"),
+    "WARMUP_ENABLED": env_flag("OAUTH2_WARMUP_ENABLED"),
+    "WARMUP_BUDGET": float(os.environ.get("OAUTH2_WARMUP_BUDGET", "2.0")),
+    "SNAPSHOT_PATH": os.environ.get("OAUTH2_SNAPSHOT_PATH") or None,
+    "SNAPSHOT_LEADER": env_flag("OAUTH2_SNAPSHOT_LEADER", default=True),
+    "CHANGE_FEED_INTERVAL": (
+        float(os.environ["OAUTH2_CHANGE_FEED_INTERVAL"])
+        if os.environ.get("OAUTH2_CHANGE_FEED_INTERVAL")
+        else None
+    ),
+    "PLATFORM_API_TOKENS": [
+        token.strip()
+        for token in os.environ.get("OAUTH2_PLATFORM_API_TOKENS", "").split(",")
+        if token.strip()
+    ],
+    "EDGE_EXPORT_SIGNING_KEY": os.environ.get("OAUTH2_EDGE_EXPORT_SIGNING_KEY") or None,
+    "EDGE_EXPORT_TTL": int(os.environ.get("OAUTH2_EDGE_EXPORT_TTL", "30")),
+    "AUTH_TRUSTED_PROXY_HOPS": int(
+        os.environ.get("OAUTH2_AUTH_TRUSTED_PROXY_HOPS", "0")
+    ),
+    "ADMISSION_ENABLED": env_flag("OAUTH2_ADMISSION_ENABLED", default=True),
+    "ADMISSION_MAX_IN_FLIGHT": int(
+        os.environ.get("OAUTH2_ADMISSION_MAX_IN_FLIGHT", "128")
+    ),
 }
 
 MIDDLEWARE = [
+    # First, so shed requests cost no other middleware (oauth2.admission).
+    "oauth2.admission.AdmissionControlMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +184,18 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Shorter middleware chains for URL prefixes (see myauthservice.handlers).
+# The machine API does not use sessions, CSRF cookies, request.user or
+# messages; other paths such as /admin/ get the full MIDDLEWARE chain.
+MIDDLEWARE_PROFILES = {
+    "/api/": [
+        "oauth2.admission.AdmissionControlMiddleware",
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    ],
+}
+
 ROOT_URLCONF = "myauthservice.urls"
 
 TEMPLATES = [
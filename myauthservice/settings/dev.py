@@ -10,19 +10,29 @@ from .base import (
     AUTH_PASSWORD_VALIDATORS,
     BASE_DIR,
     DEFAULT_AUTO_FIELD,
+    FAST_PATH_ENABLED,
+    GC_THRESHOLDS,
     INSTALLED_APPS,
     LANGUAGE_CODE,
     LOGGING as BASE_LOGGING,
     MIDDLEWARE,
+    MIDDLEWARE_PROFILES,
+    OAUTH2 as BASE_OAUTH2,
+    PRELOAD_ENABLED,
     REST_FRAMEWORK,
     ROOT_URLCONF,
+    SCHEMA_CACHE_DIR,
     SERVICE_VERSION,
+    SPECTACULAR_SETTINGS,
     STATIC_URL,
     TEMPLATES,
     TIME_ZONE,
     USE_I18N,
     USE_TZ,
     WSGI_APPLICATION,
+    database_connection_settings,
+    replica_databases,
+    shard_databases,
 )
 
 # Enable debug mode for development
@@ -35,11 +45,41 @@ ALLOWED_HOSTS = ["*"]
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "myauthservice.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        **database_connection_settings(),
     }
 }
 
+# Optional local read replicas: DEV_DB_REPLICAS=N adds N aliases for the same
+# SQLite file so replica routing can be exercised without a real replica.
+replicas = replica_databases(
+    DATABASES["default"], [{}] * int(os.environ.get("DEV_DB_REPLICAS", "0"))
+)
+
+# Optional local client shards: DEV_DB_SHARDS=N adds N SQLite databases
+# (db-shard1.sqlite3, ...) next to the default one. Run
+# "migrate --database shardN" for each of them.
+shards = shard_databases(
+    DATABASES["default"],
+    [
+        {"NAME": BASE_DIR / f"db-shard{number}.sqlite3"}
+        for number in range(1, int(os.environ.get("DEV_DB_SHARDS", "0")) + 1)
+    ],
+)
+
+DATABASES.update(replicas)
+DATABASES.update(shards)
+DATABASE_ROUTERS = [
+    *(["oauth2.routers.ShardRouter"] if shards else []),
+    *(["oauth2.routers.ReplicaRouter"] if replicas else []),
+]
+OAUTH2 = {
+    **BASE_OAUTH2,
+    "READ_REPLICAS": list(replicas),
+    "CLIENT_SHARDS": ["default", *shards] if shards else [],
+}
+
 SECRET_KEY = os.environ["SECRET_KEY"]
 
 # Console logging configuration for development
@@ -56,16 +96,24 @@ __all__ = [
     "AUTH_PASSWORD_VALIDATORS",
     "BASE_DIR",
     "DATABASES",
+    "DATABASE_ROUTERS",
     "DEBUG",
     "DEFAULT_AUTO_FIELD",
+    "FAST_PATH_ENABLED",
+    "GC_THRESHOLDS",
     "INSTALLED_APPS",
     "LANGUAGE_CODE",
     "LOGGING",
     "MIDDLEWARE",
+    "MIDDLEWARE_PROFILES",
+    "OAUTH2",
+    "PRELOAD_ENABLED",
     "REST_FRAMEWORK",
     "ROOT_URLCONF",
+    "SCHEMA_CACHE_DIR",
     "SECRET_KEY",
     "SERVICE_VERSION",
+    "SPECTACULAR_SETTINGS",
     "STATIC_URL",
     "TEMPLATES",
     "TIME_ZONE",
@@ -9,19 +9,29 @@ from .base import (
     AUTH_PASSWORD_VALIDATORS,
     BASE_DIR,
     DEFAULT_AUTO_FIELD,
+    FAST_PATH_ENABLED,
+    GC_THRESHOLDS,
     INSTALLED_APPS,
     LANGUAGE_CODE,
     LOGGING as BASE_LOGGING,
     MIDDLEWARE,
+    MIDDLEWARE_PROFILES,
+    OAUTH2 as BASE_OAUTH2,
+    PRELOAD_ENABLED,
     REST_FRAMEWORK,
     ROOT_URLCONF,
+    SCHEMA_CACHE_DIR,
     SERVICE_VERSION,
+    SPECTACULAR_SETTINGS,
     STATIC_URL,
     TEMPLATES,
     TIME_ZONE,
     USE_I18N,
     USE_TZ,
     WSGI_APPLICATION,
+    database_connection_settings,
+    replica_databases,
+    shard_databases,
 )
 
 # Disable debug mode for production
@@ -51,15 +61,49 @@ if missing_vars:
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "myauthservice.db.backends.mysql",
         "NAME": os.environ["PROD_DB_NAME"],
         "USER": os.environ["PROD_DB_USER"],
         "PASSWORD": os.environ["PROD_DB_PASSWORD"],
         "HOST": os.environ["PROD_DB_HOST"],
         "PORT": os.environ.get("PROD_DB_PORT", "3306"),
+        **database_connection_settings(max_age=60, health_checks=True),
     }
 }
 
+# Read replicas for oauth2 reads, one per host in PROD_DB_REPLICA_HOSTS.
+replicas = replica_databases(
+    DATABASES["default"],
+    [
+        {"HOST": host.strip()}
+        for host in os.environ.get("PROD_DB_REPLICA_HOSTS", "").split(",")
+        if host.strip()
+    ],
+)
+
+# Client shards besides the default database, one per host in
+# PROD_DB_SHARD_HOSTS. Appending hosts later requires rebalance_client_shards.
+shards = shard_databases(
+    DATABASES["default"],
+    [
+        {"HOST": host.strip()}
+        for host in os.environ.get("PROD_DB_SHARD_HOSTS", "").split(",")
+        if host.strip()
+    ],
+)
+
+DATABASES.update(replicas)
+DATABASES.update(shards)
+DATABASE_ROUTERS = [
+    *(["oauth2.routers.ShardRouter"] if shards else []),
+    *(["oauth2.routers.ReplicaRouter"] if replicas else []),
+]
+OAUTH2 = {
+    **BASE_OAUTH2,
+    "READ_REPLICAS": list(replicas),
+    "CLIENT_SHARDS": ["default", *shards] if shards else [],
+}
+
 SECRET_KEY = os.environ["SECRET_KEY"]
 
 # Use base logging configuration
@@ -80,20 +124,28 @@ __all__ = [
     "BASE_DIR",
     "CSRF_COOKIE_SECURE",
     "DATABASES",
+    "DATABASE_ROUTERS",
     "DEBUG",
     "DEFAULT_AUTO_FIELD",
+    "FAST_PATH_ENABLED",
+    "GC_THRESHOLDS",
     "INSTALLED_APPS",
     "LANGUAGE_CODE",
     "LOGGING",
     "MIDDLEWARE",
+    "MIDDLEWARE_PROFILES",
+    "OAUTH2",
+    "PRELOAD_ENABLED",
     "REST_FRAMEWORK",
     "ROOT_URLCONF",
+    "SCHEMA_CACHE_DIR",
     "SECRET_KEY",
     "SECURE_HSTS_INCLUDE_SUBDOMAINS",
     "SECURE_HSTS_PRELOAD",
     "SECURE_HSTS_SECONDS",
     "SECURE_SSL_REDIRECT",
     "SERVICE_VERSION",
+    "SPECTACULAR_SETTINGS",
     "SESSION_COOKIE_SECURE",
     "STATIC_URL",
     "TEMPLATES",
@@ -10,19 +10,27 @@ from .base import (
     AUTH_PASSWORD_VALIDATORS,
     BASE_DIR,
     DEFAULT_AUTO_FIELD,
+    FAST_PATH_ENABLED,
+    GC_THRESHOLDS,
     INSTALLED_APPS,
     LANGUAGE_CODE,
     LOGGING as BASE_LOGGING,
     MIDDLEWARE,
+    MIDDLEWARE_PROFILES,
+    OAUTH2,
+    PRELOAD_ENABLED,
     REST_FRAMEWORK,
     ROOT_URLCONF,
+    SCHEMA_CACHE_DIR,
     SERVICE_VERSION,
+    SPECTACULAR_SETTINGS,
     STATIC_URL,
     TEMPLATES,
     TIME_ZONE,
     USE_I18N,
     USE_TZ,
     WSGI_APPLICATION,
+    database_connection_settings,
 )
 
 # Enable debug mode during tests to provide detailed error messages and stack traces.
@@ -36,9 +44,17 @@ ALLOWED_HOSTS = ["*"]
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "myauthservice.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+        **database_connection_settings(),
+    },
+    # Second database for sharding tests; tests opt in with
+    # django_db(databases=...) and OAUTH2["CLIENT_SHARDS"].
+    "shard1": {
+        "ENGINE": "myauthservice.db.backends.sqlite3",
+        "NAME": ":memory:",
+        **database_connection_settings(),
+    },
 }
 
 SECRET_KEY = os.environ["SECRET_KEY"]
@@ -64,14 +80,21 @@ __all__ = [
     "DATABASES",
     "DEBUG",
     "DEFAULT_AUTO_FIELD",
+    "FAST_PATH_ENABLED",
+    "GC_THRESHOLDS",
     "INSTALLED_APPS",
     "LANGUAGE_CODE",
     "LOGGING",
     "MIDDLEWARE",
+    "MIDDLEWARE_PROFILES",
+    "OAUTH2",
+    "PRELOAD_ENABLED",
     "REST_FRAMEWORK",
     "ROOT_URLCONF",
+    "SCHEMA_CACHE_DIR",
     "SECRET_KEY",
     "SERVICE_VERSION",
+    "SPECTACULAR_SETTINGS",
     "STATIC_URL",
     "TEMPLATES",
     "TIME_ZONE",
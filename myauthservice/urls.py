@@ -15,22 +15,25 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
-from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from django.urls import include, path
+from django.urls.resolvers import RoutePattern, URLResolver
+
+
+def lazy_include(route, urlconf, namespace=None):
+    """
+    Like ``include()``, but ``urlconf`` is only imported when a request is
+    first matched against it (or when a URL inside it is reversed).
+    """
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf,
+        app_name=namespace,
+        namespace=namespace,
+    )
+
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    lazy_include("admin/", "myauthservice.admin_urls", namespace="admin"),
     path("api/", include("oauth2.urls")),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path("redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+    lazy_include("", "myauthservice.docs_urls"),
 ]
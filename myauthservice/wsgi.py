@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from myauthservice.fastpath import wrap_wsgi
+from myauthservice.handlers import get_wsgi_application
+from myauthservice.preload import boot
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myauthservice.settings.prod")
 
-application = get_wsgi_application()
+# /api/health/ and /api/version/ are answered before Django; see fastpath.
+# With PRELOAD_ENABLED=1 the app is fully initialised and frozen here, before
+# the server forks its workers; see preload.
+with boot():
+    application = wrap_wsgi(get_wsgi_application())
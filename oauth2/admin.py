@@ -3,7 +3,10 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.http import HttpResponseRedirect
 from django.urls import reverse
-from .models import Client
+from django.utils import timezone
+from .archive import restore_clients
+from .models import ArchivedClient, Client, Scope
+from .sharding import is_sharded
 
 
 @admin.register(Client)
@@ -19,6 +22,7 @@ class ClientAdmin(admin.ModelAdmin):
     search_fields = ["name", "client_id", "description"]
     readonly_fields = ["client_id", "client_secret_display", "created_at", "updated_at"]
     actions = ["deactivate_clients", "activate_clients"]
+    filter_horizontal = ["scopes"]
     change_form_template = "admin/oauth2/client/change_form.html"
 
     fieldsets = [
@@ -51,6 +55,20 @@ class ClientAdmin(admin.ModelAdmin):
                 ),
             },
         ),
+        (
+            "Scopes",
+            {
+                "fields": ["scopes"],
+                "description": "Scopes this client is allowed to request.",
+            },
+        ),
+        (
+            "Rate limit",
+            {
+                "fields": ["rate_limit", "rate_limit_burst"],
+                "classes": ["collapse"],
+            },
+        ),
         (
             "Timestamps",
             {
@@ -60,6 +78,16 @@ class ClientAdmin(admin.ModelAdmin):
         ),
     ]
 
+    def get_list_display(self, request):
+        # The changelist spans every shard; show where each client lives.
+        list_display = super().get_list_display(request)
+        if is_sharded():
+            return [*list_display, "shard"]
+        return list_display
+
+    def shard(self, obj):
+        return obj._state.db
+
     def client_id_display(self, obj):
         if obj.client_id:
             return f"{obj.client_id[:16]}..."
@@ -146,13 +174,14 @@ class ClientAdmin(admin.ModelAdmin):
         return super().render_change_form(request, context, add, change, form_url, obj)
 
     def deactivate_clients(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        # update() skips auto_now; bump updated_at so the change feed sees it.
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
         self.message_user(request, f"{updated} client(s) successfully deactivated.")
 
     deactivate_clients.short_description = "Deactivate selected clients"
 
     def activate_clients(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
         self.message_user(request, f"{updated} client(s) successfully activated.")
 
     activate_clients.short_description = "Activate selected clients"
@@ -169,3 +198,57 @@ class ClientAdmin(admin.ModelAdmin):
 
         # Public clients still go to the list page
         return super().response_add(request, obj, post_url_continue)
+
+
+@admin.register(Scope)
+class ScopeAdmin(admin.ModelAdmin):
+    list_display = ["name", "bit", "description", "created_at"]
+    search_fields = ["name", "description"]
+    readonly_fields = ["bit", "created_at"]
+
+    def has_delete_permission(self, request, obj=None):
+        # Scope bits are embedded in encoded grants; deleting a scope would let
+        # its bit be reassigned to a different scope later.
+        return False
+
+
+@admin.register(ArchivedClient)
+class ArchivedClientAdmin(admin.ModelAdmin):
+    """Long-inactive clients moved out by ``manage.py archive_clients``."""
+
+    list_display = [
+        "name",
+        "client_id_display",
+        "client_type",
+        "updated_at",
+        "archived_at",
+    ]
+    list_filter = ["client_type", "archived_at"]
+    search_fields = ["name", "client_id", "description"]
+    exclude = ["client_secret"]
+    actions = ["restore_selected"]
+
+    def client_id_display(self, obj):
+        return f"{obj.client_id[:16]}..."
+
+    client_id_display.short_description = "Client ID"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_restore_permission(self, request):
+        return request.user.has_perm("oauth2.add_client")
+
+    def restore_selected(self, request, queryset):
+        restored = restore_clients(queryset)
+        self.message_user(
+            request,
+            f"{len(restored)} client(s) restored. They stay inactive until "
+            "activated.",
+        )
+
+    restore_selected.short_description = "Restore selected clients"
+    restore_selected.allowed_permissions = ["restore"]
@@ -0,0 +1,272 @@
+"""
+Admission control: shed load with 503 instead of queueing it.
+
+When the database slows down, each request holds its worker thread longer
+and new requests queue behind it until they all time out. The middleware
+caps the requests in flight in this worker, overall (ADMISSION_MAX_IN_FLIGHT)
+and per route class (ADMISSION_ROUTE_CLASSES: token, introspect, admin and
+the default class), and answers the excess at once with ``503`` and
+``Retry-After``, before any view or query runs.
+
+A class limit is not fixed: it adapts to latency, gradient style. Every
+completed request updates a short-term latency average and a slow baseline.
+While the short-term average stays within ADMISSION_LATENCY_TOLERANCE times
+the baseline the limit grows toward the class maximum; beyond it the limit
+shrinks in proportion, down to ADMISSION_MIN_LIMIT, so a slow database is
+given fewer concurrent requests instead of more.
+
+Health, readiness, version and metrics paths are never shed, so a shedding
+worker is not taken out of rotation by its probes. In-flight counts are per
+process, so limits only bind on threaded or ASGI workers.
+"""
+
+import json
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+from .conf import get_setting
+from .metrics import metrics
+
+DEFAULT_CLASS = "default"
+
+# EWMA weights of one latency sample in the short-term and baseline averages.
+SHORT_WEIGHT = 0.1
+BASELINE_WEIGHT = 0.002
+# Weight of the newly computed limit against the current one.
+SMOOTHING = 0.2
+
+SHED_BODY = json.dumps(
+    {
+        "error": "temporarily_unavailable",
+        "error_description": "The server is overloaded; retry later.",
+    },
+    separators=(",", ":"),
+).encode()
+
+shed_requests = metrics.counter(
+    "oauth2_admission_shed_total", "Requests answered 503 by admission control."
+)
+in_flight_gauge = metrics.gauge(
+    "oauth2_admission_in_flight", "Requests in flight in this worker."
+)
+
+
+class AdaptiveLimit:
+    """Concurrency limit of one route class, adapted to observed latency."""
+
+    def __init__(self, name, max_limit, min_limit=1, tolerance=2.0):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.tolerance = tolerance
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency = None
+        self.baseline = None
+        self.shed = metrics.counter(
+            f"oauth2_admission_{name}_shed_total",
+            f"Requests of the {name} class answered 503 by admission control.",
+        )
+        self.limit_gauge = metrics.gauge(
+            f"oauth2_admission_{name}_limit",
+            f"Current in-flight limit of the {name} class.",
+        )
+        self.limit_gauge.set(max_limit)
+
+    def update(self, latency):
+        """Fold one completed request's latency (seconds) into the limit."""
+        if self.latency is None:
+            self.latency = self.baseline = latency
+        else:
+            self.latency += (latency - self.latency) * SHORT_WEIGHT
+            self.baseline += (latency - self.baseline) * BASELINE_WEIGHT
+            if self.baseline > self.latency * self.tolerance:
+                # Latency dropped well below a baseline learnt while slow.
+                self.baseline = self.latency * self.tolerance
+        if not self.latency:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / self.latency))
+        if gradient == 1.0 and self.in_flight * 2 < self.limit:
+            # Too little traffic to tell whether a larger limit would hold.
+            return
+        target = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit + (target - self.limit) * SMOOTHING
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+        self.limit_gauge.set(int(self.limit))
+
+    def retry_after(self):
+        """Seconds a shed client should wait: about one request's latency."""
+        return max(1, math.ceil(self.latency or 0))
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Overloaded; retry after {retry_after}s")
+
+
+class AdmissionController:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limits = {}
+        self._config = None
+        self._source = None
+        self.in_flight = 0
+
+    def _configure(self):
+        # Limits are rebuilt when the OAUTH2 setting is replaced; checking
+        # its identity keeps five get_setting() calls off every request.
+        source = getattr(settings, "OAUTH2", None)
+        if source is self._source and self._config is not None:
+            return self._config[0]
+        config = (
+            get_setting("ADMISSION_MAX_IN_FLIGHT"),
+            get_setting("ADMISSION_ROUTE_CLASSES"),
+            get_setting("ADMISSION_EXEMPT_PATHS"),
+            get_setting("ADMISSION_MIN_LIMIT"),
+            get_setting("ADMISSION_LATENCY_TOLERANCE"),
+        )
+        if config != self._config:
+            _, classes, exempt, min_limit, tolerance = config
+            self._prefixes = sorted(
+                (
+                    (prefix, name)
+                    for name, route_class in classes.items()
+                    for prefix in route_class.get("prefixes", ())
+                ),
+                key=lambda item: len(item[0]),
+                reverse=True,
+            )
+            self._exempt = tuple(exempt)
+            self._limits = {
+                name: AdaptiveLimit(
+                    name, route_class["max_in_flight"], min_limit, tolerance
+                )
+                for name, route_class in classes.items()
+                if route_class.get("max_in_flight") is not None
+            }
+            self._config = config
+        self._source = source
+        return config[0]
+
+    def classify(self, path):
+        """Route class of ``path``, or None if it is exempt."""
+        with self._lock:
+            self._configure()
+            return self._classify(path)
+
+    def _classify(self, path):
+        if path.startswith(self._exempt):
+            return None
+        for prefix, name in self._prefixes:
+            if path.startswith(prefix):
+                return name
+        return DEFAULT_CLASS
+
+    def acquire(self, path):
+        """
+        Admit a request for ``path``; raises Overloaded if it is over a limit.
+
+        Returns ``(counted, limit)``. An admitted request that is ``counted``
+        must be passed to release() with its AdaptiveLimit (None for classes
+        without one); exempt paths are not counted.
+        """
+        with self._lock:
+            max_in_flight = self._configure()
+            name = self._classify(path)
+            if name is None:
+                return False, None
+            limit = self._limits.get(name)
+            if limit is not None and limit.in_flight >= int(limit.limit):
+                limit.shed.inc()
+                shed_requests.inc()
+                raise Overloaded(limit.retry_after())
+            if max_in_flight is not None and self.in_flight >= max_in_flight:
+                shed_requests.inc()
+                raise Overloaded(limit.retry_after() if limit is not None else 1)
+            self.in_flight += 1
+            in_flight_gauge.set(self.in_flight)
+            if limit is not None:
+                limit.in_flight += 1
+            return True, limit
+
+    def release(self, limit, latency):
+        with self._lock:
+            self.in_flight -= 1
+            in_flight_gauge.set(self.in_flight)
+            if limit is not None and limit is self._limits.get(limit.name):
+                limit.in_flight -= 1
+                limit.update(latency)
+
+    def limit_for(self, name):
+        with self._lock:
+            self._configure()
+            return self._limits.get(name)
+
+    def reset(self):
+        with self._lock:
+            self._limits = {}
+            self._config = None
+            self._source = None
+            self.in_flight = 0
+
+
+admission_controller = AdmissionController()
+
+
+def overloaded(retry_after):
+    response = HttpResponse(SHED_BODY, status=503, content_type="application/json")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Answer 503 with Retry-After to requests over this worker's limits."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.controller = admission_controller
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not get_setting("ADMISSION_ENABLED"):
+            return self.get_response(request)
+        try:
+            counted, limit = self.controller.acquire(request.path_info)
+        except Overloaded as e:
+            return overloaded(e.retry_after)
+        if not counted:
+            return self.get_response(request)
+        started = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            self.controller.release(limit, time.monotonic() - started)
+
+    async def __acall__(self, request):
+        if not get_setting("ADMISSION_ENABLED"):
+            return await self.get_response(request)
+        try:
+            counted, limit = self.controller.acquire(request.path_info)
+        except Overloaded as e:
+            return overloaded(e.retry_after)
+        if not counted:
+            return await self.get_response(request)
+        started = time.monotonic()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.controller.release(limit, time.monotonic() - started)
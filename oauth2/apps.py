@@ -1,6 +1,51 @@
 from django.apps import AppConfig
 
 
+def start_background_services(warm_up=True):
+    """
+    Start the per-process snapshot publisher, change feed poller, read
+    replica monitor, ID worker lease and warm-up.
+
+    Called by the server entry points (myauthservice.wsgi / asgi, through
+    myauthservice.preload.boot), not from ``ready()``: management commands,
+    shells and test runs load the app too, and must not query a possibly
+    unmigrated database or wait on the warm-up. When the app is preloaded
+    they run in each worker after fork instead, since threads do not
+    survive fork, or on the first request of a process that never forks.
+    """
+    from .conf import get_setting
+
+    snapshot_path = get_setting("SNAPSHOT_PATH")
+    if snapshot_path and get_setting("SNAPSHOT_LEADER"):
+        from .snapshot import SnapshotPublisher
+
+        SnapshotPublisher(snapshot_path).start()
+
+    if get_setting("CHANGE_FEED_INTERVAL"):
+        from .changefeed import ChangeFeedPoller
+
+        ChangeFeedPoller().start()
+
+    if get_setting("CLIENT_SHARDS"):
+        from .sharding import IdLeaseKeeper
+
+        # Raises, refusing to start, when no worker id can be leased.
+        IdLeaseKeeper().start()
+
+    if get_setting("READ_REPLICAS"):
+        from .routers import ReplicaMonitor
+
+        ReplicaMonitor().start()
+
+    if warm_up and get_setting("WARMUP_ENABLED"):
+        from .warmup import start_warm_up
+
+        start_warm_up()
+
+
 class Oauth2Config(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "oauth2"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,181 @@
+"""
+Archiving of long-inactive clients.
+
+Deactivated clients are never served, but they stay in the client table and
+its indexes, which every lookup, scan and admin page pays for.
+``archive_clients`` moves them into ArchivedClient on the same database (and
+shard), and ``restore_clients`` moves them back with their key, secret and
+grants, still inactive. A client counts as inactive since its last change
+(``updated_at``), which deactivation stamps.
+
+Archiving deletes the client rows, so caches and edge exports see a deletion
+through the usual tombstones; for a client that was already inactive this
+changes nothing they serve.
+"""
+
+import time
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .sharding import shard_aliases
+
+
+def database_aliases():
+    """Databases holding client tables: every shard, or the default database."""
+    return shard_aliases() or [DEFAULT_DB_ALIAS]
+
+
+def archivable(using, days):
+    """Clients on ``using`` inactive for more than ``days`` days."""
+    from .models import Client
+
+    cutoff = timezone.now() - timedelta(days=days)
+    return Client.objects.using(using).filter(is_active=False, updated_at__lt=cutoff)
+
+
+def archive_clients(pks, using, days):
+    """
+    Archive the clients with primary keys ``pks`` on ``using`` that are still
+    inactive for more than ``days`` days; returns the number archived.
+    """
+    from .models import ArchivedClient, Client
+
+    Grant = Client.scopes.through
+    with transaction.atomic(using=using):
+        clients = list(archivable(using, days).filter(pk__in=pks).select_for_update())
+        if not clients:
+            return 0
+        scope_ids = {}
+        for client_pk, scope_id in (
+            Grant.objects.using(using)
+            .filter(client_id__in=[client.pk for client in clients])
+            .order_by("scope_id")
+            .values_list("client_id", "scope_id")
+        ):
+            scope_ids.setdefault(client_pk, []).append(scope_id)
+
+        ArchivedClient.objects.using(using).bulk_create(
+            ArchivedClient(
+                id=client.pk,
+                client_id=client.client_id,
+                client_secret=client.client_secret,
+                client_type=client.client_type,
+                name=client.name,
+                description=client.description,
+                redirect_uris=client.redirect_uris,
+                scope_ids=scope_ids.get(client.pk, []),
+                rate_limit=client.rate_limit,
+                rate_limit_burst=client.rate_limit_burst,
+                created_at=client.created_at,
+                updated_at=client.updated_at,
+            )
+            for client in clients
+        )
+        Client.objects.using(using).filter(
+            pk__in=[client.pk for client in clients]
+        ).delete()
+    return len(clients)
+
+
+def restore_clients(archived):
+    """Move ArchivedClient rows back into the client table; returns the clients."""
+    from .models import Client
+
+    restored = []
+    for row in archived:
+        using = row._state.db
+        with transaction.atomic(using=using):
+            client = Client(
+                pk=row.pk,
+                client_id=row.client_id,
+                client_secret=row.client_secret,
+                client_type=row.client_type,
+                name=row.name,
+                description=row.description,
+                redirect_uris=row.redirect_uris,
+                is_active=False,
+                rate_limit=row.rate_limit,
+                rate_limit_burst=row.rate_limit_burst,
+            )
+            client.save(force_insert=True, using=using)
+            # auto_now_add stamped the restore time.
+            Client.objects.using(using).filter(pk=client.pk).update(
+                created_at=row.created_at
+            )
+            client.created_at = row.created_at
+            client.scopes.set(row.scope_ids)
+            row.delete()
+        restored.append(client)
+    return restored
+
+
+def measure(using, repeat=3):
+    """
+    Return size and query timings of the client table on ``using``.
+
+    The timings are the best of ``repeat`` runs of a full count (the admin
+    changelist) and of a scan of active clients (warm-up and exports).
+    """
+    from .models import Client
+
+    def best(func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return round(min(timings) * 1e3, 3)
+
+    clients = Client.objects.using(using)
+    active = clients.filter(is_active=True).values_list("client_id", "redirect_uris")
+    return {
+        "rows": clients.count(),
+        "table_bytes": table_size(using, Client._meta.db_table),
+        "count_ms": best(clients.count),
+        "scan_active_ms": best(lambda: sum(1 for _ in active.iterator(2000))),
+    }
+
+
+def table_size(using, table):
+    """Data plus index bytes of ``table``, or None where the backend cannot tell."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute(f"ANALYZE TABLE {connection.ops.quote_name(table)}")
+            cursor.fetchall()
+            cursor.execute(
+                "SELECT data_length + index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s "
+                    "OR name IN (SELECT name FROM sqlite_master "
+                    "WHERE type = 'index' AND tbl_name = %s)",
+                    [table, table],
+                )
+            except Exception:
+                # SQLite built without the dbstat table.
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+def reclaim_space(using):
+    """Give the space freed by archiving back so the table and indexes shrink."""
+    from .models import Client
+
+    connection = connections[using]
+    table = connection.ops.quote_name(Client._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute(f"OPTIMIZE TABLE {table}")
+            cursor.fetchall()
+        elif connection.vendor == "sqlite" and not connection.in_atomic_block:
+            cursor.execute("VACUUM")
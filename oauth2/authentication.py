@@ -0,0 +1,109 @@
+"""
+Client authentication (RFC 6749 Section 2.3.1) for token-style endpoints.
+
+``authenticate_client`` takes credentials from HTTP Basic or the request
+body and checks them against the registry entry. Before the client is
+looked up or its secret hashed, it refuses source addresses, and client_ids
+from a given address, that failed too often recently (oauth2.lockout), so
+credential stuffing costs a dict lookup per attempt instead of a hash
+verification. A client_id is only locked for the addresses that failed, so
+an attacker cannot lock a client out everywhere by guessing its secret.
+
+Behind reverse proxies, REMOTE_ADDR is the nearest proxy's address, shared
+by every client; with AUTH_TRUSTED_PROXY_HOPS set to the number of proxies,
+the source address is read from X-Forwarded-For instead (``client_address``).
+"""
+
+import base64
+import binascii
+from urllib.parse import unquote_plus
+
+from .conf import get_setting
+from .lockout import address_failures, client_failures, lockout_refusals
+from .registry import client_registry
+
+
+class ClientAuthError(Exception):
+    """Failed client authentication, reported as ``invalid_client``."""
+
+    error = "invalid_client"
+
+    def __init__(self, description, retry_after=None):
+        self.description = description
+        self.retry_after = retry_after
+        super().__init__(description)
+
+    def as_dict(self):
+        return {"error": self.error, "error_description": self.description}
+
+
+def client_credentials(request):
+    """
+    Return ``(client_id, client_secret)`` from HTTP Basic credentials or the
+    ``client_id`` / ``client_secret`` form parameters; missing parts are None.
+    """
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if scheme.lower() == "basic":
+        try:
+            decoded = base64.b64decode(credentials.strip(), validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            return None, None
+        client_id, sep, secret = decoded.partition(":")
+        if not sep:
+            return None, None
+        return unquote_plus(client_id) or None, unquote_plus(secret) or None
+    return (
+        request.POST.get("client_id") or None,
+        request.POST.get("client_secret") or None,
+    )
+
+
+def client_address(request):
+    """
+    Return the request's source address: REMOTE_ADDR, or with
+    AUTH_TRUSTED_PROXY_HOPS proxies in front, the X-Forwarded-For entry the
+    outermost of them appended. Entries left of it are client-supplied.
+    """
+    hops = get_setting("AUTH_TRUSTED_PROXY_HOPS")
+    if hops:
+        forwarded = [
+            address.strip()
+            for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+            if address.strip()
+        ]
+        if forwarded:
+            # Fewer entries than proxies: the request skipped the outer ones,
+            # so the leftmost entry is the closest thing to its source.
+            return forwarded[-min(hops, len(forwarded))]
+    return request.META.get("REMOTE_ADDR")
+
+
+def authenticate_client(request):
+    """Return the ClientEntry the request authenticates as; raises ClientAuthError."""
+    client_id, secret = client_credentials(request)
+    if client_id is None:
+        raise ClientAuthError("Client authentication is required.")
+
+    address = client_address(request)
+    attempt = (client_id, address)
+    locked_for = max(
+        client_failures.locked_for(attempt),
+        address_failures.locked_for(address) if address else 0.0,
+    )
+    if locked_for:
+        lockout_refusals.inc()
+        raise ClientAuthError(
+            "Too many failed authentication attempts.", retry_after=locked_for
+        )
+
+    entry = client_registry.get(client_id)
+    if entry is not None and (
+        entry.check_secret(secret) if entry.is_confidential else secret is None
+    ):
+        client_failures.clear(attempt)
+        return entry
+
+    client_failures.record(attempt)
+    if address:
+        address_failures.record(address)
+    raise ClientAuthError("Client authentication failed.")
@@ -0,0 +1,363 @@
+"""
+Client change feed for converging per-node caches without a message broker.
+
+Changes are read with keyset pagination over ``(updated_at, id)`` on Client
+and ``(deleted_at, id)`` on ClientTombstone. Only rows older than
+``CHANGE_FEED_SETTLE`` seconds are returned, so a transaction that commits
+shortly after stamping ``updated_at`` is not skipped by a cursor that has
+already moved past it. With CLIENT_SHARDS, every shard is read and the
+rows are merged; keys are unique across shards, so the cursor stays valid.
+
+Tombstones are kept for ``CHANGE_FEED_RETENTION`` seconds. ``prune_tombstones``
+deletes older ones but keeps the newest of them as a watermark: a cursor
+that has not read past it may have missed a pruned delete, so reading from
+it raises CursorExpired and the consumer has to resync from scratch.
+"""
+
+import base64
+import binascii
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .conf import get_setting
+from .entries import ENTRY_FIELDS, ClientEntry, group_scope_rows
+from .metrics import metrics
+from .registry import client_registry
+from .scopes import scope_registry
+from .sharding import is_sharded
+
+logger = logging.getLogger(__name__)
+
+changefeed_lag = metrics.gauge(
+    "oauth2_changefeed_lag_seconds",
+    "Delay between a client change and this node applying it (last batch max).",
+)
+changefeed_last_poll = metrics.gauge(
+    "oauth2_changefeed_last_poll_timestamp",
+    "Unix time of the last successful change feed poll.",
+)
+changefeed_changes = metrics.counter(
+    "oauth2_changefeed_changes_total", "Client changes applied from the change feed."
+)
+changefeed_errors = metrics.counter(
+    "oauth2_changefeed_errors_total", "Failed change feed polls."
+)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorExpired(InvalidCursor):
+    """The cursor is older than the retained tombstones; resync from scratch."""
+
+
+def _to_micros(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+class Cursor:
+    """Position in the change feed; opaque to API consumers."""
+
+    __slots__ = ("updated_at", "client_pk", "deleted_at", "tombstone_pk")
+
+    def __init__(self, updated_at, client_pk, deleted_at, tombstone_pk):
+        self.updated_at = updated_at
+        self.client_pk = client_pk
+        self.deleted_at = deleted_at
+        self.tombstone_pk = tombstone_pk
+
+    @classmethod
+    def start(cls):
+        """Cursor before every change."""
+        return cls(EPOCH, 0, EPOCH, 0)
+
+    @classmethod
+    def at(cls, moment):
+        """Cursor that skips changes made before ``moment``."""
+        return cls(moment, 0, moment, 0)
+
+    def encode(self):
+        payload = [
+            _to_micros(self.updated_at),
+            self.client_pk,
+            _to_micros(self.deleted_at),
+            self.tombstone_pk,
+        ]
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value):
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            updated_at, client_pk, deleted_at, tombstone_pk = json.loads(raw)
+            return cls(
+                _from_micros(updated_at),
+                int(client_pk),
+                _from_micros(deleted_at),
+                int(tombstone_pk),
+            )
+        except (binascii.Error, ValueError, TypeError, OverflowError) as e:
+            raise InvalidCursor(f"Malformed change feed cursor: {value!r}") from e
+
+    def __eq__(self, other):
+        return isinstance(other, Cursor) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return f"Cursor({self.encode()})"
+
+
+class ChangeBatch:
+    def __init__(self, upserts, deletes, cursor, has_more):
+        # ClientEntry objects (active or not) for created or changed clients.
+        self.upserts = upserts
+        # client_ids of deleted clients.
+        self.deletes = deletes
+        self.cursor = cursor
+        self.has_more = has_more
+
+    def __len__(self):
+        return len(self.upserts) + len(self.deletes)
+
+
+def _after(field, moment, pk):
+    return Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "pk__gt": pk})
+
+
+def _before(field, moment, pk):
+    return Q(**{f"{field}__lt": moment}) | Q(**{field: moment, "pk__lt": pk})
+
+
+def _on_primary(model, using):
+    # Sharded tables are read from every shard; each shard is a primary.
+    return model.objects.all() if is_sharded() else model.objects.using(using)
+
+
+def changes_since(cursor=None, limit=500, using="default"):
+    """Return the next batch of client changes after ``cursor``."""
+    from .models import Client, ClientTombstone
+
+    cursor = cursor or Cursor.start()
+    _check_retention(cursor, using)
+    settled = timezone.now() - timedelta(seconds=get_setting("CHANGE_FEED_SETTLE"))
+
+    page = list(
+        _on_primary(Client, using)
+        .filter(_after("updated_at", cursor.updated_at, cursor.client_pk))
+        .filter(updated_at__lte=settled)
+        .order_by("updated_at", "pk")
+        .values_list("pk", "updated_at")[:limit]
+    )
+    upserts = []
+    updated_at, client_pk = cursor.updated_at, cursor.client_pk
+    if page:
+        updated_at, client_pk = page[-1][1], page[-1][0]
+        rows = (
+            _on_primary(Client, using)
+            .filter(pk__in=[pk for pk, _ in page])
+            .order_by("id")
+            .values(*ENTRY_FIELDS)
+        )
+        upserts = [
+            ClientEntry.from_values(row, scope_mask)
+            for row, scope_mask in group_scope_rows(rows)
+        ]
+
+    tombstones = list(
+        _on_primary(ClientTombstone, using)
+        .filter(_after("deleted_at", cursor.deleted_at, cursor.tombstone_pk))
+        .filter(deleted_at__lte=settled)
+        .order_by("deleted_at", "pk")
+        .values_list("pk", "deleted_at", "client_id")[:limit]
+    )
+    deleted_at, tombstone_pk = cursor.deleted_at, cursor.tombstone_pk
+    if tombstones:
+        tombstone_pk, deleted_at, _ = tombstones[-1]
+
+    return ChangeBatch(
+        upserts=upserts,
+        deletes=[client_id for _, _, client_id in tombstones],
+        cursor=Cursor(updated_at, client_pk, deleted_at, tombstone_pk),
+        has_more=len(page) == limit or len(tombstones) == limit,
+    )
+
+
+def _check_retention(cursor, using):
+    # A full read from the start sees every live client, so it cannot miss
+    # a delete; other cursors must not be behind the oldest tombstone once
+    # that is past retention, as older ones may have been pruned.
+    retention = get_setting("CHANGE_FEED_RETENTION")
+    if retention is None or cursor == Cursor.start():
+        return
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    if cursor.deleted_at >= cutoff:
+        return
+    from .models import ClientTombstone
+
+    oldest = (
+        _on_primary(ClientTombstone, using)
+        .filter(deleted_at__lt=cutoff)
+        .order_by("deleted_at", "pk")
+        .values_list("deleted_at", "pk")
+        .first()
+    )
+    if oldest is not None and (cursor.deleted_at, cursor.tombstone_pk) < oldest:
+        raise CursorExpired(
+            "The change feed cursor is older than CHANGE_FEED_RETENTION."
+        )
+
+
+def prune_tombstones(using="default"):
+    """
+    Delete tombstones older than ``CHANGE_FEED_RETENTION`` seconds except the
+    newest of them, which stays as the watermark expiring older cursors.
+    Returns the number deleted.
+    """
+    from .models import ClientTombstone
+
+    retention = get_setting("CHANGE_FEED_RETENTION")
+    if retention is None:
+        return 0
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    tombstones = _on_primary(ClientTombstone, using)
+    watermark = (
+        tombstones.filter(deleted_at__lt=cutoff)
+        .order_by("-deleted_at", "-pk")
+        .values_list("deleted_at", "pk")
+        .first()
+    )
+    if watermark is None:
+        return 0
+    deleted, _ = tombstones.filter(_before("deleted_at", *watermark)).delete()
+    return deleted
+
+
+def latest_cursor(using="default"):
+    """Return the cursor just past the newest settled change."""
+    from .models import Client, ClientTombstone
+
+    settled = timezone.now() - timedelta(seconds=get_setting("CHANGE_FEED_SETTLE"))
+    client = (
+        _on_primary(Client, using)
+        .filter(updated_at__lte=settled)
+        .order_by("-updated_at", "-pk")
+        .values_list("updated_at", "pk")
+        .first()
+    )
+    tombstone = (
+        _on_primary(ClientTombstone, using)
+        .filter(deleted_at__lte=settled)
+        .order_by("-deleted_at", "-pk")
+        .values_list("deleted_at", "pk")
+        .first()
+    )
+    return Cursor(*(client or (EPOCH, 0)), *(tombstone or (EPOCH, 0)))
+
+
+def scope_signature(using="default"):
+    from .models import Scope
+
+    return Scope.objects.using(using).aggregate(count=Count("id"), last=Max("id"))
+
+
+class ChangeFeedPoller:
+    """
+    Applies change feed deltas to this node's caches.
+
+    Every ``CHANGE_FEED_INTERVAL`` seconds the poller drains new changes:
+    changed or deleted clients are dropped from the registry (and bypass the
+    shared snapshot) so the next lookup reloads them, and the scope mapping
+    is reloaded when scopes were added elsewhere. New client_ids reach the
+    client_id filter through its own top-ups.
+    """
+
+    def __init__(self, cursor=None, registry=client_registry):
+        self.cursor = cursor
+        self.registry = registry
+        self._scopes = None
+        self._stop = threading.Event()
+
+    def poll(self):
+        """Drain all pending changes; returns the number applied."""
+        if self.cursor is None:
+            self.cursor = self._now_cursor()
+
+        signature = scope_signature()
+        if self._scopes is not None and signature != self._scopes:
+            scope_registry.clear()
+            self.registry.clear()
+        self._scopes = signature
+
+        applied = 0
+        lag = 0.0
+        limit = get_setting("CHANGE_FEED_BATCH_SIZE")
+        while True:
+            try:
+                batch = changes_since(self.cursor, limit=limit)
+            except CursorExpired:
+                # Deletes may have been missed: drop everything cached and
+                # follow the feed from now on.
+                logger.warning("Change feed cursor expired; clearing the registry")
+                self.registry.clear()
+                self.cursor = self._now_cursor()
+                continue
+            now = timezone.now()
+            for entry in batch.upserts:
+                self.registry.invalidate(entry.client_id)
+                lag = max(lag, (now - entry.updated_at).total_seconds())
+            for client_id in batch.deletes:
+                # Deleted IDs stay in the client_id filter: removing a
+                # fingerprint this node already removed could evict another
+                # client's, while a stale one only costs a database lookup.
+                self.registry.invalidate(client_id)
+            applied += len(batch)
+            self.cursor = batch.cursor
+            if not batch.has_more:
+                break
+
+        if applied:
+            changefeed_changes.inc(applied)
+            changefeed_lag.set(round(lag, 3))
+        changefeed_last_poll.set(round(time.time(), 3))
+        return applied
+
+    @staticmethod
+    def _now_cursor():
+        settle = get_setting("CHANGE_FEED_SETTLE")
+        return Cursor.at(timezone.now() - timedelta(seconds=settle))
+
+    def run(self):
+        while not self._stop.wait(get_setting("CHANGE_FEED_INTERVAL")):
+            try:
+                self.poll()
+            except Exception:
+                changefeed_errors.inc()
+                logger.exception("Client change feed poll failed")
+            finally:
+                connections.close_all()
+
+    def start(self):
+        thread = threading.Thread(
+            target=self.run, name="oauth2-changefeed", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
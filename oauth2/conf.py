@@ -0,0 +1,142 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # Seconds a compiled client entry stays in the per-worker registry.
+    "CLIENT_CACHE_TTL": 300,
+    # XFetch beta for probabilistic early refresh of cached clients; larger
+    # values refresh earlier, 0 disables early refresh.
+    "CLIENT_CACHE_EARLY_REFRESH_BETA": 1.0,
+    # Reject unknown client_ids from a per-worker cuckoo filter before
+    # querying the database.
+    "CLIENT_FILTER_ENABLED": False,
+    # Seconds between top-up queries for clients created by other processes.
+    "CLIENT_FILTER_REFRESH_INTERVAL": 5,
+    # Seconds between full rebuilds of the client_id filter.
+    "CLIENT_FILTER_REBUILD_INTERVAL": 600,
+    "CLIENT_FILTER_MIN_CAPACITY": 1024,
+    # Preload clients, scopes and the client_id filter when the app starts.
+    "WARMUP_ENABLED": False,
+    # Seconds startup waits for the warm-up before continuing in the background.
+    "WARMUP_BUDGET": 2.0,
+    # Rows fetched per round trip by the warm-up query.
+    "WARMUP_CHUNK_SIZE": 2000,
+    # Memory-mapped client snapshot shared by the workers of one host;
+    # None disables it.
+    "SNAPSHOT_PATH": None,
+    # Whether this process competes to rebuild the snapshot (leader election
+    # through a lock file next to it).
+    "SNAPSHOT_LEADER": True,
+    # Seconds between checks for a newly published snapshot.
+    "SNAPSHOT_CHECK_INTERVAL": 1.0,
+    # Seconds between snapshot rebuilds by the leader.
+    "SNAPSHOT_REBUILD_INTERVAL": 30,
+    # Seconds between change feed polls that sync this node's caches with
+    # client changes made elsewhere; None disables the poller.
+    "CHANGE_FEED_INTERVAL": None,
+    # Changes younger than this many seconds are held back so transactions
+    # committing late are not skipped by the cursor.
+    "CHANGE_FEED_SETTLE": 2.0,
+    "CHANGE_FEED_BATCH_SIZE": 500,
+    # Seconds client tombstones are kept before prune_client_tombstones (or
+    # archive_clients) deletes them. Change feed and export delta cursors
+    # older than this get "resync required"; None keeps tombstones forever.
+    "CHANGE_FEED_RETENTION": 30 * 24 * 3600,
+    # Bearer tokens accepted from trusted platform services on machine
+    # endpoints such as the change feed.
+    "PLATFORM_API_TOKENS": [],
+    # Serialized documents kept per worker for /api/clients/<client_id>/.
+    "CLIENT_METADATA_CACHE_SIZE": 10000,
+    # Most clients accepted by one /api/register/batch/ request.
+    "REGISTRATION_BATCH_LIMIT": 1000,
+    # HMAC key signing edge exports at /api/clients/export/; the export
+    # endpoints are disabled while it is unset.
+    "EDGE_EXPORT_SIGNING_KEY": None,
+    # Seconds a built export is reused (and may be cached by gateways).
+    "EDGE_EXPORT_TTL": 30,
+    # /api/ready/: seconds each dependency probe may take, and how long the
+    # aggregate result is reused before probing again.
+    "READY_PROBE_TIMEOUT": 1.0,
+    "READY_CACHE_TTL": 0.3,
+    # Database aliases serving oauth2 reads through oauth2.routers.ReplicaRouter
+    # (listed in DATABASE_ROUTERS); empty reads everything from the primary.
+    "READ_REPLICAS": [],
+    # Seconds between read replica health checks.
+    "REPLICA_CHECK_INTERVAL": 5.0,
+    # Clients changed within this many seconds are loaded from the primary,
+    # so a worker does not cache the old row from a lagging replica.
+    "REPLICA_PIN_SECONDS": 5.0,
+    # Request paths whose oauth2 reads always go to the primary.
+    "PRIMARY_PINNED_PATHS": ["/admin/"],
+    # Database aliases Client rows are hash-sharded across by client_id
+    # (oauth2.sharding, with oauth2.routers.ShardRouter); empty disables
+    # sharding.
+    "CLIENT_SHARDS": [],
+    # Look clients missing from their shard up on every shard; enable while
+    # rebalance_client_shards moves clients after the shard list changed.
+    "CLIENT_SHARD_FALLBACK": False,
+    # Seconds a process leases its worker id (0-1023) for the primary keys
+    # of sharded rows from the default database; renewed every third of it.
+    "ID_WORKER_LEASE": 300,
+    # Per-client token bucket (oauth2.ratelimit): requests per minute and
+    # burst size for clients without their own rate_limit / rate_limit_burst.
+    # A RATE_LIMIT_DEFAULT of None leaves those clients unlimited.
+    "RATE_LIMIT_DEFAULT": 600,
+    "RATE_LIMIT_BURST": 60,
+    # Cache alias holding bucket state shared by all workers; None keeps it
+    # per worker, for at most RATE_LIMIT_MAX_CLIENTS clients.
+    "RATE_LIMIT_CACHE": None,
+    "RATE_LIMIT_MAX_CLIENTS": 100_000,
+    # Client authentication lockout (oauth2.lockout): a client_id failing
+    # this many times from one source address, or an address failing this
+    # many times for any client_ids, within AUTH_LOCKOUT_WINDOW seconds is
+    # refused until the oldest failure leaves the window; None disables it.
+    "AUTH_LOCKOUT_CLIENT_FAILURES": 10,
+    "AUTH_LOCKOUT_ADDRESS_FAILURES": 50,
+    "AUTH_LOCKOUT_WINDOW": 300,
+    # The source address is REMOTE_ADDR, which behind a load balancer is the
+    # balancer's own and shared by every client: set this to the number of
+    # reverse proxies in front of the service to read it from
+    # X-Forwarded-For instead. 0 trusts no proxy.
+    "AUTH_TRUSTED_PROXY_HOPS": 0,
+    # Bound on tracked keys, and seconds between sweeps of expired ones.
+    "AUTH_LOCKOUT_MAX_KEYS": 100_000,
+    "AUTH_LOCKOUT_COMPACT_INTERVAL": 60,
+    # Admission control (oauth2.admission.AdmissionControlMiddleware):
+    # requests over this worker's in-flight limits are answered 503 with
+    # Retry-After. ADMISSION_MAX_IN_FLIGHT caps all counted requests (None
+    # for no cap).
+    "ADMISSION_ENABLED": True,
+    "ADMISSION_MAX_IN_FLIGHT": 128,
+    # Route classes by path prefix (longest wins; unmatched paths are
+    # "default") and the most requests of each in flight per worker. The
+    # limit adapts between ADMISSION_MIN_LIMIT and max_in_flight as latency
+    # rises past ADMISSION_LATENCY_TOLERANCE times its baseline; a
+    # max_in_flight of None leaves the class to the worker cap alone.
+    "ADMISSION_ROUTE_CLASSES": {
+        "token": {"prefixes": ["/api/token/", "/oauth/token/"], "max_in_flight": 64},
+        "introspect": {
+            "prefixes": ["/api/introspect/", "/oauth/introspect/"],
+            "max_in_flight": 64,
+        },
+        "admin": {"prefixes": ["/admin/"], "max_in_flight": 8},
+        "default": {"max_in_flight": 64},
+    },
+    "ADMISSION_MIN_LIMIT": 4,
+    "ADMISSION_LATENCY_TOLERANCE": 2.0,
+    # Paths never shed or counted: load balancer probes and metrics.
+    "ADMISSION_EXEMPT_PATHS": [
+        "/api/health/",
+        "/api/ready/",
+        "/api/version/",
+        "/api/metrics/",
+    ],
+    # Serve in-process metrics at /api/metrics/ (Prometheus text format).
+    "METRICS_ENABLED": False,
+    # Maximum number of distinct scope strings remembered by the scope parser.
+    "SCOPE_PARSE_CACHE_SIZE": 1024,
+}
+
+
+def get_setting(name):
+    """Return an OAUTH2 setting, falling back to the app default."""
+    return getattr(settings, "OAUTH2", {}).get(name, DEFAULTS[name])
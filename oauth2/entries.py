@@ -0,0 +1,148 @@
+"""
+Compiled client entries shared by the registry, warm-up and snapshot.
+
+Entries are what the token and authorization paths see instead of Client
+instances: immutable ``__slots__`` records built from ``values()`` rows, so
+a cached client carries no model state, descriptors or per-instance dict
+(see benchmarks/bench_client_entries.py).
+"""
+
+import hashlib
+import hmac
+
+# Columns needed to compile entries straight from ``Client.objects.values()``,
+# joined with the granted scope bits (one row per client and scope).
+ENTRY_FIELDS = [
+    "id",
+    "client_id",
+    "client_type",
+    "client_secret",
+    "redirect_uris",
+    "is_active",
+    "rate_limit",
+    "rate_limit_burst",
+    "created_at",
+    "updated_at",
+    "scopes__bit",
+]
+
+
+def hash_secret(secret):
+    return hashlib.sha256(secret.encode()).digest()
+
+
+def group_scope_rows(rows):
+    """
+    Fold the per-scope rows of an ENTRY_FIELDS query back into one per client.
+
+    ``rows`` must be ordered by ``id``. Yields ``(row, scope_mask)`` pairs.
+    """
+    current = None
+    scope_mask = 0
+    for row in rows:
+        if current is not None and row["id"] != current["id"]:
+            yield current, scope_mask
+            current = None
+        if current is None:
+            current = row
+            scope_mask = 0
+        if row["scopes__bit"] is not None:
+            scope_mask |= 1 << row["scopes__bit"]
+    if current is not None:
+        yield current, scope_mask
+
+
+class ClientEntry:
+    """Compiled, read-only view of an active Client."""
+
+    __slots__ = (
+        "client_id",
+        "client_type",
+        "secret_hash",
+        "redirect_uris",
+        "scope_mask",
+        "is_active",
+        "updated_at",
+        "rate_limit",
+        "rate_limit_burst",
+    )
+
+    def __init__(
+        self,
+        client_id,
+        client_type,
+        secret_hash,
+        redirect_uris,
+        scope_mask,
+        is_active=True,
+        updated_at=None,
+        rate_limit=None,
+        rate_limit_burst=None,
+    ):
+        init = object.__setattr__
+        init(self, "client_id", client_id)
+        init(self, "client_type", client_type)
+        init(self, "secret_hash", secret_hash)
+        init(self, "redirect_uris", frozenset(redirect_uris))
+        init(self, "scope_mask", scope_mask)
+        init(self, "is_active", is_active)
+        init(self, "updated_at", updated_at)
+        init(self, "rate_limit", rate_limit)
+        init(self, "rate_limit_burst", rate_limit_burst)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f"<ClientEntry {self.client_id} ({self.client_type})>"
+
+    @classmethod
+    def from_client(cls, client):
+        scope_mask = 0
+        for bit in client.scopes.values_list("bit", flat=True):
+            scope_mask |= 1 << bit
+
+        return cls(
+            client_id=client.client_id,
+            client_type=client.client_type,
+            secret_hash=(
+                hash_secret(client.client_secret) if client.client_secret else None
+            ),
+            redirect_uris=client.redirect_uris,
+            scope_mask=scope_mask,
+            is_active=client.is_active,
+            updated_at=client.updated_at,
+            rate_limit=client.rate_limit,
+            rate_limit_burst=client.rate_limit_burst,
+        )
+
+    @classmethod
+    def from_values(cls, row, scope_mask):
+        """Build an entry from a ``Client.objects.values()`` row."""
+        secret = row["client_secret"]
+        return cls(
+            client_id=row["client_id"],
+            client_type=row["client_type"],
+            secret_hash=hash_secret(secret) if secret else None,
+            redirect_uris=row["redirect_uris"],
+            scope_mask=scope_mask,
+            is_active=row["is_active"],
+            updated_at=row["updated_at"],
+            rate_limit=row["rate_limit"],
+            rate_limit_burst=row["rate_limit_burst"],
+        )
+
+    @property
+    def is_confidential(self):
+        return self.client_type == "confidential"
+
+    def check_secret(self, secret):
+        if self.secret_hash is None or not secret:
+            return False
+        return hmac.compare_digest(hash_secret(secret), self.secret_hash)
+
+    def is_valid_redirect_uri(self, uri):
+        return uri in self.redirect_uris
@@ -0,0 +1,193 @@
+"""
+Signed client exports for API gateways validating requests at the edge.
+
+A gateway downloads one full snapshot, then stays current by fetching delta
+documents from the version it holds. Versions are change feed cursors, so a
+delta is exactly the change feed since that snapshot.
+
+Snapshot layout (little-endian):
+
+    header   magic "OA2E", format, count, built_at (epoch microseconds),
+             u16 len + version
+    records  u16 len + client_id, u8 client type,
+             u16 redirect URI count, then u16 len + URI for each
+             (active clients only, sorted by client_id)
+    trailer  32-byte HMAC-SHA256 of everything before it
+
+Delta documents are JSON; their HMAC-SHA256 is sent in the
+``X-Content-Signature: sha256=<hex>`` header. Both use EDGE_EXPORT_SIGNING_KEY.
+"""
+
+import hashlib
+import hmac
+import json
+import struct
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .changefeed import Cursor, changes_since, latest_cursor
+from .conf import get_setting
+from .singleflight import SingleFlight
+
+MAGIC = b"OA2E"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIq")  # magic, format, count, built_at
+U16 = struct.Struct("<H")
+CLIENT_TYPES = ("confidential", "public")
+SIGNATURE_SIZE = 32
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _encode_str(value):
+    data = value.encode()
+    return U16.pack(len(data)) + data
+
+
+def sign(data, key=None):
+    key = key or get_setting("EDGE_EXPORT_SIGNING_KEY")
+    return hmac.new(key.encode(), data, hashlib.sha256).digest()
+
+
+def encode_export(rows, version, key=None):
+    """Serialize ``(client_id, client_type, redirect_uris)`` rows and sign them."""
+    records = []
+    for client_id, client_type, redirect_uris in rows:
+        parts = [
+            _encode_str(client_id),
+            bytes([CLIENT_TYPES.index(client_type)]),
+            U16.pack(len(redirect_uris)),
+        ]
+        parts.extend(_encode_str(uri) for uri in sorted(redirect_uris))
+        records.append(b"".join(parts))
+
+    built_at = (datetime.now(dt_timezone.utc) - EPOCH) // timedelta(microseconds=1)
+    body = b"".join(
+        [
+            HEADER.pack(MAGIC, FORMAT_VERSION, len(records), built_at),
+            _encode_str(version),
+            *records,
+        ]
+    )
+    return body + sign(body, key)
+
+
+def decode_export(data, key=None):
+    """
+    Verify and parse an export; returns ``(version, {client_id: (type, uris)})``.
+
+    This is the reference reader for gateway implementations.
+    """
+    body, signature = data[:-SIGNATURE_SIZE], data[-SIGNATURE_SIZE:]
+    if not hmac.compare_digest(sign(body, key), signature):
+        raise ValueError("Export signature mismatch")
+
+    magic, fmt, count, _ = HEADER.unpack_from(body, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise ValueError("Not a client export")
+
+    offset = HEADER.size
+
+    def read_str():
+        nonlocal offset
+        (length,) = U16.unpack_from(body, offset)
+        offset += U16.size + length
+        return body[offset - length : offset].decode()
+
+    version = read_str()
+    clients = {}
+    for _ in range(count):
+        client_id = read_str()
+        client_type = CLIENT_TYPES[body[offset]]
+        offset += 1
+        (uri_count,) = U16.unpack_from(body, offset)
+        offset += U16.size
+        clients[client_id] = (
+            client_type,
+            frozenset(read_str() for _ in range(uri_count)),
+        )
+    return version, clients
+
+
+def build_export():
+    """Return ``(version, signed bytes)`` for all active clients."""
+    from .models import Client
+
+    # Taking the version before reading makes the export at least as new as
+    # its version; replaying deltas from it is idempotent. The version only
+    # moves when clients change, so unchanged exports keep their ETag.
+    version = latest_cursor().encode()
+    rows = (
+        Client.objects.filter(is_active=True)
+        .order_by("client_id")
+        .values_list("client_id", "client_type", "redirect_uris")
+        .iterator(chunk_size=2000)
+    )
+    return version, encode_export(rows, version)
+
+
+class ExportCache:
+    """Per-worker cache of the latest export, rebuilt every EDGE_EXPORT_TTL seconds."""
+
+    def __init__(self):
+        self._current = None
+        self._built_at = 0.0
+        self._flight = SingleFlight()
+
+    def get(self):
+        current = self._current
+        if current is None or time.monotonic() - self._built_at >= get_setting(
+            "EDGE_EXPORT_TTL"
+        ):
+            current = self._flight.do("export", self._rebuild)
+        return current
+
+    def _rebuild(self):
+        version, data = build_export()
+        # built_at (in the fixed header) is left out so rebuilding an
+        # unchanged export keeps its ETag; keying it changes it on key rotation.
+        etag = '"%s"' % sign(data[HEADER.size : -SIGNATURE_SIZE])[:16].hex()
+        self._current = (version, data, etag)
+        self._built_at = time.monotonic()
+        return self._current
+
+    def reset(self):
+        self._current = None
+        self._built_at = 0.0
+
+
+def build_delta(since, limit=1000):
+    """
+    Return ``(document bytes, signature)`` with client changes after ``since``.
+
+    Clients that became inactive are listed as removed, because exports only
+    contain active clients.
+    """
+    batch = changes_since(Cursor.decode(since), limit=limit)
+    upserts = []
+    removed = list(batch.deletes)
+    for entry in batch.upserts:
+        if entry.is_active:
+            upserts.append(
+                {
+                    "client_id": entry.client_id,
+                    "client_type": entry.client_type,
+                    "redirect_uris": sorted(entry.redirect_uris),
+                }
+            )
+        else:
+            removed.append(entry.client_id)
+
+    document = {
+        "from": since,
+        "to": batch.cursor.encode(),
+        "upserts": upserts,
+        "removed": removed,
+        "has_more": batch.has_more,
+    }
+    data = json.dumps(document, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    return data, sign(data)
+
+
+export_cache = ExportCache()
@@ -0,0 +1,394 @@
+"""
+Approximate membership of known ``client_id`` values.
+
+A cuckoo filter answers "definitely unknown" without touching the database,
+so lookups for random or mistyped client IDs can be rejected immediately.
+Unlike a Bloom filter it supports deletion, which keeps it accurate as
+clients are removed.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from array import array
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import connections, transaction
+
+from .conf import get_setting
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+filter_rejections = metrics.counter(
+    "oauth2_client_filter_rejections_total",
+    "Client lookups rejected by the client_id filter without a database query.",
+)
+filter_false_positives = metrics.counter(
+    "oauth2_client_filter_false_positives_total",
+    "Client lookups that passed the client_id filter but matched no active client.",
+)
+filter_size = metrics.gauge(
+    "oauth2_client_filter_size",
+    "Number of client_ids held by the client_id filter.",
+)
+filter_rebuild_seconds = metrics.gauge(
+    "oauth2_client_filter_rebuild_seconds",
+    "Duration of the last full client_id filter rebuild.",
+)
+
+
+class FilterFull(Exception):
+    """Raised when an item cannot be placed without exceeding the kick limit."""
+
+
+class CuckooFilter:
+    """
+    Cuckoo filter with 4-slot buckets and 16-bit fingerprints.
+
+    Slots are stored in a flat ``array('H')`` (2 bytes per slot, 0 = empty),
+    which keeps a filter for a million IDs at roughly 2.5 MB with a false
+    positive rate around 0.01%.
+    """
+
+    BUCKET_SIZE = 4
+    MAX_KICKS = 500
+    LOAD_FACTOR = 0.9
+
+    def __init__(self, capacity):
+        buckets = 1
+        while buckets * self.BUCKET_SIZE * self.LOAD_FACTOR < capacity:
+            buckets <<= 1
+        self.num_buckets = buckets
+        self._mask = buckets - 1
+        self._slots = array("H", bytes(2 * buckets * self.BUCKET_SIZE))
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return int(self.num_buckets * self.BUCKET_SIZE * self.LOAD_FACTOR)
+
+    def _locate(self, item):
+        digest = int.from_bytes(
+            hashlib.blake2b(item.encode(), digest_size=8).digest(), "little"
+        )
+        fingerprint = (digest >> 32) & 0xFFFF or 1
+        i1 = digest & self._mask
+        return fingerprint, i1, self._alt_index(i1, fingerprint)
+
+    def _alt_index(self, index, fingerprint):
+        return (index ^ (fingerprint * 0x5BD1E995)) & self._mask
+
+    def _bucket_range(self, index):
+        start = index * self.BUCKET_SIZE
+        return range(start, start + self.BUCKET_SIZE)
+
+    def _insert_into(self, index, fingerprint):
+        slots = self._slots
+        for slot in self._bucket_range(index):
+            if not slots[slot]:
+                slots[slot] = fingerprint
+                return True
+        return False
+
+    def add(self, item):
+        fingerprint, i1, i2 = self._locate(item)
+        with self._lock:
+            if self._insert_into(i1, fingerprint) or self._insert_into(i2, fingerprint):
+                self.count += 1
+                return
+
+            slots = self._slots
+            index = self._random.choice((i1, i2))
+            evicted = []
+            for _ in range(self.MAX_KICKS):
+                slot = index * self.BUCKET_SIZE + self._random.randrange(
+                    self.BUCKET_SIZE
+                )
+                evicted.append((slot, slots[slot]))
+                fingerprint, slots[slot] = slots[slot], fingerprint
+                index = self._alt_index(index, fingerprint)
+                if self._insert_into(index, fingerprint):
+                    self.count += 1
+                    return
+
+            # Undo the kick chain so existing items stay findable.
+            for slot, previous in reversed(evicted):
+                slots[slot] = previous
+            raise FilterFull(f"Cuckoo filter is full ({self.count} items)")
+
+    def __contains__(self, item):
+        fingerprint, i1, i2 = self._locate(item)
+        slots = self._slots
+        with self._lock:
+            for index in (i1, i2):
+                for slot in self._bucket_range(index):
+                    if slots[slot] == fingerprint:
+                        return True
+        return False
+
+    def remove(self, item):
+        """Remove one occurrence of ``item``; only call for items that were added."""
+        fingerprint, i1, i2 = self._locate(item)
+        slots = self._slots
+        with self._lock:
+            for index in (i1, i2):
+                for slot in self._bucket_range(index):
+                    if slots[slot] == fingerprint:
+                        slots[slot] = 0
+                        self.count -= 1
+                        return True
+        return False
+
+    def __len__(self):
+        return self.count
+
+
+class ClientIdFilter:
+    """
+    Per-worker cuckoo filter of every stored ``client_id``.
+
+    The filter is built in the background from a single streamed query on
+    first use (or by ``rebuild()`` at startup) and kept current from Client
+    save/delete signals. Clients created by other processes are picked up by
+    a cheap top-up query on ``created_at``, started in the background by the
+    first lookup after ``CLIENT_FILTER_REFRESH_INTERVAL`` seconds, and the
+    whole filter is rebuilt every ``CLIENT_FILTER_REBUILD_INTERVAL`` seconds.
+
+    Misses are rejected without a query, so a client created by another
+    process can be rejected by this worker until that top-up has run:
+    staleness is bounded by ``CLIENT_FILTER_REFRESH_INTERVAL`` plus the
+    top-up's run time. To narrow the window, the first miss in each interval
+    runs the top-up synchronously and is only rejected if it still misses; a
+    flood of unknown IDs therefore costs at most one small range scan per
+    interval.
+    """
+
+    # Rows created this close to the last top-up are fetched again, covering
+    # transactions that committed after a later-timestamped row was seen.
+    TOP_UP_OVERLAP = 2.0
+
+    def __init__(self):
+        self._filter = None
+        self._lock = threading.Lock()
+        self._top_up_lock = threading.Lock()
+        self._confirm_lock = threading.Lock()
+        self._confirmed_at = None
+        self._built_at = 0.0
+        self._topped_up_at = 0.0
+        self._top_up_started_at = 0.0
+        self._last_created_at = None
+        # client_id -> created_at of IDs inserted since the last build that a
+        # top-up may fetch again, so overlapping rows are not inserted twice.
+        self._recent = {}
+
+    @property
+    def enabled(self):
+        return get_setting("CLIENT_FILTER_ENABLED")
+
+    @property
+    def is_built(self):
+        return self.enabled and self._filter is not None
+
+    def might_contain(self, client_id):
+        """Return False only if ``client_id`` is not stored (see class docstring)."""
+        missed_at = time.monotonic()
+        if self._maybe_contains(client_id, missed_at):
+            return True
+        if self._confirm_due(missed_at):
+            return self._confirm_miss(client_id, missed_at)
+        return self._reject()
+
+    async def amight_contain(self, client_id):
+        """might_contain() for async callers; a confirmed miss queries in a thread."""
+        missed_at = time.monotonic()
+        if self._maybe_contains(client_id, missed_at):
+            return True
+        if self._confirm_due(missed_at):
+            return await sync_to_async(self._confirm_miss)(client_id, missed_at)
+        return self._reject()
+
+    def _maybe_contains(self, client_id, now):
+        if not self.enabled:
+            return True
+
+        current = self._filter
+        if current is None or now - self._built_at >= get_setting(
+            "CLIENT_FILTER_REBUILD_INTERVAL"
+        ):
+            self._maintain_in_background(self.rebuild)
+        elif now - self._topped_up_at >= get_setting("CLIENT_FILTER_REFRESH_INTERVAL"):
+            self._maintain_in_background(self.top_up)
+
+        return current is None or client_id in current
+
+    def _confirm_due(self, now):
+        return self._confirmed_at is None or now - self._confirmed_at >= get_setting(
+            "CLIENT_FILTER_REFRESH_INTERVAL"
+        )
+
+    def _confirm_miss(self, client_id, missed_at):
+        # One synchronous top-up per refresh interval; concurrent misses do
+        # not wait for it.
+        if not self._confirm_lock.acquire(blocking=False):
+            return self._reject()
+        try:
+            if not self._confirm_due(missed_at):
+                return self._reject()
+            self._confirmed_at = missed_at
+            self.top_up(started_after=missed_at)
+        except Exception:
+            logger.exception("Failed to top up the client_id filter")
+            return True
+        finally:
+            self._confirm_lock.release()
+        current = self._filter
+        if current is None or client_id in current:
+            return True
+        return self._reject()
+
+    @staticmethod
+    def _reject():
+        filter_rejections.inc()
+        return False
+
+    def _maintain_in_background(self, action):
+        # Lookups never wait for (or run) database queries: one background
+        # thread refreshes the filter while requests keep using the current
+        # one, or skip filtering while none has been built yet.
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                action()
+            except Exception:
+                logger.exception("Failed to refresh the client_id filter")
+                self._built_at = self._topped_up_at = time.monotonic()
+            finally:
+                connections.close_all()
+                self._lock.release()
+
+        threading.Thread(target=run, name="client-id-filter", daemon=True).start()
+
+    def rebuild(self):
+        from .models import Client
+
+        started = time.monotonic()
+        new_filter = self.new_filter(Client.objects.count())
+        rows = Client.objects.order_by().values_list("client_id", "created_at")
+        last_created_at = None
+        for client_id, created_at in rows.iterator(chunk_size=5000):
+            new_filter.add(client_id)
+            if last_created_at is None or created_at > last_created_at:
+                last_created_at = created_at
+
+        self.install(new_filter, last_created_at)
+        duration = time.monotonic() - started
+        filter_rebuild_seconds.set(round(duration, 6))
+        logger.info(
+            "Built client_id filter with %d entries in %.3fs",
+            len(new_filter),
+            duration,
+        )
+
+    @staticmethod
+    def new_filter(expected_items):
+        return CuckooFilter(
+            max(get_setting("CLIENT_FILTER_MIN_CAPACITY"), expected_items * 2)
+        )
+
+    def install(self, new_filter, last_created_at):
+        """Swap in a fully built filter covering clients up to ``last_created_at``."""
+        self._filter = new_filter
+        self._last_created_at = last_created_at
+        self._recent = {}
+        self._built_at = self._topped_up_at = time.monotonic()
+        filter_size.set(len(new_filter))
+
+    def top_up(self, started_after=None):
+        """
+        Add clients created since the last top-up.
+
+        With ``started_after`` (a monotonic time), a top-up that began after
+        it has already caught the filter up, so none is run.
+        """
+        from .models import Client
+
+        with self._top_up_lock:
+            current = self._filter
+            if current is None:
+                return
+            if started_after is not None and self._top_up_started_at > started_after:
+                return
+            self._top_up_started_at = time.monotonic()
+
+            rows = Client.objects.order_by().values_list("client_id", "created_at")
+            if self._last_created_at is not None:
+                rows = rows.filter(
+                    created_at__gte=self._last_created_at
+                    - timedelta(seconds=self.TOP_UP_OVERLAP)
+                )
+
+            recent = self._recent
+            for client_id, created_at in rows:
+                # Rows inside the overlap window are seen repeatedly. Skip
+                # only the IDs inserted before: a fingerprint match could be
+                # another client, whose removal would then drop this one too.
+                if client_id not in recent:
+                    self._add(current, client_id)
+                    recent[client_id] = created_at
+                if self._last_created_at is None or created_at > self._last_created_at:
+                    self._last_created_at = created_at
+
+            if self._last_created_at is not None:
+                horizon = self._last_created_at - timedelta(seconds=self.TOP_UP_OVERLAP)
+                self._recent = {
+                    key: value
+                    for key, value in list(recent.items())
+                    if value >= horizon
+                }
+            self._topped_up_at = time.monotonic()
+
+    def _add(self, current, client_id):
+        try:
+            current.add(client_id)
+        except FilterFull:
+            # Stop filtering until the next lookup rebuilds a larger filter.
+            self._filter = None
+            return
+        filter_size.set(len(current))
+
+    def add(self, client_id, created_at=None):
+        """Add a newly created client; ``created_at`` lets top-ups skip it."""
+        current = self._filter
+        if current is not None:
+            self._add(current, client_id)
+            if created_at is not None:
+                self._recent[client_id] = created_at
+
+    def remove(self, client_id):
+        current = self._filter
+        if current is not None:
+            current.remove(client_id)
+            self._recent.pop(client_id, None)
+            filter_size.set(len(current))
+
+    def discard_on_commit(self, client_id):
+        """Remove ``client_id`` once the surrounding transaction commits."""
+        transaction.on_commit(lambda: self.remove(client_id))
+
+    def reset(self):
+        self._filter = None
+        self._built_at = self._topped_up_at = self._top_up_started_at = 0.0
+        self._confirmed_at = None
+        self._last_created_at = None
+        self._recent = {}
+
+
+client_id_filter = ClientIdFilter()
@@ -0,0 +1,118 @@
+"""
+Sliding-window tracking of failed client authentications.
+
+A key (a ``(client_id, source IP)`` pair or a source IP) is locked out once
+it has failed ``limit`` times within ``window`` seconds. Each key keeps a
+ring buffer of its last ``limit`` failure times: the key is locked while the
+oldest of them is still inside the window, so recording and checking are
+O(1) and a key never holds more than ``limit`` floats. Lockout is checked
+before the client is looked up or its secret hashed (see
+oauth2.authentication).
+
+Keys whose failures have all left the window are dropped by ``compact()``,
+which runs every AUTH_LOCKOUT_COMPACT_INTERVAL seconds and whenever the
+tracker reaches AUTH_LOCKOUT_MAX_KEYS; if a flood of distinct keys still
+fills it, the keys with the oldest last failure are dropped first.
+"""
+
+import time
+
+from .conf import get_setting
+from .metrics import metrics
+
+lockout_refusals = metrics.counter(
+    "oauth2_auth_lockout_refusals_total",
+    "Client authentications refused without checking credentials (lockout).",
+)
+tracked_keys = metrics.gauge(
+    "oauth2_auth_failure_keys", "Keys with recent authentication failures."
+)
+
+
+class _Ring:
+    __slots__ = ("times", "next", "last")
+
+    def __init__(self, size):
+        # Unused slots hold -inf, which is never inside a window.
+        self.times = [float("-inf")] * size
+        self.next = 0
+        self.last = float("-inf")
+
+
+class FailureTracker:
+    """Failed attempts per key over a sliding window."""
+
+    def __init__(self, limit_setting, window=None, max_keys=None):
+        self._limit_setting = limit_setting
+        self._window = window
+        self._max_keys = max_keys
+        self._rings = {}
+        self._compacted_at = time.monotonic()
+
+    @property
+    def limit(self):
+        return get_setting(self._limit_setting)
+
+    @property
+    def window(self):
+        return self._window or get_setting("AUTH_LOCKOUT_WINDOW")
+
+    @property
+    def max_keys(self):
+        return self._max_keys or get_setting("AUTH_LOCKOUT_MAX_KEYS")
+
+    def locked_for(self, key, now=None):
+        """Seconds until ``key`` may try again; 0.0 if it is not locked out."""
+        ring = self._rings.get(key)
+        if ring is None or not self.limit:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        # Slot ``next`` holds the oldest of the last len(times) failures.
+        remaining = ring.times[ring.next] + self.window - now
+        return remaining if remaining > 0 else 0.0
+
+    def record(self, key, now=None):
+        limit = self.limit
+        if not limit:
+            return
+        now = time.monotonic() if now is None else now
+        rings = self._rings
+        ring = rings.get(key)
+        if ring is None or len(ring.times) != limit:
+            if len(rings) >= self.max_keys or (
+                now - self._compacted_at >= get_setting("AUTH_LOCKOUT_COMPACT_INTERVAL")
+            ):
+                rings = self.compact(now)
+            ring = rings[key] = _Ring(limit)
+        ring.times[ring.next] = now
+        ring.next = (ring.next + 1) % limit
+        ring.last = now
+
+    def clear(self, key):
+        self._rings.pop(key, None)
+
+    def compact(self, now=None):
+        """Drop keys with no failure inside the window; returns the new table."""
+        now = time.monotonic() if now is None else now
+        horizon = now - self.window
+        rings = {key: ring for key, ring in self._rings.items() if ring.last > horizon}
+        max_keys = self.max_keys
+        if len(rings) >= max_keys:
+            # Still full: keep the most recently failing keys, leaving room.
+            keep = sorted(rings.items(), key=lambda item: item[1].last)
+            rings = dict(keep[len(keep) - max_keys * 9 // 10 :])
+        self._rings = rings
+        self._compacted_at = now
+        tracked_keys.set(len(rings))
+        return rings
+
+    def reset(self):
+        self._rings = {}
+        self._compacted_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._rings)
+
+
+client_failures = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES")
+address_failures = FailureTracker("AUTH_LOCKOUT_ADDRESS_FAILURES")
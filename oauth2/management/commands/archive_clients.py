@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from oauth2.archive import (
+    archivable,
+    archive_clients,
+    database_aliases,
+    measure,
+    reclaim_space,
+)
+from oauth2.changefeed import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Move clients inactive for more than --days days into the archive "
+        "table, reporting the client table's size and query timings before "
+        "and after, then prune tombstones past the change feed retention. "
+        "Archived clients can be restored from the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive clients inactive for more than this many days "
+            "(default: 90).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Clients archived per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many clients would be archived without moving them.",
+        )
+        parser.add_argument(
+            "--reclaim",
+            action="store_true",
+            help="Rebuild the client table afterwards (OPTIMIZE TABLE on MySQL, "
+            "VACUUM on SQLite) so its files and indexes shrink.",
+        )
+
+    def handle(self, *args, **options):
+        days, batch_size = options["days"], options["batch_size"]
+        if days < 0 or batch_size < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+
+        total = 0
+        for using in database_aliases():
+            if options["dry_run"]:
+                count = archivable(using, days).count()
+                self.stdout.write(f"{using}: {count} client(s) to archive")
+                total += count
+                continue
+
+            before = measure(using)
+            archived = 0
+            last_pk = None
+            while True:
+                candidates = archivable(using, days).order_by("pk")
+                if last_pk is not None:
+                    candidates = candidates.filter(pk__gt=last_pk)
+                pks = list(candidates.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                archived += archive_clients(pks, using, days)
+            if options["reclaim"]:
+                reclaim_space(using)
+            after = measure(using)
+
+            total += archived
+            self.stdout.write(f"{using}: archived {archived} client(s)")
+            self.report(before, after)
+
+        if not options["dry_run"]:
+            # Archiving leaves a tombstone per client; drop expired ones.
+            pruned = prune_tombstones()
+            self.stdout.write(f"Pruned {pruned} expired tombstone(s)")
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} client(s)."))
+
+    def report(self, before, after):
+        labels = {
+            "rows": "rows",
+            "table_bytes": "table + index bytes",
+            "count_ms": "count() ms",
+            "scan_active_ms": "active scan ms",
+        }
+        for key, label in labels.items():
+            if before[key] is None:
+                continue
+            self.stdout.write(f"  {label:<20} {before[key]:>12} -> {after[key]}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from oauth2.conf import get_setting
+from oauth2.snapshot import build_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write the memory-mapped snapshot of active clients shared by workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            help="Snapshot file to write (defaults to OAUTH2['SNAPSHOT_PATH']).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or get_setting("SNAPSHOT_PATH")
+        if not path:
+            raise CommandError("No snapshot path given and SNAPSHOT_PATH is not set.")
+
+        version, count = build_snapshot(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote snapshot v{version} with {count} clients to {path}"
+            )
+        )
@@ -0,0 +1,141 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter under ``-X importtime``, so nothing imported by
+# this management command skews the numbers.
+CHILD = """
+import io, json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from myauthservice.handlers import get_wsgi_application
+application = get_wsgi_application()
+statuses = []
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": sys.argv[1],
+    "SERVER_NAME": sys.argv[2],
+    "SERVER_PORT": "80",
+    "wsgi.url_scheme": "http",
+    "wsgi.input": io.BytesIO(),
+}
+response = application(environ, lambda status, headers: statuses.append(status))
+b"".join(response)
+response.close()
+finished = time.perf_counter()
+print("PROFILE " + json.dumps({
+    "setup_seconds": setup_done - started,
+    "first_request_seconds": finished - setup_done,
+    "total_seconds": finished - started,
+    "status": statuses[0],
+}))
+"""
+
+
+def parse_importtime(output):
+    """Return ``[(module, self_us, cumulative_us)]`` from ``-X importtime`` output."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker startup: import time per package/module and the time "
+        "to serve the first request, in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/version/")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=2,
+            help="Dotted components to group modules by (default: 2, e.g. django.db).",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                CHILD,
+                options["path"],
+                options["host"],
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        timings = next(
+            (
+                json.loads(line[len("PROFILE ") :])
+                for line in result.stdout.splitlines()
+                if line.startswith("PROFILE ")
+            ),
+            None,
+        )
+        if result.returncode or timings is None:
+            raise CommandError(f"Startup profiling failed:\n{result.stderr[-2000:]}")
+
+        modules = parse_importtime(result.stderr)
+        groups = defaultdict(int)
+        for name, self_us, _ in modules:
+            groups[".".join(name.split(".")[: options["depth"]])] += self_us
+
+        top = options["top"]
+        report = {
+            **timings,
+            "path": options["path"],
+            "modules": len(modules),
+            "import_seconds": sum(self_us for _, self_us, _ in modules) / 1e6,
+            "packages": [
+                {"name": name, "seconds": self_us / 1e6}
+                for name, self_us in sorted(groups.items(), key=lambda g: -g[1])[:top]
+            ],
+            "slowest_modules": [
+                {"name": name, "seconds": self_us / 1e6}
+                for name, self_us, _ in sorted(modules, key=lambda m: -m[1])[:top]
+            ],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Imported {report['modules']} modules in "
+            f"{report['import_seconds'] * 1e3:.1f} ms (self time)"
+        )
+        for title, rows in (
+            ("Import time by package", report["packages"]),
+            ("Slowest modules", report["slowest_modules"]),
+        ):
+            self.stdout.write(f"\n{title}:")
+            for row in rows:
+                self.stdout.write(f"  {row['seconds'] * 1e3:8.1f} ms  {row['name']}")
+
+        self.stdout.write(
+            f"\ndjango.setup():      {report['setup_seconds'] * 1e3:8.1f} ms\n"
+            f"first request:       {report['first_request_seconds'] * 1e3:8.1f} ms"
+            f"  (GET {report['path']} -> {report['status']})\n"
+            f"time to first byte:  {report['total_seconds'] * 1e3:8.1f} ms"
+        )
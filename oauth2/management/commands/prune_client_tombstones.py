@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from oauth2.changefeed import prune_tombstones
+from oauth2.conf import get_setting
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete client tombstones older than OAUTH2['CHANGE_FEED_RETENTION'] "
+        "seconds. Change feed cursors older than that must resync."
+    )
+
+    def handle(self, *args, **options):
+        if get_setting("CHANGE_FEED_RETENTION") is None:
+            self.stdout.write("CHANGE_FEED_RETENTION is None; tombstones are kept.")
+            return
+        pruned = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} tombstone(s)."))
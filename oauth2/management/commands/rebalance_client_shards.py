@@ -0,0 +1,68 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from oauth2.models import Client
+from oauth2.sharding import move_clients, shard_aliases, shard_for, sync_scopes
+
+
+class Command(BaseCommand):
+    help = (
+        "Move clients to the shard that owns them under the current "
+        "CLIENT_SHARDS. Enable CLIENT_SHARD_FALLBACK while this runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Clients examined per query (default: 500).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many clients would move without moving them.",
+        )
+
+    def handle(self, *args, **options):
+        shards = shard_aliases()
+        if not shards:
+            raise CommandError("CLIENT_SHARDS is not set.")
+
+        if not options["dry_run"]:
+            sync_scopes()
+
+        total = 0
+        for source in shards:
+            moves = Counter()
+            for batch in self.misplaced(source, options["batch_size"]):
+                by_target = {}
+                for pk, client_id in batch:
+                    by_target.setdefault(shard_for(client_id), []).append(pk)
+                for target, pks in by_target.items():
+                    if not options["dry_run"]:
+                        move_clients(pks, source, target)
+                    moves[target] += len(pks)
+            for target, count in sorted(moves.items()):
+                self.stdout.write(f"{source} -> {target}: {count} client(s)")
+            total += sum(moves.values())
+
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} client(s)."))
+
+    @staticmethod
+    def misplaced(source, batch_size):
+        """Yield batches of ``(pk, client_id)`` on ``source`` owned by another shard."""
+        last_pk = None
+        while True:
+            rows = Client.objects.using(source).order_by("pk")
+            if last_pk is not None:
+                rows = rows.filter(pk__gt=last_pk)
+            rows = list(rows.values_list("pk", "client_id")[:batch_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            batch = [row for row in rows if shard_for(row[1]) != source]
+            if batch:
+                yield batch
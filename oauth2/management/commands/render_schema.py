@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myauthservice.schema import RENDERERS, render_schema, schema_file
+
+
+class Command(BaseCommand):
+    help = "Pre-render the OpenAPI schema served at /schema/ (YAML and JSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            help="Directory to write openapi.yaml/openapi.json to "
+            "(defaults to SCHEMA_CACHE_DIR).",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or settings.SCHEMA_CACHE_DIR
+        if not directory:
+            raise CommandError("No directory given and SCHEMA_CACHE_DIR is not set.")
+
+        for fmt in RENDERERS:
+            path = schema_file(directory, fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(render_schema(fmt))
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
@@ -0,0 +1,95 @@
+"""
+Client metadata reads for ``GET /api/clients/<client_id>/``.
+
+Relying parties poll their client configuration, which rarely changes. The
+version of a client is its ``updated_at``, which every change to the client
+or its grants bumps, so it keys both the strong ETag and the cached JSON
+bytes. The registry entry carries ``updated_at``: a conditional request for
+the current version is answered with 304 straight from the registry, and an
+unconditional one from the cached bytes, both without an ORM query.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .conf import get_setting
+from .metrics import metrics
+from .serializers import ClientSerializer
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+metadata_renders = metrics.counter(
+    "oauth2_client_metadata_renders_total",
+    "Client metadata documents serialized because no cached copy was current.",
+)
+
+
+def metadata_etag(updated_at):
+    return '"%x"' % ((updated_at - EPOCH) // timedelta(microseconds=1))
+
+
+class MetadataCache:
+    """Per-worker LRU of ``client_id -> (updated_at, JSON bytes)``."""
+
+    def __init__(self, size=None):
+        self._size = size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self._serializer = ClientSerializer()
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return get_setting("CLIENT_METADATA_CACHE_SIZE")
+
+    def get(self, client_id, updated_at):
+        """Return the cached document for this version of the client, or None."""
+        with self._lock:
+            cached = self._documents.get(client_id)
+            if cached is None or cached[0] != updated_at:
+                return None
+            self._documents.move_to_end(client_id)
+            return cached[1]
+
+    def put(self, client_id, updated_at, document):
+        with self._lock:
+            self._documents[client_id] = (updated_at, document)
+            self._documents.move_to_end(client_id)
+            while len(self._documents) > self.size:
+                self._documents.popitem(last=False)
+
+    def render(self, client_id):
+        """
+        Serialize an active client; returns ``(updated_at, bytes)`` or None.
+
+        The document is cached under the ``updated_at`` it was rendered from.
+        """
+        from .models import Client
+
+        serializer = self._serializer
+        rows = list(
+            Client.objects.filter(client_id=client_id, is_active=True).values(
+                *serializer.columns
+            )
+        )
+        if not rows:
+            return None
+        metadata_renders.inc()
+        [data] = serializer.serialize(rows)
+        document = json.dumps(data, separators=(",", ":")).encode()
+        updated_at = rows[0]["updated_at"]
+        self.put(client_id, updated_at, document)
+        return updated_at, document
+
+    def reset(self):
+        with self._lock:
+            self._documents.clear()
+
+    def __len__(self):
+        return len(self._documents)
+
+
+metadata_cache = MetadataCache()
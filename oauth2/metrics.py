@@ -0,0 +1,86 @@
+"""
+Minimal in-process metrics.
+
+Counters and gauges live in a per-worker registry and can be rendered in the
+Prometheus text exposition format by the metrics endpoint.
+"""
+
+import threading
+
+
+class Counter:
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._value = 0
+
+
+class Gauge:
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    def reset(self):
+        self._value = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, help_text):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as another type")
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def snapshot(self):
+        return {name: metric.value for name, metric in sorted(self._metrics.items())}
+
+    def render(self):
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            kind = "counter" if isinstance(metric, Counter) else "gauge"
+            if metric.help_text:
+                lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-19 04:06
+
+import oauth2.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Scope",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=64,
+                        unique=True,
+                        validators=[oauth2.validators.validate_scope_name],
+                    ),
+                ),
+                ("description", models.TextField(blank=True)),
+                ("bit", models.PositiveSmallIntegerField(editable=False, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "OAuth2 Scope",
+                "verbose_name_plural": "OAuth2 Scopes",
+                "ordering": ["bit"],
+            },
+        ),
+        migrations.AddField(
+            model_name="client",
+            name="scopes",
+            field=models.ManyToManyField(
+                blank=True, related_name="clients", to="oauth2.scope"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0002_scopes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["created_at", "id"], name="oauth2_client_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0003_client_created_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("client_id", models.CharField(max_length=64)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "OAuth2 Client Tombstone",
+                "verbose_name_plural": "OAuth2 Client Tombstones",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["updated_at", "id"], name="oauth2_client_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clienttombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="oauth2_tombstone_deleted_idx"
+            ),
+        ),
+    ]
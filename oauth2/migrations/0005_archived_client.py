@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0004_client_change_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedClient",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("client_id", models.CharField(max_length=64, unique=True)),
+                (
+                    "client_secret",
+                    models.CharField(blank=True, max_length=128, null=True),
+                ),
+                (
+                    "client_type",
+                    models.CharField(
+                        choices=[
+                            ("confidential", "Confidential"),
+                            ("public", "Public"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True)),
+                ("redirect_uris", models.JSONField(default=list)),
+                ("scope_ids", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Archived OAuth2 Client",
+                "verbose_name_plural": "Archived OAuth2 Clients",
+                "ordering": ["-archived_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-19 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0005_archived_client"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedclient",
+            name="rate_limit",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedclient",
+            name="rate_limit_burst",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="client",
+            name="rate_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Requests per minute. Empty uses RATE_LIMIT_DEFAULT.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="client",
+            name="rate_limit_burst",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Requests allowed in a burst. Empty uses RATE_LIMIT_BURST.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("oauth2", "0006_client_rate_limit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdWorkerLease",
+            fields=[
+                (
+                    "worker_id",
+                    models.PositiveSmallIntegerField(primary_key=True, serialize=False),
+                ),
+                ("holder", models.CharField(max_length=255)),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "ID Worker Lease",
+                "verbose_name_plural": "ID Worker Leases",
+            },
+        ),
+    ]
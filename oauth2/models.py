@@ -1,13 +1,75 @@
 from django.core.exceptions import ValidationError
-from django.db import models
-from .validators import validate_redirect_uris
+from django.db import IntegrityError, models, router, transaction
+from .sharding import ShardedManager, ShardedModelMixin
+from .validators import validate_redirect_uris, validate_scope_name
 from .utils import generate_unique_client_id, generate_client_secret
 
 
-class Client(models.Model):
+class Scope(models.Model):
+
+    class Meta:
+        ordering = ["bit"]
+        verbose_name = "OAuth2 Scope"
+        verbose_name_plural = "OAuth2 Scopes"
+
+    # Upper bound keeps encoded grants within a signed 64-bit integer.
+    MAX_BIT = 62
+    # Inserts tried when concurrent creates keep taking the next bit first.
+    BIT_ALLOCATION_ATTEMPTS = 5
+
+    name = models.CharField(
+        max_length=64, unique=True, validators=[validate_scope_name]
+    )
+    description = models.TextField(blank=True)
+    # Position of this scope in encoded scope masks. Assigned once on creation
+    # and never changed, so previously issued masks keep their meaning.
+    bit = models.PositiveSmallIntegerField(unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if self.bit is not None:
+            self._check_bit()
+            return super().save(*args, **kwargs)
+
+        # The next bit is read without a lock, so a concurrent create may take
+        # it first; the unique constraint on ``bit`` catches that, and the
+        # insert is retried with the bit after it.
+        using = kwargs.get("using") or router.db_for_write(Scope, instance=self)
+        for _ in range(self.BIT_ALLOCATION_ATTEMPTS):
+            self.bit = self.next_bit(using)
+            self._check_bit()
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.bit = None
+                if Scope.objects.using(using).filter(name=self.name).exists():
+                    raise
+        raise IntegrityError("Could not allocate a scope bit; retry the request.")
+
+    @staticmethod
+    def next_bit(using):
+        last = Scope.objects.using(using).aggregate(last=models.Max("bit"))["last"]
+        return 0 if last is None else last + 1
+
+    def _check_bit(self):
+        if self.bit > self.MAX_BIT:
+            raise ValidationError(
+                f"Cannot register more than {self.MAX_BIT + 1} scopes."
+            )
+
+
+class Client(ShardedModelMixin, models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="oauth2_client_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="oauth2_client_updated_idx"),
+        ]
         verbose_name = "OAuth2 Client"
         verbose_name_plural = "OAuth2 Clients"
 
@@ -22,10 +84,24 @@ class Client(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     redirect_uris = models.JSONField(default=list)
+    scopes = models.ManyToManyField(Scope, blank=True, related_name="clients")
     is_active = models.BooleanField(default=True)
+    # Token bucket enforced by oauth2.ratelimit; empty uses the defaults.
+    rate_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Requests per minute. Empty uses RATE_LIMIT_DEFAULT.",
+    )
+    rate_limit_burst = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Requests allowed in a burst. Empty uses RATE_LIMIT_BURST.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShardedManager()
+
     def __str__(self):
         return f"{self.name} ({self.client_id[:8]}...)"
 
@@ -80,3 +156,78 @@ class Client(models.Model):
             return self.redirect_uris[0]
 
         return None
+
+
+class ClientTombstone(ShardedModelMixin, models.Model):
+    """Record of a deleted Client, consumed by the client change feed."""
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "id"], name="oauth2_tombstone_deleted_idx"
+            ),
+        ]
+        verbose_name = "OAuth2 Client Tombstone"
+        verbose_name_plural = "OAuth2 Client Tombstones"
+
+    client_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ShardedManager()
+
+    def __str__(self):
+        return f"{self.client_id[:8]}... deleted at {self.deleted_at}"
+
+
+class ArchivedClient(models.Model):
+    """
+    A long-inactive Client moved out of the hot client table.
+
+    Rows keep the client's primary key, so a restored client gets its old
+    key back. See oauth2.archive and the archive_clients command.
+    """
+
+    class Meta:
+        ordering = ["-archived_at"]
+        verbose_name = "Archived OAuth2 Client"
+        verbose_name_plural = "Archived OAuth2 Clients"
+
+    id = models.BigIntegerField(primary_key=True)
+    client_id = models.CharField(max_length=64, unique=True)
+    client_secret = models.CharField(max_length=128, blank=True, null=True)
+    client_type = models.CharField(max_length=20, choices=Client.CLIENT_TYPE_CHOICES)
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    redirect_uris = models.JSONField(default=list)
+    # Primary keys of the granted scopes; scopes are never deleted.
+    scope_ids = models.JSONField(default=list)
+    rate_limit = models.PositiveIntegerField(null=True, blank=True)
+    rate_limit_burst = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ShardedManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.client_id[:8]}...)"
+
+
+class IdWorkerLease(models.Model):
+    """
+    A worker id leased by one process for the primary keys of sharded rows.
+
+    Leases are always kept on the default database; see
+    oauth2.sharding.IdAllocator.
+    """
+
+    class Meta:
+        verbose_name = "ID Worker Lease"
+        verbose_name_plural = "ID Worker Leases"
+
+    worker_id = models.PositiveSmallIntegerField(primary_key=True)
+    holder = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"worker {self.worker_id} ({self.holder})"
@@ -0,0 +1,142 @@
+"""
+OpenAPI descriptions of the API views' requests and responses.
+
+The views build their responses as plain dicts (or pre-rendered bytes), so
+these serializers are only used by ``@extend_schema`` in oauth2.views to
+document them; nothing is validated or rendered through them.
+"""
+
+from drf_spectacular.utils import inline_serializer
+from rest_framework import serializers
+
+from .models import Client
+from .registration import AUTH_METHODS, DEFAULT_AUTH_METHOD
+from .serializers import ClientSerializer
+
+
+class ErrorSerializer(serializers.Serializer):
+    error = serializers.CharField()
+    error_description = serializers.CharField()
+
+
+class HealthSerializer(serializers.Serializer):
+    status = serializers.CharField()
+
+
+class VersionSerializer(serializers.Serializer):
+    service = serializers.CharField()
+    version = serializers.CharField()
+
+
+class ReadinessCheckSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    latency_ms = serializers.FloatField()
+    detail = serializers.JSONField(
+        required=False, help_text="Only shown to platform services."
+    )
+
+
+class ReadinessSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=["ready", "unavailable"])
+    checks = serializers.DictField(child=ReadinessCheckSerializer())
+
+
+class ClientMetadataSerializer(serializers.Serializer):
+    """RFC 7591 client metadata accepted at registration."""
+
+    redirect_uris = serializers.ListField(child=serializers.URLField())
+    client_name = serializers.CharField(required=False, max_length=255)
+    scope = serializers.CharField(
+        required=False, help_text="Space-separated requested scopes."
+    )
+    token_endpoint_auth_method = serializers.ChoiceField(
+        choices=list(AUTH_METHODS), default=DEFAULT_AUTH_METHOD
+    )
+
+
+class ClientInformationSerializer(serializers.Serializer):
+    """RFC 7591 client information returned for a registered client."""
+
+    client_id = serializers.CharField()
+    client_id_issued_at = serializers.IntegerField()
+    client_secret = serializers.CharField(
+        required=False, help_text="Only issued to confidential clients."
+    )
+    client_secret_expires_at = serializers.IntegerField(required=False)
+    client_name = serializers.CharField()
+    redirect_uris = serializers.ListField(child=serializers.URLField())
+    token_endpoint_auth_method = serializers.ChoiceField(choices=list(AUTH_METHODS))
+    scope = serializers.CharField()
+
+
+class ClientConfigurationSerializer(serializers.Serializer):
+    """A client's registration as read by the client itself."""
+
+    client_id = serializers.CharField()
+    redirect_uris = serializers.ListField(child=serializers.URLField())
+    token_endpoint_auth_method = serializers.ChoiceField(choices=list(AUTH_METHODS))
+    scope = serializers.CharField()
+
+
+class RegistrationBatchSerializer(serializers.Serializer):
+    clients = ClientMetadataSerializer(many=True)
+
+
+class RegistrationResultSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=[201, 400])
+    client = ClientInformationSerializer(required=False)
+    error = serializers.CharField(required=False)
+    error_description = serializers.CharField(required=False)
+
+
+class RegistrationBatchResultSerializer(serializers.Serializer):
+    results = RegistrationResultSerializer(many=True)
+    registered = serializers.IntegerField()
+    failed = serializers.IntegerField()
+
+
+class ClientPageSerializer(serializers.Serializer):
+    clients = ClientSerializer.drf_serializer()(
+        many=True, help_text="Clients with the requested fields only."
+    )
+    cursor = serializers.CharField(allow_null=True)
+    has_more = serializers.BooleanField()
+
+
+class ClientChangeSerializer(serializers.Serializer):
+    client_id = serializers.CharField()
+    client_type = serializers.ChoiceField(choices=Client.CLIENT_TYPE_CHOICES)
+    is_active = serializers.BooleanField()
+    redirect_uris = serializers.ListField(child=serializers.URLField())
+    scope = serializers.CharField()
+    updated_at = serializers.DateTimeField()
+
+
+class ClientChangesSerializer(serializers.Serializer):
+    changes = ClientChangeSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.CharField())
+    cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+
+# "from" is a keyword, so the fields cannot be declared as class attributes.
+ClientExportDeltaSerializer = inline_serializer(
+    "ClientExportDelta",
+    {
+        "from": serializers.CharField(),
+        "to": serializers.CharField(),
+        "upserts": inline_serializer(
+            "ClientExportEntry",
+            {
+                "client_id": serializers.CharField(),
+                "client_type": serializers.ChoiceField(
+                    choices=Client.CLIENT_TYPE_CHOICES
+                ),
+                "redirect_uris": serializers.ListField(child=serializers.URLField()),
+            },
+            many=True,
+        ),
+        "removed": serializers.ListField(child=serializers.CharField()),
+        "has_more": serializers.BooleanField(),
+    },
+)
@@ -0,0 +1,23 @@
+import hmac
+
+from rest_framework.permissions import BasePermission
+
+from .conf import get_setting
+
+
+class HasPlatformToken(BasePermission):
+    """
+    Allow trusted platform services presenting ``Authorization: Bearer <token>``
+    with one of the configured PLATFORM_API_TOKENS.
+    """
+
+    def has_permission(self, request, view):
+        scheme, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+
+        token = token.strip().encode()
+        return any(
+            hmac.compare_digest(token, allowed.encode())
+            for allowed in get_setting("PLATFORM_API_TOKENS")
+        )
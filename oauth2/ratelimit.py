@@ -0,0 +1,173 @@
+"""
+Per-client rate limiting for client-authenticated endpoints (applied by
+``throttle_client``, e.g. on /api/register/<client_id>/).
+
+Every client gets a token bucket holding RATE_LIMIT_BURST requests and
+refilled at RATE_LIMIT_DEFAULT requests per minute, unless ``rate_limit`` /
+``rate_limit_burst`` are set on the client. Limits come from the client's
+registry entry, so a check costs no query. Only authenticated requests are
+charged: failed attempts are limited per ``(client_id, source address)`` by
+the authentication lockout (oauth2.lockout), so nobody can drain a client's
+bucket by sending its client_id with a wrong secret.
+
+Buckets are kept in GCRA form: one float per client, the time at which its
+bucket will be full again. That is the whole state, so a worker holds a
+dict of floats rather than objects, and a full bucket is simply absent.
+Updates are a read and a write without a lock; under contention a request
+or two may slip past the limit, but none is refused wrongly.
+
+With RATE_LIMIT_CACHE set to a cache alias, the state lives in that cache
+and is shared by every worker using it; a ``locmem`` cache is the local
+stand-in for a shared one.
+"""
+
+import math
+import time
+
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+
+from .conf import get_setting
+from .metrics import metrics
+
+rate_limited = metrics.counter(
+    "oauth2_rate_limited_total", "Requests refused by the per-client rate limit."
+)
+
+
+class LocalBuckets:
+    """Bucket state owned by this worker, bounded by RATE_LIMIT_MAX_CLIENTS."""
+
+    def __init__(self, max_clients=None):
+        self._max_clients = max_clients
+        self._full_at = {}
+
+    @property
+    def max_clients(self):
+        if self._max_clients is not None:
+            return self._max_clients
+        return get_setting("RATE_LIMIT_MAX_CLIENTS")
+
+    def get(self, client_id):
+        return self._full_at.get(client_id)
+
+    def set(self, client_id, full_at, now):
+        buckets = self._full_at
+        if client_id not in buckets and len(buckets) >= self.max_clients:
+            # Full buckets carry no state and are dropped. If every bucket is
+            # still in use, start over: one free burst per client.
+            buckets = {key: value for key, value in buckets.items() if value > now}
+            if len(buckets) >= self.max_clients:
+                buckets = {}
+            self._full_at = buckets
+        buckets[client_id] = full_at
+
+    def reset(self):
+        self._full_at = {}
+
+    def __len__(self):
+        return len(self._full_at)
+
+
+class CacheBuckets:
+    """Bucket state in a Django cache, shared by the workers using it."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.cache = caches[alias]
+
+    def get(self, client_id):
+        return self.cache.get(f"oauth2:ratelimit:{client_id}")
+
+    def set(self, client_id, full_at, now):
+        # Expire with the bucket full again; a missing key is a full bucket.
+        self.cache.set(
+            f"oauth2:ratelimit:{client_id}",
+            full_at,
+            timeout=math.ceil(full_at - now) + 1,
+        )
+
+    def reset(self):
+        pass
+
+
+def limits_for(entry):
+    """``(requests per minute, burst)`` for a ClientEntry, or None if unlimited."""
+    rate = entry.rate_limit
+    if rate is None:
+        rate = get_setting("RATE_LIMIT_DEFAULT")
+    if rate is None:
+        return None
+    burst = entry.rate_limit_burst
+    if burst is None:
+        burst = get_setting("RATE_LIMIT_BURST")
+    return rate, max(burst, 1)
+
+
+class RateLimiter:
+    def __init__(self, buckets=None):
+        self._buckets = buckets
+        self._local = LocalBuckets()
+        self._shared = None
+
+    @property
+    def buckets(self):
+        if self._buckets is not None:
+            return self._buckets
+        alias = get_setting("RATE_LIMIT_CACHE")
+        if alias is None:
+            return self._local
+        if self._shared is None or self._shared.alias != alias:
+            self._shared = CacheBuckets(alias)
+        return self._shared
+
+    def check(self, client_id, rate, burst, now=None):
+        """
+        Take one request from the bucket of ``client_id``.
+
+        ``rate`` is in requests per minute. Returns 0.0 if the request is
+        allowed, otherwise the seconds until it would be.
+        """
+        if now is None:
+            now = time.time()
+        if rate <= 0:
+            rate_limited.inc()
+            return 60.0
+
+        interval = 60.0 / rate
+        buckets = self.buckets
+        full_at = buckets.get(client_id)
+        if full_at is None or full_at < now:
+            full_at = now
+        full_at += interval
+        allowed_at = full_at - interval * burst
+        if allowed_at > now:
+            rate_limited.inc()
+            return allowed_at - now
+        buckets.set(client_id, full_at, now)
+        return 0.0
+
+    def check_entry(self, entry, now=None):
+        """check() with the limits of a ClientEntry."""
+        limits = limits_for(entry)
+        if limits is None:
+            return 0.0
+        return self.check(entry.client_id, *limits, now=now)
+
+    def reset(self):
+        self._local.reset()
+        if self._buckets is not None:
+            self._buckets.reset()
+
+
+rate_limiter = RateLimiter()
+
+
+def throttle_client(entry, limiter=rate_limiter):
+    """
+    Charge a request of an authenticated client (a ClientEntry) to its
+    bucket; raises Throttled, answered 429 with Retry-After, over the limit.
+    """
+    wait = limiter.check_entry(entry)
+    if wait:
+        raise Throttled(wait)
@@ -0,0 +1,181 @@
+"""
+Readiness probes for ``/api/ready/``.
+
+Unlike ``/api/health/``, readiness checks the dependencies a request needs:
+the database, applied migrations, cache backends and signing keys. Probes run
+concurrently, each bounded by READY_PROBE_TIMEOUT, and the aggregate result
+is reused for READY_CACHE_TTL seconds so frequent probing from several load
+balancers costs at most one round of checks per worker per interval.
+
+Probe details (error messages, connection pool stats) can name hosts and
+drivers, so ``public_checks()`` reduces a result to status and latency for
+unauthenticated callers; failures are logged in full.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from .conf import get_setting
+from .singleflight import SingleFlight
+from .snapshot import client_snapshot
+from .warmup import warmup_state
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeFailed(Exception):
+    pass
+
+
+def check_database():
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        connection.close()
+    pool = getattr(connection, "pool", None)
+    return pool.stats() if pool is not None else None
+
+
+_migrations_applied = False
+
+
+def check_migrations():
+    # Loading the migration graph is far more expensive than the other
+    # probes; once everything is applied it stays applied for this process.
+    global _migrations_applied
+    if _migrations_applied:
+        return None
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    finally:
+        connection.close()
+    if plan:
+        raise ProbeFailed(f"{len(plan)} unapplied migration(s)")
+    _migrations_applied = True
+    return None
+
+
+def check_caches():
+    key = f"oauth2:ready:{uuid.uuid4().hex}"
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        cache.set(key, 1, timeout=5)
+        if cache.get(key) != 1:
+            raise ProbeFailed(f"Cache {alias!r} did not return a written value")
+        cache.delete(key)
+
+
+def check_signing_keys():
+    if not settings.SECRET_KEY:
+        raise ProbeFailed("SECRET_KEY is empty")
+    return {"edge_export": bool(get_setting("EDGE_EXPORT_SIGNING_KEY"))}
+
+
+def check_client_cache():
+    # Informational: a cold or unavailable cache slows requests down but
+    # does not make them fail.
+    return {
+        "warmup": warmup_state.status,
+        "snapshot_version": client_snapshot.version,
+    }
+
+
+PROBES = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "caches": check_caches,
+    "signing_keys": check_signing_keys,
+    "client_cache": check_client_cache,
+}
+
+
+def _timed(probe):
+    started = time.perf_counter()
+    try:
+        detail = probe()
+        status = "ok"
+    except Exception as e:
+        logger.warning("Readiness probe %s failed", probe.__name__, exc_info=True)
+        detail = str(e) or e.__class__.__name__
+        status = "failed"
+    return status, detail, time.perf_counter() - started
+
+
+def public_checks(checks):
+    """``checks`` without the probe details."""
+    return {
+        name: {"status": check["status"], "latency_ms": check["latency_ms"]}
+        for name, check in checks.items()
+    }
+
+
+class ReadinessChecker:
+    def __init__(self, probes=None):
+        self.probes = PROBES if probes is None else probes
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.probes), thread_name_prefix="oauth2-ready"
+        )
+        self._pending = {}
+        self._result = None
+        self._checked_at = 0.0
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Return ``(ready, checks)``, reusing a result younger than READY_CACHE_TTL."""
+        result = self._result
+        if result is None or time.monotonic() - self._checked_at >= get_setting(
+            "READY_CACHE_TTL"
+        ):
+            result = self._flight.do("ready", self._run)
+        return result
+
+    def _run(self):
+        started = time.perf_counter()
+        with self._lock:
+            for name, probe in self.probes.items():
+                # A probe still stuck from an earlier round is not started
+                # again, so a hung dependency cannot pile up threads.
+                if name not in self._pending:
+                    self._pending[name] = self._executor.submit(_timed, probe)
+            futures = dict(self._pending)
+
+        wait(futures.values(), timeout=get_setting("READY_PROBE_TIMEOUT"))
+
+        checks = {}
+        for name, future in futures.items():
+            if future.done():
+                with self._lock:
+                    self._pending.pop(name, None)
+                status, detail, latency = future.result()
+            else:
+                status, detail = "timeout", None
+                latency = time.perf_counter() - started
+            checks[name] = {"status": status, "latency_ms": round(latency * 1e3, 3)}
+            if detail is not None:
+                checks[name]["detail"] = detail
+
+        ready = all(check["status"] == "ok" for check in checks.values())
+        self._result = (ready, checks)
+        self._checked_at = time.monotonic()
+        return self._result
+
+    def reset(self):
+        self._result = None
+        self._checked_at = 0.0
+
+
+readiness = ReadinessChecker()
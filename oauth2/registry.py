@@ -0,0 +1,242 @@
+"""
+Per-worker registry of compiled OAuth2 clients.
+
+Token and authorization requests look clients up by ``client_id`` on every
+call. The registry keeps a compiled view of each active client in memory so
+those lookups avoid the ORM after the first hit, and coalesces concurrent
+misses so a cold or expiring entry costs one query per worker.
+"""
+
+import math
+import random
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+
+from .conf import get_setting
+from .entries import ENTRY_FIELDS, ClientEntry, group_scope_rows
+from .filters import client_id_filter, filter_false_positives
+from .routers import use_primary
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .snapshot import client_snapshot
+
+_MISS = object()
+
+
+class ClientRegistry:
+    """
+    Per-worker cache of ClientEntry objects keyed by ``client_id``.
+
+    Misses are coalesced through single-flight so concurrent requests for the
+    same client issue one query per worker, and IDs rejected by the client_id
+    filter never reach the database. Entries are also refreshed
+    probabilistically shortly before they expire ("XFetch"), so a popular
+    client is reloaded by one request ahead of time instead of by every
+    request at the moment of expiry.
+
+    When a shared snapshot is configured, clients missing from the local
+    cache are read from the memory-mapped snapshot before falling back to the
+    database. Clients invalidated in this process bypass the snapshot until a
+    newer snapshot version is published.
+    """
+
+    def __init__(
+        self,
+        ttl=None,
+        early_refresh_beta=None,
+        id_filter=client_id_filter,
+        snapshot=client_snapshot,
+    ):
+        self._ttl = ttl
+        self._beta = early_refresh_beta
+        # client_id -> (entry, expires_at, load_duration)
+        self._entries = {}
+        self._generation = 0
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        self.id_filter = id_filter
+        self.snapshot = snapshot
+        # Snapshot version the bypass set applies to; None bypasses all.
+        self._bypass_version = None
+        self._bypass = set()
+        # client_id -> monotonic time of its last invalidation, and the time
+        # of the last clear(); recent changes are loaded from the primary.
+        self._changed_at = {}
+        self._cleared_at = float("-inf")
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else get_setting("CLIENT_CACHE_TTL")
+
+    @property
+    def early_refresh_beta(self):
+        if self._beta is not None:
+            return self._beta
+        return get_setting("CLIENT_CACHE_EARLY_REFRESH_BETA")
+
+    def _cached(self, client_id):
+        """Return the cached entry, or _MISS if the caller should fetch."""
+        cached = self._entries.get(client_id)
+        if cached is None:
+            return _MISS
+
+        entry, expires_at, delta = cached
+        now = time.monotonic()
+        if now >= expires_at:
+            return _MISS
+
+        beta = self.early_refresh_beta
+        if beta and now - delta * beta * math.log(1.0 - random.random()) >= expires_at:
+            # Only one caller refreshes early; everyone else keeps using the
+            # still-valid entry instead of queueing behind the refresh.
+            if not self._flight.in_flight(client_id):
+                return _MISS
+        return entry
+
+    def _from_snapshot(self, client_id):
+        mapped = self.snapshot.mapped() if self.snapshot is not None else None
+        if mapped is None:
+            return _MISS
+
+        # Local invalidations only apply to the snapshot version that was
+        # mapped when they happened; a newer snapshot supersedes them.
+        if mapped.version == self._bypass_version and (
+            self._bypass is None or client_id in self._bypass
+        ):
+            return _MISS
+
+        entry = mapped.get(client_id)
+        return _MISS if entry is None else entry
+
+    def get(self, client_id):
+        """Return the ClientEntry for an active client, or None."""
+        entry = self._cached(client_id)
+        if entry is _MISS:
+            entry = self._from_snapshot(client_id)
+        if entry is _MISS:
+            if not self.id_filter.might_contain(client_id):
+                return None
+            entry = self._flight.do(client_id, self._fetch, client_id)
+        return entry
+
+    async def aget(self, client_id):
+        """Async variant of get() for ASGI views."""
+        entry = self._cached(client_id)
+        if entry is _MISS:
+            entry = self._from_snapshot(client_id)
+        if entry is _MISS:
+            if not await self.id_filter.amight_contain(client_id):
+                return None
+            entry = await self._async_flight.do(client_id, self._afetch, client_id)
+        return entry
+
+    async def _afetch(self, client_id):
+        return await sync_to_async(self._flight.do)(client_id, self._fetch, client_id)
+
+    def _fetch(self, client_id):
+        generation = self._generation
+        started = time.monotonic()
+        entry = self.load(client_id)
+        finished = time.monotonic()
+
+        # An invalidation that raced with the load wins; the next lookup
+        # fetches again rather than caching a possibly stale entry.
+        if generation == self._generation:
+            if entry is not None:
+                self._entries[client_id] = (
+                    entry,
+                    finished + self.ttl,
+                    finished - started,
+                )
+            else:
+                self._entries.pop(client_id, None)
+
+        if entry is None and self.id_filter.is_built:
+            filter_false_positives.inc()
+        return entry
+
+    def _recently_changed(self, client_id):
+        changed_at = max(
+            self._changed_at.get(client_id, self._cleared_at), self._cleared_at
+        )
+        return time.monotonic() - changed_at < get_setting("REPLICA_PIN_SECONDS")
+
+    def load(self, client_id):
+        from .models import Client
+
+        # One values() query with the grants joined in; no model instance.
+        with use_primary() if self._recently_changed(client_id) else nullcontext():
+            clients = Client.objects.filter(client_id=client_id, is_active=True)
+            rows = list(clients.values(*ENTRY_FIELDS))
+            if not rows and get_setting("CLIENT_SHARD_FALLBACK"):
+                # Rebalancing: the client may not have moved to its shard yet.
+                rows = list(clients.all_shards().values(*ENTRY_FIELDS))
+        for row, scope_mask in group_scope_rows(rows):
+            return ClientEntry.from_values(row, scope_mask)
+        return None
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def prime(self, entries, generation=None):
+        """
+        Insert preloaded entries, e.g. from the startup warm-up.
+
+        Entries already cached by regular lookups are kept, and nothing is
+        inserted if the registry was invalidated since ``generation`` was
+        read. Expiry times are spread over the last tenth of the TTL so
+        entries loaded together do not all expire in the same instant.
+        Returns the number of entries inserted.
+        """
+        if generation is not None and generation != self._generation:
+            return 0
+
+        now = time.monotonic()
+        ttl = self.ttl
+        cache = self._entries
+        primed = 0
+        for entry in entries:
+            if entry.client_id not in cache:
+                expires_at = now + ttl * random.uniform(0.9, 1.0)
+                cache[entry.client_id] = (entry, expires_at, 0.0)
+                primed += 1
+        return primed
+
+    def _bypass_snapshot(self, client_id=None):
+        version = self.snapshot.version if self.snapshot is not None else None
+        if version is None:
+            return
+        if version != self._bypass_version:
+            self._bypass_version = version
+            self._bypass = set()
+        if client_id is None:
+            self._bypass = None
+        elif self._bypass is not None:
+            self._bypass.add(client_id)
+
+    def invalidate(self, client_id):
+        self._generation += 1
+        self._entries.pop(client_id, None)
+        self._bypass_snapshot(client_id)
+        now = time.monotonic()
+        if len(self._changed_at) >= 1024:
+            window = get_setting("REPLICA_PIN_SECONDS")
+            self._changed_at = {
+                key: at for key, at in self._changed_at.items() if now - at < window
+            }
+        self._changed_at[client_id] = now
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+        self._bypass_snapshot()
+        self._changed_at = {}
+        self._cleared_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+client_registry = ClientRegistry()
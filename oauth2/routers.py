@@ -0,0 +1,246 @@
+"""
+Read-replica and shard routing for the oauth2 models.
+
+Clients and scopes are read on every token and authorization request but
+written only through the admin. With ``ReplicaRouter`` in DATABASE_ROUTERS
+and READ_REPLICAS set, those reads go to replica aliases while writes stay on
+the primary ("default").
+
+Reads go to the primary instead when read-your-writes matters:
+- inside a transaction on the primary;
+- for the rest of a request (or thread) that has written;
+- for unsafe HTTP methods and paths in PRIMARY_PINNED_PATHS. The default is
+  the admin, whose redirect after a save must show the saved row.
+
+Each request sticks to one replica, chosen round-robin among the healthy
+ones. ``ReplicaMonitor`` checks every replica each REPLICA_CHECK_INTERVAL
+seconds; a replica that fails is skipped until it passes again, and with
+none healthy, reads fall back to the primary.
+
+``ShardRouter`` places new clients on their CLIENT_SHARDS shard (see
+oauth2.sharding). Replicas apply to unsharded deployments.
+"""
+
+import itertools
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .conf import get_setting
+from .metrics import metrics
+from .sharding import is_sharded, shard_aliases, shard_for
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+APP_LABELS = frozenset({"oauth2"})
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+replicas_healthy = metrics.gauge(
+    "oauth2_db_replicas_healthy", "Read replicas currently eligible for reads."
+)
+replica_check_failures = metrics.counter(
+    "oauth2_db_replica_check_failures_total", "Failed read replica health checks."
+)
+
+_pinned = ContextVar("oauth2_db_pinned", default=False)
+_replica = ContextVar("oauth2_db_replica", default=None)
+
+
+@contextmanager
+def use_primary():
+    """Route oauth2 reads in this block to the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def pin_to_primary():
+    """Route oauth2 reads to the primary for the rest of the request."""
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+def start_request(method, path):
+    """Reset routing state for a new request (see oauth2.signals)."""
+    _replica.set(None)
+    _pinned.set(
+        method not in SAFE_METHODS
+        or any(
+            path.startswith(prefix) for prefix in get_setting("PRIMARY_PINNED_PATHS")
+        )
+    )
+
+
+def end_request():
+    _replica.set(None)
+    _pinned.set(False)
+
+
+class ReplicaSet:
+    """Health state and round-robin selection over READ_REPLICAS."""
+
+    def __init__(self):
+        self._down = set()
+        self._counter = itertools.count()
+
+    def healthy(self):
+        return [
+            alias for alias in get_setting("READ_REPLICAS") if alias not in self._down
+        ]
+
+    def choose(self):
+        """Return the replica for the current request, or None for the primary."""
+        alias = _replica.get()
+        if alias is not None and alias not in self._down:
+            return alias
+        healthy = self.healthy()
+        if not healthy:
+            return None
+        alias = healthy[next(self._counter) % len(healthy)]
+        _replica.set(alias)
+        return alias
+
+    def mark_down(self, alias):
+        if alias not in self._down:
+            logger.warning("Read replica %s failed its health check", alias)
+        self._down.add(alias)
+        replicas_healthy.set(len(self.healthy()))
+
+    def mark_up(self, alias):
+        if alias in self._down:
+            logger.info("Read replica %s is healthy again", alias)
+        self._down.discard(alias)
+        replicas_healthy.set(len(self.healthy()))
+
+    def reset(self):
+        self._down.clear()
+
+
+replica_set = ReplicaSet()
+
+
+class ReplicaRouter:
+    """Database router sending oauth2 reads to READ_REPLICAS."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in APP_LABELS:
+            return None
+        if _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return replica_set.choose() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in APP_LABELS:
+            return None
+        pin_to_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *get_setting("READ_REPLICAS")}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication.
+        if db in get_setting("READ_REPLICAS"):
+            return False
+        return None
+
+
+class ShardRouter:
+    """
+    Database router for CLIENT_SHARDS.
+
+    Queries pick their shards in ShardedQuerySet; the router places new rows
+    by ``client_id`` and keeps scopes, which are copied to every shard, on
+    the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not is_sharded() or model._meta.app_label not in APP_LABELS:
+            return None
+        if model._meta.model_name == "scope":
+            return PRIMARY
+        instance = hints.get("instance")
+        if instance is None or instance._state.db is not None:
+            # Related managers pass the client, whose database Django uses.
+            return None
+        client_id = getattr(instance, "client_id", None)
+        return shard_for(client_id) if isinstance(client_id, str) else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not is_sharded():
+            return None
+        aliases = set(shard_aliases())
+        if (
+            obj1._meta.app_label in APP_LABELS
+            and obj2._meta.app_label in APP_LABELS
+            and obj1._state.db in aliases
+            and obj2._state.db in aliases
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Shards other than the default database only hold the oauth2 tables.
+        if db != PRIMARY and db in shard_aliases():
+            return app_label in APP_LABELS
+        return None
+
+
+def check_replica(alias):
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        connection.close()
+
+
+class ReplicaMonitor:
+    """Checks each replica every REPLICA_CHECK_INTERVAL seconds."""
+
+    def __init__(self, replicas=replica_set, probe=check_replica):
+        self.replicas = replicas
+        self.probe = probe
+        self._stop = threading.Event()
+
+    def check(self):
+        """Probe every replica once; returns the healthy aliases."""
+        for alias in get_setting("READ_REPLICAS"):
+            try:
+                self.probe(alias)
+            except Exception as e:
+                replica_check_failures.inc()
+                logger.debug("Read replica %s check failed: %s", alias, e)
+                self.replicas.mark_down(alias)
+            else:
+                self.replicas.mark_up(alias)
+        return self.replicas.healthy()
+
+    def run(self):
+        self.check()
+        while not self._stop.wait(get_setting("REPLICA_CHECK_INTERVAL")):
+            self.check()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="oauth2-replicas", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
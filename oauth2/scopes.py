@@ -0,0 +1,111 @@
+"""
+Bitmask encoding of OAuth2 scopes.
+
+Every registered Scope owns a fixed bit position, so a set of scopes can be
+carried around as a single integer. Subset checks and downscoping then become
+plain bitwise operations instead of per-request set construction.
+"""
+
+import threading
+
+from .conf import get_setting
+
+
+class InvalidScope(ValueError):
+    """Raised when a scope string references an unregistered scope."""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        super().__init__(f"Unknown scope(s): {' '.join(self.names)}")
+
+
+def is_subset(requested, granted):
+    return requested & ~granted == 0
+
+
+def downscope(requested, granted):
+    return requested & granted
+
+
+class ScopeRegistry:
+    """
+    In-memory name <-> bit mapping of registered scopes.
+
+    The mapping is loaded lazily from the database on first use and dropped
+    by ``clear()`` whenever a Scope changes. A registry built with an explicit
+    ``bits`` mapping never touches the database.
+    """
+
+    def __init__(self, bits=None):
+        self._lock = threading.Lock()
+        self._static = bits is not None
+        self._state = self._build(bits) if self._static else None
+        self._parsed = {}
+
+    @staticmethod
+    def _build(bits):
+        bits = dict(bits)
+        return bits, {bit: name for name, bit in bits.items()}
+
+    def _mapping(self):
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    from .models import Scope
+
+                    self._state = self._build(Scope.objects.values_list("name", "bit"))
+                state = self._state
+        return state
+
+    def load(self):
+        """Load the mapping now instead of on first use."""
+        self._mapping()
+
+    def clear(self):
+        if not self._static:
+            with self._lock:
+                self._state = None
+                self._parsed = {}
+
+    def encode(self, names):
+        bits, _ = self._mapping()
+        mask = 0
+        unknown = []
+        for name in names:
+            bit = bits.get(name)
+            if bit is None:
+                unknown.append(name)
+            else:
+                mask |= 1 << bit
+        if unknown:
+            raise InvalidScope(unknown)
+        return mask
+
+    def parse(self, scope):
+        """Encode a space-delimited scope string (RFC 6749 Section 3.3)."""
+        parsed = self._parsed
+        mask = parsed.get(scope)
+        if mask is None:
+            mask = self.encode(scope.split()) if scope else 0
+            if len(parsed) >= get_setting("SCOPE_PARSE_CACHE_SIZE"):
+                parsed.clear()
+            parsed[scope] = mask
+        return mask
+
+    def decode(self, mask):
+        _, names = self._mapping()
+        result = []
+        bit = 0
+        while mask:
+            if mask & 1 and bit in names:
+                result.append(names[bit])
+            mask >>= 1
+            bit += 1
+        return result
+
+    def format(self, mask):
+        return " ".join(self.decode(mask))
+
+
+scope_registry = ScopeRegistry()
@@ -0,0 +1,615 @@
+"""
+Hash sharding of Client and its dependent tables across database aliases.
+
+With OAUTH2["CLIENT_SHARDS"] set to a list of aliases, each client lives on
+one of them, chosen from a hash of its ``client_id``. IDs are hashed into
+SLOTS fixed slots, and each slot is owned by the shard with the highest
+rendezvous weight for it. Adding a shard therefore only moves the slots (and
+clients) it wins, roughly 1/N of them; ``rebalance_client_shards`` moves
+those rows. Shard aliases are part of the hash, so renaming one moves its
+clients too.
+
+A client's scope grants and its tombstone are stored on the client's shard.
+Scopes are global: they are written on the default database and copied to
+every shard so grants can reference them locally.
+"""
+
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    NotSupportedError,
+    connections,
+    models,
+    transaction,
+)
+from django.db.models import F, OrderBy
+from django.db.models.query import (
+    FlatValuesListIterable,
+    ModelIterable,
+    ValuesIterable,
+)
+
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+SLOTS = 4096
+
+# allocate_id(): milliseconds since 2024-01-01, then a 10-bit worker id and a
+# 12-bit per-millisecond sequence.
+_ID_EPOCH_MS = 1_704_067_200_000
+_ID_WORKER_BITS = 10
+_ID_SEQUENCE_BITS = 12
+
+_moving = ContextVar("oauth2_shard_moving", default=False)
+
+
+def shard_aliases():
+    return get_setting("CLIENT_SHARDS")
+
+
+def is_sharded():
+    return bool(get_setting("CLIENT_SHARDS"))
+
+
+def _hash64(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def slot_for(client_id):
+    return _hash64(client_id) % SLOTS
+
+
+@lru_cache(maxsize=8)
+def slot_table(shards):
+    """Owning alias of every slot for the shard list ``shards`` (a tuple)."""
+    return tuple(
+        max(shards, key=lambda alias: _hash64(f"{alias}:{slot}"))
+        for slot in range(SLOTS)
+    )
+
+
+def shard_for(client_id):
+    """Return the alias of the shard that owns ``client_id``."""
+    shards = shard_aliases()
+    if not shards:
+        return DEFAULT_DB_ALIAS
+    return slot_table(tuple(shards))[slot_for(client_id)]
+
+
+def _as_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, dt_timezone.utc)
+
+
+class IdAllocator:
+    """
+    Snowflake-style primary keys: time, worker id and a per-process sequence.
+
+    Keys of one process never repeat: the sequence counts the keys issued in
+    the current millisecond, and when it runs out (or the clock steps back)
+    the allocator moves on to the next millisecond instead of reusing one.
+
+    Processes are told apart by a worker id leased from the default
+    database (IdWorkerLease) for ID_WORKER_LEASE seconds. ``renew()``
+    extends the lease: IdLeaseKeeper calls it in servers, and allocation
+    does when it is due outside a transaction. A process stops using its
+    lease a third of the term before it expires, so another process only
+    takes the id over once it is no longer in use. A forked child leases
+    its own.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # A new lock: after fork, the parent's may be held by a thread that
+        # no longer exists.
+        self._lock = threading.Lock()
+        self._worker_id = None
+        self._holder = None
+        self._renew_at = 0.0
+        self._valid_until = 0.0
+        self._last_ms = -1
+        self._sequence = 0
+
+    def worker_id(self):
+        """Return this process's worker id, leasing one if it holds none."""
+        if self._worker_id is None or time.time() >= self._valid_until:
+            self._lease()
+        return self._worker_id
+
+    def renew(self):
+        """Extend the lease, or take a new one if it was lost."""
+        with self._lock:
+            self._renew()
+            return self._worker_id
+
+    def _renew(self):
+        if self._worker_id is None or time.time() >= self._valid_until:
+            self._lease()
+            return
+        from .models import IdWorkerLease
+
+        now, term = time.time(), get_setting("ID_WORKER_LEASE")
+        renewed = (
+            IdWorkerLease.objects.using(DEFAULT_DB_ALIAS)
+            .filter(worker_id=self._worker_id, holder=self._holder)
+            .update(expires_at=_as_datetime(now + term))
+        )
+        if renewed:
+            self._started(now, term)
+        else:
+            logger.warning("ID worker lease %s was taken over", self._worker_id)
+            self._lease()
+
+    def _lease(self):
+        from .models import IdWorkerLease
+
+        now, term = time.time(), get_setting("ID_WORKER_LEASE")
+        holder = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        expires_at = _as_datetime(now + term)
+        leases = IdWorkerLease.objects.using(DEFAULT_DB_ALIAS)
+        taken = set(
+            leases.filter(expires_at__gt=_as_datetime(now)).values_list(
+                "worker_id", flat=True
+            )
+        )
+        free = [n for n in range(1 << _ID_WORKER_BITS) if n not in taken]
+        # Starting at a random free id keeps processes booting together from
+        # all racing for the same one.
+        offset = secrets.randbelow(len(free)) if free else 0
+        for worker_id in free[offset:] + free[:offset]:
+            if leases.filter(
+                worker_id=worker_id, expires_at__lte=_as_datetime(now)
+            ).update(holder=holder, expires_at=expires_at):
+                break
+            try:
+                with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    leases.create(
+                        worker_id=worker_id, holder=holder, expires_at=expires_at
+                    )
+                break
+            except IntegrityError:
+                continue
+        else:
+            raise RuntimeError(
+                f"All {1 << _ID_WORKER_BITS} ID worker ids are leased; "
+                "no primary keys can be allocated for sharded rows."
+            )
+        self._worker_id, self._holder = worker_id, holder
+        self._started(now, term)
+
+    def _started(self, now, term):
+        self._renew_at = now + term / 3
+        self._valid_until = now + term * 2 / 3
+
+    def allocate(self):
+        with self._lock:
+            if (
+                self._worker_id is not None
+                and time.time() >= self._renew_at
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            ):
+                self._renew()
+            worker_id = self.worker_id()
+            millis = int(time.time() * 1000) - _ID_EPOCH_MS
+            if millis > self._last_ms:
+                self._last_ms, self._sequence = millis, 0
+            else:
+                self._sequence += 1
+                if self._sequence >> _ID_SEQUENCE_BITS:
+                    self._last_ms, self._sequence = self._last_ms + 1, 0
+            return (
+                (self._last_ms << (_ID_WORKER_BITS + _ID_SEQUENCE_BITS))
+                | (worker_id << _ID_SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+id_allocator = IdAllocator()
+# A forked child must not continue its parent's worker id and sequence.
+os.register_at_fork(after_in_child=id_allocator.reset)
+
+
+class IdLeaseKeeper:
+    """
+    Holds this process's worker id lease for a server.
+
+    ``start()`` leases the id before returning, so a process that cannot get
+    one fails to start, then renews it every third of ID_WORKER_LEASE.
+    """
+
+    def __init__(self, allocator=id_allocator):
+        self.allocator = allocator
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.wait(get_setting("ID_WORKER_LEASE") / 3):
+            try:
+                self.allocator.renew()
+            except Exception:
+                logger.exception("Renewing the ID worker lease failed")
+            finally:
+                connections.close_all()
+
+    def start(self):
+        worker_id = self.allocator.renew()
+        logger.info("Leased ID worker id %s", worker_id)
+        thread = threading.Thread(target=self.run, name="oauth2-id-lease", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def allocate_id():
+    """
+    Return a primary key that is unique across shards.
+
+    Auto-increment keys repeat on every shard, but the admin addresses
+    clients by pk and the change feed orders them by pk across shards.
+    """
+    return id_allocator.allocate()
+
+
+@contextmanager
+def moving():
+    """Mark deletes in this block as moves between shards, not removals."""
+    token = _moving.set(True)
+    try:
+        yield
+    finally:
+        _moving.reset(token)
+
+
+def is_moving():
+    return _moving.get()
+
+
+def sync_scopes(aliases=None, scopes=None):
+    """Copy ``scopes`` (default: all) from the default database to the shards."""
+    from .models import Scope
+
+    if scopes is None:
+        scopes = list(Scope.objects.using(DEFAULT_DB_ALIAS).order_by("pk"))
+    for alias in aliases or shard_aliases():
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        for scope in scopes:
+            Scope.objects.using(alias).update_or_create(
+                pk=scope.pk,
+                defaults={
+                    "name": scope.name,
+                    "description": scope.description,
+                    "bit": scope.bit,
+                    "created_at": scope.created_at,
+                },
+            )
+
+
+def move_clients(pks, source, target):
+    """
+    Move the clients with primary keys ``pks``, and their grants, from the
+    ``source`` shard to ``target``; returns the number moved.
+
+    Rows are copied with their keys and the target commits before the source
+    deletes, so an interrupted move leaves duplicates that the next run
+    resolves, keeping the most recently updated copy. The deletes are not
+    published as removals (see ``moving()``).
+    """
+    from .models import Client
+
+    Grant = Client.scopes.through
+    with moving(), transaction.atomic(using=source), transaction.atomic(using=target):
+        clients = list(
+            Client.objects.using(source).filter(pk__in=pks).select_for_update()
+        )
+        existing = dict(
+            Client.objects.using(target)
+            .filter(pk__in=[client.pk for client in clients])
+            .values_list("pk", "updated_at")
+        )
+        copies = [
+            client
+            for client in clients
+            if client.pk not in existing or client.updated_at > existing[client.pk]
+        ]
+        stale = [client.pk for client in copies if client.pk in existing]
+        Client.objects.using(target).filter(pk__in=stale).delete()
+        Client.objects.using(target).bulk_create(copies)
+        Grant.objects.using(target).bulk_create(
+            Grant(client_id=grant.client_id, scope_id=grant.scope_id)
+            for grant in Grant.objects.using(source).filter(
+                client_id__in=[client.pk for client in copies]
+            )
+        )
+        Client.objects.using(source).filter(
+            pk__in=[client.pk for client in clients]
+        ).delete()
+    return len(clients)
+
+
+class ShardedModelMixin:
+    """Gives new rows cluster-unique primary keys while sharding is enabled."""
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.pk is None and is_sharded():
+            self.pk = allocate_id()
+            kwargs.setdefault("force_insert", True)
+        super().save(*args, **kwargs)
+
+
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _sortable(value):
+    # NULLs sort first, as MySQL and SQLite order them ascending.
+    return (value is not None, value)
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    QuerySet for models spread over CLIENT_SHARDS by ``client_id``.
+
+    Unsharded, it is a plain QuerySet. Sharded, a query filtered on an exact
+    ``client_id`` (or ``client_id__in``) runs on the shards owning those IDs.
+    Any other query runs on every shard and the rows are merged in the
+    query's ordering, so slicing and pagination work across shards; ordering
+    fields must be selected by ``values()``/``values_list()`` queries.
+    ``using()`` pins a query to one alias as usual.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Aliases the query is narrowed to by client_id; None means all.
+        self._shards = None
+        self._route = True
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._shards = self._shards
+        clone._route = self._route
+        return clone
+
+    def all_shards(self):
+        """Query every shard, ignoring client_id routing (e.g. while rebalancing)."""
+        clone = self._chain()
+        clone._shards = None
+        clone._route = False
+        return clone
+
+    def filter(self, *args, **kwargs):
+        clone = super().filter(*args, **kwargs)
+        if self._route and self._db is None and is_sharded():
+            owners = self._owners(kwargs)
+            if owners is not None:
+                clone._shards = (
+                    owners if self._shards is None else self._shards & owners
+                )
+        return clone
+
+    @staticmethod
+    def _owners(lookups):
+        if "client_id" in lookups:
+            return frozenset([shard_for(lookups["client_id"])])
+        if "client_id__exact" in lookups:
+            return frozenset([shard_for(lookups["client_id__exact"])])
+        if "client_id__in" in lookups:
+            return frozenset(shard_for(value) for value in lookups["client_id__in"])
+        return None
+
+    def _targets(self):
+        """Aliases to run on, or None to run as a plain QuerySet."""
+        if self._db is not None or not is_sharded():
+            return None
+        return [
+            alias
+            for alias in shard_aliases()
+            if self._shards is None or alias in self._shards
+        ]
+
+    def _scatter(self, targets, chunk_size=None):
+        if len(targets) == 1:
+            part = self.using(targets[0])
+            return part.iterator(chunk_size) if chunk_size else iter(part)
+
+        low, high = self.query.low_mark, self.query.high_mark
+        parts = []
+        for alias in targets:
+            part = self.using(alias)
+            part.query.clear_limits()
+            # Each shard may hold all of the rows up to the slice end.
+            part.query.set_limits(high=high)
+            parts.append(part.iterator(chunk_size) if chunk_size else iter(part))
+
+        key = self._merge_key()
+        rows = heapq.merge(*parts, key=key) if key else itertools.chain(*parts)
+        return itertools.islice(rows, low, high)
+
+    def _merge_key(self):
+        query = self.query
+        if query.order_by:
+            ordering = query.order_by
+        elif query.default_ordering and query.get_meta().ordering:
+            ordering = query.get_meta().ordering
+        else:
+            return None
+        getters = [self._sort_getter(field) for field in ordering]
+        return lambda row: tuple(getter(row) for getter in getters)
+
+    def _sort_getter(self, field):
+        descending = False
+        if isinstance(field, OrderBy) and isinstance(field.expression, F):
+            name, descending = field.expression.name, field.descending
+        elif isinstance(field, F):
+            name = field.name
+        elif isinstance(field, str) and field != "?" and "__" not in field:
+            descending = field.startswith("-")
+            name = field.lstrip("-+")
+        else:
+            raise NotSupportedError(f"Cannot merge shard results ordered by {field!r}.")
+
+        get = self._value_getter(name)
+        if descending:
+            return lambda row: _Descending(_sortable(get(row)))
+        return lambda row: _sortable(get(row))
+
+    def _value_getter(self, name):
+        meta = self.model._meta
+        if name == "pk":
+            names = ["pk", meta.pk.attname]
+        else:
+            try:
+                field = meta.get_field(name)
+            except FieldDoesNotExist:
+                names = [name]
+            else:
+                names = [name, field.attname]
+                if field.primary_key:
+                    names.append("pk")
+
+        iterable = self._iterable_class
+        if iterable is ModelIterable:
+            attname = meta.pk.attname if names[0] == "pk" else names[-1]
+            return lambda obj: getattr(obj, attname)
+
+        fields = list(self._fields) or [field.attname for field in meta.concrete_fields]
+        for candidate in names:
+            if candidate in fields:
+                break
+        else:
+            raise NotSupportedError(
+                f"Ordering field {name!r} must be selected to merge shard results."
+            )
+        if iterable is ValuesIterable:
+            return lambda row: row[candidate]
+        if iterable is FlatValuesListIterable:
+            return lambda value: value
+        index = fields.index(candidate)
+        return lambda row: row[index]
+
+    def _fetch_all(self):
+        targets = self._targets()
+        if targets is None:
+            return super()._fetch_all()
+        if self._result_cache is None:
+            # Each shard's part runs its own prefetches.
+            self._result_cache = list(self._scatter(targets))
+            self._prefetch_done = True
+
+    def iterator(self, chunk_size=None):
+        targets = self._targets()
+        if targets is None:
+            return super().iterator(chunk_size)
+        return self._scatter(targets, chunk_size or 2000)
+
+    def count(self):
+        targets = self._targets()
+        if targets is None or self._result_cache is not None:
+            return super().count()
+        total = 0
+        for alias in targets:
+            part = self.using(alias)
+            part.query.clear_limits()
+            total += part.count()
+        low, high = self.query.low_mark, self.query.high_mark
+        total = max(total - low, 0)
+        return total if high is None else min(total, high - low)
+
+    def exists(self):
+        targets = self._targets()
+        if targets is None or self._result_cache is not None:
+            return super().exists()
+        return any(self.using(alias).exists() for alias in targets)
+
+    def aggregate(self, *args, **kwargs):
+        targets = self._targets()
+        if targets is None:
+            return super().aggregate(*args, **kwargs)
+        if len(targets) != 1:
+            raise NotSupportedError(
+                "aggregate() cannot combine results from several shards; "
+                "aggregate per shard with using()."
+            )
+        return self.using(targets[0]).aggregate(*args, **kwargs)
+
+    def update(self, **kwargs):
+        targets = self._targets()
+        if targets is None:
+            return super().update(**kwargs)
+        return sum(self.using(alias).update(**kwargs) for alias in targets)
+
+    update.alters_data = True
+
+    def delete(self):
+        targets = self._targets()
+        if targets is None:
+            return super().delete()
+        total, per_model = 0, Counter()
+        for alias in targets:
+            deleted, counts = self.using(alias).delete()
+            total += deleted
+            per_model.update(counts)
+        return total, dict(per_model)
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def create(self, **kwargs):
+        if self._targets() is None:
+            return super().create(**kwargs)
+        # The router places the row by its client_id.
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+
+    create.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if self._targets() is None:
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        groups = {}
+        for obj in objs:
+            if not obj.client_id:
+                raise ValueError("Sharded bulk_create() needs every client_id set.")
+            if obj.pk is None:
+                obj.pk = allocate_id()
+            groups.setdefault(shard_for(obj.client_id), []).append(obj)
+        for alias, group in groups.items():
+            self.using(alias).bulk_create(group, *args, **kwargs)
+        return objs
+
+    bulk_create.alters_data = True
+
+
+ShardedManager = models.Manager.from_queryset(ShardedQuerySet)
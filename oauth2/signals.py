@@ -0,0 +1,89 @@
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .filters import client_id_filter
+from .models import Client, ClientTombstone, Scope
+from .registry import client_registry
+from .routers import end_request, start_request
+from .sharding import is_moving, is_sharded, sync_scopes
+from .scopes import scope_registry
+
+
+@receiver(post_save, sender=Client)
+def client_saved(sender, instance, created, **kwargs):
+    client_registry.invalidate(instance.client_id)
+    if created:
+        client_id_filter.add(instance.client_id, instance.created_at)
+
+
+@receiver(post_delete, sender=Client)
+def client_deleted(sender, instance, using, **kwargs):
+    if is_moving():
+        return
+    client_registry.invalidate(instance.client_id)
+    client_id_filter.discard_on_commit(instance.client_id)
+    ClientTombstone.objects.using(using).create(client_id=instance.client_id)
+
+
+@receiver(m2m_changed, sender=Client.scopes.through)
+def client_scopes_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # Grant changes do not touch the Client row, so bump updated_at by hand
+    # to publish them through the change feed.
+    now = timezone.now()
+    if not reverse:
+        if action.startswith("post_"):
+            Client.objects.using(using).filter(pk=instance.pk).update(updated_at=now)
+            client_registry.invalidate(instance.client_id)
+        return
+
+    if action == "pre_clear":
+        # Not instance.clients, which only sees the scope's own database.
+        Client.objects.filter(scopes=instance).update(updated_at=now)
+    elif action in ("post_add", "post_remove"):
+        Client.objects.filter(pk__in=pk_set).update(updated_at=now)
+
+    if action.startswith("post_"):
+        client_registry.clear()
+
+
+@receiver(post_save, sender=Scope)
+@receiver(post_delete, sender=Scope)
+def reload_scopes(sender, instance, **kwargs):
+    scope_registry.clear()
+    client_registry.clear()
+
+
+@receiver(post_save, sender=Scope)
+@receiver(pre_delete, sender=Scope)
+def touch_scope_clients(sender, instance, raw=False, created=False, **kwargs):
+    # Renaming or deleting a scope changes the scope string of every client
+    # granted it, so publish those clients as changed (and re-version their
+    # metadata ETags) like a grant change.
+    if not raw and not created:
+        Client.objects.filter(scopes=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Scope)
+def copy_scope_to_shards(sender, instance, using, raw, **kwargs):
+    if is_sharded() and using == DEFAULT_DB_ALIAS and not raw:
+        sync_scopes(scopes=[instance])
+
+
+@receiver(request_started)
+def route_request(sender, environ=None, scope=None, **kwargs):
+    # A signal rather than middleware, so the lean /api/ middleware profile
+    # resets replica routing too.
+    if environ is not None:
+        start_request(
+            environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "")
+        )
+    elif scope is not None:
+        start_request(scope.get("method", "GET"), scope.get("path", ""))
+
+
+@receiver(request_finished)
+def end_route_request(sender, **kwargs):
+    end_request()
@@ -0,0 +1,80 @@
+"""
+Request coalescing for duplicate in-flight work.
+
+When many callers ask for the same key at once, only the first one runs the
+loader; the others wait and share its result (or exception). ``SingleFlight``
+coordinates threads (WSGI workers), ``AsyncSingleFlight`` coordinates
+coroutines on an event loop (ASGI workers).
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def do(self, key, func, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coroutine flavour of SingleFlight.
+
+    The loader runs in its own task, so a cancelled caller does not cancel the
+    shared load for everybody else waiting on the same key.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    def in_flight(self, key):
+        return key in self._tasks
+
+    async def do(self, key, func, *args):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
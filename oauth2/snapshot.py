@@ -0,0 +1,400 @@
+"""
+Memory-mapped snapshot of active clients shared by all worker processes.
+
+One process (the leader) periodically writes a compact, read-only snapshot
+file; every worker mmaps it and looks clients up directly in the shared
+pages, so N workers hold one copy of the client table instead of N caches.
+
+File layout (little-endian):
+
+    header   magic "OA2S", format, snapshot version, count, built_at
+    index    count x (u64 client_id hash, u64 record offset), sorted by hash
+    records  u16 len + client_id, u8 client type, u8 has secret,
+             32-byte SHA-256 of the secret, u64 scope mask,
+             i64 updated_at (epoch microseconds),
+             u32 rate limit and u32 burst (0xFFFFFFFF when unset),
+             u16 redirect URI count, then u16 len + URI for each
+
+The file is replaced atomically (write to a temporary file, fsync, rename)
+and carries a version in its header, so readers notice a new snapshot and
+swap to it without restarting.
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.db import connections
+
+from .conf import get_setting
+from .entries import ENTRY_FIELDS, ClientEntry, group_scope_rows
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OA2S"
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct("<4sHHQQq")  # magic, format, reserved, version, count, built_at
+INDEX_ENTRY = struct.Struct("<QQ")
+RECORD_FIXED = struct.Struct("<BB32sQqIIH")
+U16 = struct.Struct("<H")
+
+CLIENT_TYPES = ("confidential", "public")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NO_SECRET = bytes(32)
+UNSET = 0xFFFFFFFF
+
+snapshot_version = metrics.gauge(
+    "oauth2_snapshot_version", "Version of the client snapshot mapped by this worker."
+)
+snapshot_entries = metrics.gauge(
+    "oauth2_snapshot_entries", "Clients in the snapshot mapped by this worker."
+)
+snapshot_build_seconds = metrics.gauge(
+    "oauth2_snapshot_build_seconds", "Duration of the last snapshot build."
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def key_hash(client_id):
+    return int.from_bytes(
+        hashlib.blake2b(client_id.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def _to_micros(value):
+    if value is None:
+        return 0
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value) if value else None
+
+
+def _encode_str(value):
+    data = value.encode()
+    return U16.pack(len(data)) + data
+
+
+def encode_record(entry):
+    parts = [
+        _encode_str(entry.client_id),
+        RECORD_FIXED.pack(
+            CLIENT_TYPES.index(entry.client_type),
+            entry.secret_hash is not None,
+            entry.secret_hash or NO_SECRET,
+            entry.scope_mask,
+            _to_micros(entry.updated_at),
+            UNSET if entry.rate_limit is None else entry.rate_limit,
+            UNSET if entry.rate_limit_burst is None else entry.rate_limit_burst,
+            len(entry.redirect_uris),
+        ),
+    ]
+    parts.extend(_encode_str(uri) for uri in sorted(entry.redirect_uris))
+    return b"".join(parts)
+
+
+def encode_snapshot(entries, version):
+    """Serialize ``entries`` (ClientEntry objects) into snapshot bytes."""
+    entries = list(entries)
+    records = [encode_record(entry) for entry in entries]
+    records_offset = HEADER.size + INDEX_ENTRY.size * len(entries)
+
+    index = []
+    offset = records_offset
+    for entry, record in zip(entries, records):
+        index.append((key_hash(entry.client_id), offset))
+        offset += len(record)
+    index.sort()
+
+    built_at = _to_micros(datetime.now(timezone.utc))
+    return b"".join(
+        [
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, len(entries), built_at),
+            b"".join(INDEX_ENTRY.pack(*item) for item in index),
+            *records,
+        ]
+    )
+
+
+def write_snapshot(path, entries, version=None):
+    """Atomically replace the snapshot at ``path``; returns the new version."""
+    version = version if version is not None else time.time_ns()
+    data = encode_snapshot(entries, version)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return version
+
+
+def load_entries(chunk_size=2000):
+    from .models import Client
+
+    rows = Client.objects.filter(is_active=True).order_by("id").values(*ENTRY_FIELDS)
+    for row, scope_mask in group_scope_rows(rows.iterator(chunk_size=chunk_size)):
+        yield ClientEntry.from_values(row, scope_mask)
+
+
+def build_snapshot(path):
+    """Write a snapshot of all active clients; returns (version, count)."""
+    started = time.monotonic()
+    entries = list(load_entries())
+    version = write_snapshot(path, entries)
+    duration = time.monotonic() - started
+    snapshot_build_seconds.set(round(duration, 6))
+    logger.info(
+        "Built client snapshot v%d with %d clients in %.3fs",
+        version,
+        len(entries),
+        duration,
+    )
+    return version, len(entries)
+
+
+class MappedSnapshot:
+    """A single snapshot file mapped read-only into memory."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < HEADER.size:
+                raise SnapshotError(f"Snapshot {path} is truncated")
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, _, version, count, built_at = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise SnapshotError(f"{path} is not a version {FORMAT_VERSION} snapshot")
+
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        self.version = version
+        self.count = count
+        self.built_at = _from_micros(built_at)
+
+    def __len__(self):
+        return self.count
+
+    def _index_at(self, position):
+        return INDEX_ENTRY.unpack_from(
+            self._buf, HEADER.size + position * INDEX_ENTRY.size
+        )
+
+    def _first_position(self, target):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._index_at(mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, client_id):
+        """Return the ClientEntry for ``client_id``, or None if absent."""
+        target = key_hash(client_id)
+        encoded_id = client_id.encode()
+        buf = self._buf
+        position = self._first_position(target)
+        while position < self.count:
+            hashed, offset = self._index_at(position)
+            if hashed != target:
+                break
+            (id_len,) = U16.unpack_from(buf, offset)
+            start = offset + U16.size
+            if buf[start : start + id_len] == encoded_id:
+                return self._decode(client_id, start + id_len)
+            position += 1
+        return None
+
+    def _decode(self, client_id, offset):
+        buf = self._buf
+        (
+            client_type,
+            has_secret,
+            secret_hash,
+            scope_mask,
+            updated_at,
+            rate_limit,
+            rate_limit_burst,
+            uri_count,
+        ) = RECORD_FIXED.unpack_from(buf, offset)
+        offset += RECORD_FIXED.size
+        uris = []
+        for _ in range(uri_count):
+            (length,) = U16.unpack_from(buf, offset)
+            offset += U16.size
+            uris.append(buf[offset : offset + length].decode())
+            offset += length
+
+        return ClientEntry(
+            client_id=client_id,
+            client_type=CLIENT_TYPES[client_type],
+            secret_hash=secret_hash if has_secret else None,
+            redirect_uris=uris,
+            scope_mask=scope_mask,
+            updated_at=_from_micros(updated_at),
+            rate_limit=None if rate_limit == UNSET else rate_limit,
+            rate_limit_burst=None if rate_limit_burst == UNSET else rate_limit_burst,
+        )
+
+
+class ClientSnapshot:
+    """
+    Worker-side handle on the shared snapshot file.
+
+    The file is re-checked at most every ``SNAPSHOT_CHECK_INTERVAL`` seconds
+    and swapped when a new version has been published. Readers hold a
+    reference to the mapping they started with, so a swap never invalidates
+    a lookup in progress.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._current = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self._path or get_setting("SNAPSHOT_PATH")
+
+    @property
+    def version(self):
+        current = self._current
+        return current.version if current is not None else None
+
+    def mapped(self):
+        """Return the current MappedSnapshot, or None if there is none."""
+        path = self.path
+        if not path:
+            return None
+
+        now = time.monotonic()
+        if now - self._checked_at >= get_setting("SNAPSHOT_CHECK_INTERVAL"):
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._checked_at = now
+                    self._refresh(path)
+                finally:
+                    self._lock.release()
+        return self._current
+
+    def _refresh(self, path):
+        current = self._current
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        if current is not None and current.identity == (
+            stat.st_dev,
+            stat.st_ino,
+            stat.st_mtime_ns,
+        ):
+            return
+
+        try:
+            mapped = MappedSnapshot(path)
+        except (OSError, ValueError, SnapshotError):
+            logger.exception("Failed to map client snapshot %s", path)
+            return
+
+        if current is None or mapped.version != current.version:
+            logger.info(
+                "Mapped client snapshot v%d (%d clients)", mapped.version, mapped.count
+            )
+        self._current = mapped
+        snapshot_version.set(mapped.version)
+        snapshot_entries.set(mapped.count)
+
+    def get(self, client_id):
+        mapped = self.mapped()
+        return mapped.get(client_id) if mapped is not None else None
+
+    def reset(self):
+        self._current = None
+        self._checked_at = 0.0
+
+
+class SnapshotPublisher:
+    """
+    Leader election and periodic rebuilds across the workers of one host.
+
+    Every worker runs a publisher thread; the one holding an exclusive
+    ``flock`` on ``<path>.lock`` rebuilds the snapshot every
+    ``SNAPSHOT_REBUILD_INTERVAL`` seconds. If the leader exits, the lock is
+    released and another worker takes over on its next attempt.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.is_leader = False
+        self._lock_file = None
+        self._stop = threading.Event()
+
+    def try_acquire(self):
+        if self.is_leader:
+            return True
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self.is_leader = True
+        logger.info("Acquired client snapshot leadership (pid %d)", os.getpid())
+        return True
+
+    def release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    def run_once(self):
+        if not self.try_acquire():
+            return None
+        try:
+            return build_snapshot(self.path)
+        finally:
+            connections.close_all()
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Client snapshot rebuild failed")
+            self._stop.wait(get_setting("SNAPSHOT_REBUILD_INTERVAL"))
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="oauth2-snapshot", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+        self.release()
+
+
+client_snapshot = ClientSnapshot()
@@ -1,7 +1,34 @@
 from django.urls import path
-from .views import health_check, version
+from .views import (
+    client_changes,
+    client_configuration,
+    client_detail,
+    client_export,
+    client_export_delta,
+    client_list,
+    health_check,
+    metrics_view,
+    ready,
+    register,
+    register_batch,
+    version,
+)
 
 urlpatterns = [
     path("health/", health_check, name="health-check"),
     path("version/", version, name="version"),
+    path("ready/", ready, name="ready"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("register/", register, name="register"),
+    path("register/batch/", register_batch, name="register-batch"),
+    path(
+        "register/<str:client_id>/",
+        client_configuration,
+        name="client-configuration",
+    ),
+    path("clients/", client_list, name="client-list"),
+    path("clients/changes/", client_changes, name="client-changes"),
+    path("clients/export/", client_export, name="client-export"),
+    path("clients/export/delta/", client_export_delta, name="client-export-delta"),
+    path("clients/<str:client_id>/", client_detail, name="client-detail"),
 ]
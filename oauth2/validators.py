@@ -65,3 +65,19 @@ def validate_redirect_uris(uris):
         validated.append(validated_uri)
 
     return validated
+
+
+# RFC 6749 Section 3.3: scope-token = 1*( %x21 / %x23-5B / %x5D-7E )
+SCOPE_TOKEN_CHARS = frozenset(
+    chr(c) for c in [0x21, *range(0x23, 0x5C), *range(0x5D, 0x7F)]
+)
+
+
+def validate_scope_name(name):
+    if not name or not isinstance(name, str):
+        raise ValidationError("Scope name must be a non-empty string.")
+
+    if not set(name) <= SCOPE_TOKEN_CHARS:
+        raise ValidationError(f"Scope name contains invalid characters: {name}")
+
+    return name
@@ -1,13 +1,384 @@
-from rest_framework.decorators import api_view
+import math
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.response import Response
 from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+from .authentication import ClientAuthError, authenticate_client
+from .changefeed import Cursor, CursorExpired, InvalidCursor, changes_since
+from .conf import get_setting
+from .export import build_delta, export_cache
+from .listing import PageCursor, list_clients
+from .metadata import metadata_cache, metadata_etag
+from .metrics import metrics
+from .models import Client
+from .openapi import (
+    ClientChangesSerializer,
+    ClientConfigurationSerializer,
+    ClientExportDeltaSerializer,
+    ClientInformationSerializer,
+    ClientMetadataSerializer,
+    ClientPageSerializer,
+    ErrorSerializer,
+    HealthSerializer,
+    ReadinessSerializer,
+    RegistrationBatchResultSerializer,
+    RegistrationBatchSerializer,
+    VersionSerializer,
+)
+from .permissions import HasPlatformToken
+from .ratelimit import throttle_client
+from .readiness import public_checks, readiness
+from .registry import client_registry
+from .registration import (
+    DEFAULT_AUTH_METHOD,
+    RegistrationError,
+    register_client,
+    register_clients,
+)
+from .scopes import scope_registry
+from .serializers import ClientSerializer
+
+CURSOR = OpenApiParameter("cursor", str, description="Cursor of the previous page.")
+NOT_MODIFIED = OpenApiResponse(description="Not modified (If-None-Match).")
 
 
+@extend_schema(responses=HealthSerializer)
 @api_view(["GET"])
 def health_check(request):
     return Response({"status": "ok"})
 
 
+@extend_schema(responses=VersionSerializer)
 @api_view(["GET"])
 def version(request):
     return Response({"service": "MyAuthService", "version": settings.SERVICE_VERSION})
+
+
+@extend_schema(responses={200: ReadinessSerializer, 503: ReadinessSerializer})
+@api_view(["GET"])
+def ready(request):
+    is_ready, checks = readiness.check()
+    # Details name hosts and drivers; only platform services see them.
+    if not HasPlatformToken().has_permission(request, None):
+        checks = public_checks(checks)
+    return Response(
+        {"status": "ready" if is_ready else "unavailable", "checks": checks},
+        status=200 if is_ready else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@require_GET
+def metrics_view(request):
+    if not get_setting("METRICS_ENABLED"):
+        raise Http404
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4")
+
+
+def _etag_matches(request, etag):
+    """If-None-Match matches ``etag`` (weak comparison, lists and ``*``)."""
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    return etag in if_none_match or f"W/{etag}" in if_none_match or "*" in if_none_match
+
+
+def _invalid_request(description):
+    return Response(
+        {"error": "invalid_request", "error_description": description}, status=400
+    )
+
+
+def _resync_required():
+    return Response(
+        {
+            "error": "resync_required",
+            "error_description": "The cursor is older than the change feed "
+            "retention; start over from a full read.",
+        },
+        status=410,
+    )
+
+
+@extend_schema(
+    operation_id="clients_changes",
+    parameters=[CURSOR, OpenApiParameter("limit", int)],
+    responses={
+        200: ClientChangesSerializer,
+        400: ErrorSerializer,
+        410: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def client_changes(request):
+    try:
+        cursor = (
+            Cursor.decode(request.GET["cursor"]) if "cursor" in request.GET else None
+        )
+        limit = min(max(int(request.GET.get("limit", 500)), 1), 1000)
+    except (InvalidCursor, ValueError):
+        return _invalid_request("Invalid cursor or limit.")
+
+    try:
+        batch = changes_since(cursor, limit=limit)
+    except CursorExpired:
+        return _resync_required()
+    return Response(
+        {
+            "changes": [
+                {
+                    "client_id": entry.client_id,
+                    "client_type": entry.client_type,
+                    "is_active": entry.is_active,
+                    "redirect_uris": sorted(entry.redirect_uris),
+                    "scope": scope_registry.format(entry.scope_mask),
+                    "updated_at": entry.updated_at,
+                }
+                for entry in batch.upserts
+            ],
+            "deleted": batch.deletes,
+            "cursor": batch.cursor.encode(),
+            "has_more": batch.has_more,
+        }
+    )
+
+
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+@extend_schema(
+    operation_id="clients_list",
+    parameters=[
+        OpenApiParameter("client_type", str, enum=dict(Client.CLIENT_TYPE_CHOICES)),
+        OpenApiParameter("is_active", bool),
+        CURSOR,
+        OpenApiParameter("limit", int),
+        OpenApiParameter("fields", str, description="Comma-separated fields."),
+    ],
+    responses={200: ClientPageSerializer, 400: ErrorSerializer},
+)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def client_list(request):
+    filters = {}
+    if "client_type" in request.GET:
+        filters["client_type"] = request.GET["client_type"]
+        if filters["client_type"] not in dict(Client.CLIENT_TYPE_CHOICES):
+            return _invalid_request("Invalid client_type.")
+    if "is_active" in request.GET:
+        filters["is_active"] = BOOLEANS.get(request.GET["is_active"].lower())
+        if filters["is_active"] is None:
+            return _invalid_request("is_active must be true or false.")
+
+    try:
+        cursor = (
+            PageCursor.decode(request.GET["cursor"])
+            if "cursor" in request.GET
+            else None
+        )
+        limit = min(max(int(request.GET.get("limit", 100)), 1), 1000)
+        fields = (
+            [name for name in request.GET["fields"].split(",") if name]
+            if "fields" in request.GET
+            else None
+        )
+        page = list_clients(cursor, limit=limit, fields=fields, **filters)
+    except (InvalidCursor, ValueError):
+        return _invalid_request("Invalid cursor, limit or fields.")
+
+    return Response(
+        {
+            "clients": page.clients,
+            "cursor": page.cursor.encode() if page.cursor else None,
+            "has_more": page.has_more,
+        }
+    )
+
+
+@extend_schema(
+    operation_id="clients_retrieve",
+    responses={200: ClientSerializer.drf_serializer(), 304: NOT_MODIFIED},
+)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def client_detail(request, client_id):
+    entry = client_registry.get(client_id)
+    if entry is None:
+        raise Http404
+
+    etag = metadata_etag(entry.updated_at)
+    if _etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        document = metadata_cache.get(client_id, entry.updated_at)
+        if document is None:
+            rendered = metadata_cache.render(client_id)
+            if rendered is None:
+                raise Http404
+            # The row may be newer than a registry entry not yet refreshed.
+            updated_at, document = rendered
+            etag = metadata_etag(updated_at)
+        response = HttpResponse(document, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@extend_schema(
+    operation_id="clients_export",
+    responses={
+        (200, "application/octet-stream"): OpenApiTypes.BINARY,
+        304: NOT_MODIFIED,
+    },
+)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def client_export(request):
+    if not get_setting("EDGE_EXPORT_SIGNING_KEY"):
+        raise Http404
+
+    version, data, etag = export_cache.get()
+    if _etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(data, content_type="application/octet-stream")
+    response["ETag"] = etag
+    response["X-Export-Version"] = version
+    # Shared caches only store responses to requests carrying Authorization
+    # when told to; Vary keeps them from serving it to other credentials.
+    ttl = get_setting("EDGE_EXPORT_TTL")
+    response["Cache-Control"] = f"public, max-age={ttl}, s-maxage={ttl}"
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+
+@extend_schema(
+    operation_id="clients_export_delta",
+    parameters=[
+        OpenApiParameter("since", str, required=True),
+        OpenApiParameter("limit", int),
+    ],
+    responses={
+        200: ClientExportDeltaSerializer,
+        400: ErrorSerializer,
+        410: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def client_export_delta(request):
+    if not get_setting("EDGE_EXPORT_SIGNING_KEY"):
+        raise Http404
+
+    try:
+        since = request.GET["since"]
+        limit = min(max(int(request.GET.get("limit", 1000)), 1), 1000)
+        data, signature = build_delta(since, limit=limit)
+    except CursorExpired:
+        return _resync_required()
+    except (KeyError, InvalidCursor, ValueError):
+        return _invalid_request("Missing or invalid since version, or invalid limit.")
+
+    response = HttpResponse(data, content_type="application/json")
+    response["X-Content-Signature"] = f"sha256={signature.hex()}"
+    return response
+
+
+@extend_schema(
+    operation_id="clients_register",
+    request=ClientMetadataSerializer,
+    responses={201: ClientInformationSerializer, 400: ErrorSerializer},
+)
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def register(request):
+    try:
+        info = register_client(request.data)
+    except RegistrationError as e:
+        return Response(e.as_dict(), status=400)
+    return Response(info, status=201, headers={"Cache-Control": "no-store"})
+
+
+@extend_schema(
+    operation_id="clients_register_batch",
+    request=RegistrationBatchSerializer,
+    responses={200: RegistrationBatchResultSerializer, 400: ErrorSerializer},
+)
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([HasPlatformToken])
+def register_batch(request):
+    items = request.data.get("clients") if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return _invalid_request("Expected a non-empty list of clients.")
+    limit = get_setting("REGISTRATION_BATCH_LIMIT")
+    if len(items) > limit:
+        return _invalid_request(f"At most {limit} clients per batch.")
+
+    results = register_clients(items)
+    registered = sum(result["status"] == 201 for result in results)
+    return Response(
+        {
+            "results": results,
+            "registered": registered,
+            "failed": len(results) - registered,
+        },
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def _client_auth_failed(error):
+    # RFC 6749 Section 5.2: 401 with the scheme the client may retry with.
+    headers = {"WWW-Authenticate": 'Basic realm="oauth2"'}
+    if error.retry_after:
+        headers["Retry-After"] = str(math.ceil(error.retry_after))
+    return Response(error.as_dict(), status=401, headers=headers)
+
+
+@extend_schema(
+    operation_id="clients_configuration",
+    responses={
+        200: ClientConfigurationSerializer,
+        401: ErrorSerializer,
+        429: OpenApiResponse(description="Over the client's rate limit."),
+    },
+)
+@api_view(["GET"])
+@authentication_classes([])
+def client_configuration(request, client_id):
+    """Read a client's registration with its own client credentials (RFC 7592)."""
+    try:
+        entry = authenticate_client(request)
+    except ClientAuthError as e:
+        return _client_auth_failed(e)
+    if entry.client_id != client_id:
+        # The same answer as a wrong secret: telling them apart would confirm
+        # that the credentials are valid for some other client.
+        return _client_auth_failed(ClientAuthError("Client authentication failed."))
+    throttle_client(entry)
+    return Response(
+        {
+            "client_id": entry.client_id,
+            "redirect_uris": sorted(entry.redirect_uris),
+            "token_endpoint_auth_method": (
+                DEFAULT_AUTH_METHOD if entry.is_confidential else "none"
+            ),
+            "scope": scope_registry.format(entry.scope_mask),
+        },
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,128 @@
+"""
+Startup warm-up of the per-worker client caches.
+
+Without it, the first requests after every deploy or autoscale event pay for
+cold registry, scope and client_id filter lookups. The warm-up streams every
+client through a single ``values()`` query and fills all three at once.
+"""
+
+import logging
+import threading
+import time
+
+from django.db import connections
+
+from .conf import get_setting
+from .filters import client_id_filter
+from .metrics import metrics
+from .entries import ENTRY_FIELDS, ClientEntry, group_scope_rows
+from .registry import client_registry
+from .scopes import scope_registry
+
+logger = logging.getLogger(__name__)
+
+warmup_seconds = metrics.gauge(
+    "oauth2_warmup_seconds", "Duration of the last client registry warm-up."
+)
+warmup_entries = metrics.gauge(
+    "oauth2_warmup_entries", "Active clients loaded by the last warm-up."
+)
+
+
+class WarmupState:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.status = self.PENDING
+        self.entries = 0
+        self.duration = None
+        self.finished = threading.Event()
+
+    def as_dict(self):
+        return {
+            "status": self.status,
+            "entries": self.entries,
+            "duration": self.duration,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def warm_up(chunk_size=None):
+    """
+    Preload active clients, the scope mapping and the client_id filter.
+
+    Returns the number of active clients loaded and the duration in seconds.
+    """
+    from .models import Client
+
+    chunk_size = chunk_size or get_setting("WARMUP_CHUNK_SIZE")
+    started = time.monotonic()
+    generation = client_registry.generation
+
+    scope_registry.load()
+
+    build_filter = client_id_filter.enabled
+    new_filter = (
+        client_id_filter.new_filter(Client.objects.count()) if build_filter else None
+    )
+    last_created_at = None
+
+    rows = Client.objects.order_by("id").values(*ENTRY_FIELDS)
+    entries = []
+    for row, scope_mask in group_scope_rows(rows.iterator(chunk_size=chunk_size)):
+        if build_filter:
+            new_filter.add(row["client_id"])
+            if last_created_at is None or row["created_at"] > last_created_at:
+                last_created_at = row["created_at"]
+        if row["is_active"]:
+            entries.append(ClientEntry.from_values(row, scope_mask))
+
+    client_registry.prime(entries, generation)
+    if build_filter:
+        client_id_filter.install(new_filter, last_created_at)
+
+    duration = time.monotonic() - started
+    warmup_seconds.set(round(duration, 6))
+    warmup_entries.set(len(entries))
+    logger.info("Warmed up %d active clients in %.3fs", len(entries), duration)
+    return len(entries), duration
+
+
+def run_warm_up(state=warmup_state):
+    """Run the warm-up in this thread, recording the outcome in ``state``."""
+    state.status = WarmupState.RUNNING
+    try:
+        state.entries, state.duration = warm_up()
+        state.status = WarmupState.DONE
+    except Exception:
+        state.status = WarmupState.FAILED
+        logger.exception("Client registry warm-up failed")
+    finally:
+        connections.close_all()
+        state.finished.set()
+
+
+def start_warm_up(budget=None, state=warmup_state):
+    """
+    Run the warm-up in a background thread.
+
+    Startup waits at most ``budget`` seconds for it; after that the warm-up
+    keeps going in the background while the worker starts serving.
+    """
+    budget = get_setting("WARMUP_BUDGET") if budget is None else budget
+    thread = threading.Thread(
+        target=run_warm_up, args=(state,), name="oauth2-warmup", daemon=True
+    )
+    thread.start()
+    if not state.finished.wait(budget):
+        logger.info(
+            "Client registry warm-up still running after %.1fs budget; "
+            "continuing in the background",
+            budget,
+        )
+    return thread
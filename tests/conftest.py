@@ -0,0 +1,61 @@
+import pytest
+from oauth2.admission import admission_controller
+from oauth2.export import export_cache
+from oauth2.filters import client_id_filter
+from oauth2.lockout import address_failures, client_failures
+from oauth2.metadata import metadata_cache
+from oauth2.metrics import metrics
+from oauth2.ratelimit import rate_limiter
+from oauth2.readiness import readiness
+from oauth2.registry import client_registry
+from oauth2.routers import end_request, replica_set
+from oauth2.scopes import scope_registry
+from oauth2.sharding import id_allocator
+from oauth2.snapshot import client_snapshot
+
+
+def _reset_caches():
+    client_snapshot.reset()
+    export_cache.reset()
+    metadata_cache.reset()
+    readiness.reset()
+    client_id_filter.reset()
+    scope_registry.clear()
+    client_registry.clear()
+    replica_set.reset()
+    rate_limiter.reset()
+    admission_controller.reset()
+    id_allocator.reset()
+    client_failures.reset()
+    address_failures.reset()
+    end_request()
+
+
+@pytest.fixture(autouse=True)
+def reset_registries():
+    """Per-worker caches outlive the per-test database rollback."""
+    _reset_caches()
+    metrics.reset()
+    yield
+    _reset_caches()
+
+
+@pytest.fixture
+def make_client():
+    """Factory creating a Client; ``scopes``, if given, are granted to it."""
+    from oauth2.models import Client
+
+    def make(name="Test Client", scopes=None, **kwargs):
+        fields = {
+            "client_type": "confidential",
+            "redirect_uris": ["https://example.com/callback"],
+        }
+        fields.update(kwargs)
+        client = Client.objects.create(name=name, **fields)
+        if scopes is not None:
+            client.scopes.set(scopes)
+            # Granting scopes bumps updated_at.
+            client.refresh_from_db()
+        return client
+
+    return make
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from oauth2.changefeed import Cursor
+from oauth2.models import Client, ClientTombstone, Scope
+
+
+@pytest.fixture
+def platform_client(api_client, settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "CHANGE_FEED_SETTLE": 0,
+        "PLATFORM_API_TOKENS": ["platform-token"],
+    }
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+    return api_client
+
+
+@pytest.mark.django_db
+def test_requires_platform_token(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer wrong")
+    resp = api_client.get(reverse("client-changes"))
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_lists_changes_and_deletes(platform_client):
+    read = Scope.objects.create(name="read")
+    kept = Client.objects.create(
+        client_type="confidential",
+        name="Kept",
+        redirect_uris=["https://example.com/b", "https://example.com/a"],
+    )
+    kept.scopes.set([read])
+    removed = Client.objects.create(
+        client_type="public", name="Removed", redirect_uris=["https://example.com/cb"]
+    )
+    removed_id = removed.client_id
+    removed.delete()
+
+    resp = platform_client.get(reverse("client-changes"))
+
+    assert resp.status_code == 200
+    body = resp.json()
+    [change] = body["changes"]
+    assert change["client_id"] == kept.client_id
+    assert change["redirect_uris"] == ["https://example.com/a", "https://example.com/b"]
+    assert change["scope"] == "read"
+    assert "client_secret" not in change
+    assert body["deleted"] == [removed_id]
+    assert body["has_more"] is False
+
+    resp = platform_client.get(reverse("client-changes"), {"cursor": body["cursor"]})
+    assert resp.json()["changes"] == []
+
+
+@pytest.mark.django_db
+def test_rejects_bad_cursor(platform_client):
+    resp = platform_client.get(reverse("client-changes"), {"cursor": "garbage!"})
+    assert resp.status_code == 400
+    assert resp.json()["error"] == "invalid_request"
+
+
+@pytest.mark.django_db
+def test_expired_cursor_requires_resync(platform_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "CHANGE_FEED_RETENTION": 3600}
+    ClientTombstone.objects.create(client_id="gone")
+    ClientTombstone.objects.update(deleted_at=timezone.now() - timedelta(hours=2))
+    stale = Cursor.at(timezone.now() - timedelta(hours=3)).encode()
+
+    resp = platform_client.get(reverse("client-changes"), {"cursor": stale})
+
+    assert resp.status_code == 410
+    assert resp.json()["error"] == "resync_required"
@@ -0,0 +1,145 @@
+import base64
+
+import pytest
+from django.urls import reverse
+from oauth2.models import Scope
+
+
+def basic(client_id, secret=""):
+    credentials = base64.b64encode(f"{client_id}:{secret}".encode()).decode()
+    return f"Basic {credentials}"
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(scopes=[Scope.objects.create(name="read")])
+
+
+def configuration_url(client):
+    return reverse("client-configuration", args=[client.client_id])
+
+
+@pytest.mark.django_db
+def test_client_reads_its_registration(api_client, client):
+    resp = api_client.get(
+        configuration_url(client),
+        HTTP_AUTHORIZATION=basic(client.client_id, client.client_secret),
+    )
+
+    assert resp.status_code == 200
+    assert resp["Cache-Control"] == "no-store"
+    assert resp.json() == {
+        "client_id": client.client_id,
+        "redirect_uris": ["https://example.com/callback"],
+        "token_endpoint_auth_method": "client_secret_basic",
+        "scope": "read",
+    }
+
+
+@pytest.mark.django_db
+def test_public_client(api_client, make_client):
+    public = make_client(client_type="public")
+
+    resp = api_client.get(
+        configuration_url(public), HTTP_AUTHORIZATION=basic(public.client_id)
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["token_endpoint_auth_method"] == "none"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("secret", [None, "wrong"])
+def test_rejects_bad_credentials(api_client, client, secret):
+    headers = {}
+    if secret is not None:
+        headers["HTTP_AUTHORIZATION"] = basic(client.client_id, secret)
+
+    resp = api_client.get(configuration_url(client), **headers)
+
+    assert resp.status_code == 401
+    assert resp.json()["error"] == "invalid_client"
+    assert resp["WWW-Authenticate"] == 'Basic realm="oauth2"'
+
+
+def wrong_secret_response(api_client, client):
+    return api_client.get(
+        configuration_url(client),
+        HTTP_AUTHORIZATION=basic(client.client_id, "wrong"),
+    )
+
+
+@pytest.mark.django_db
+def test_rejects_another_clients_credentials(api_client, client, make_client):
+    other = make_client(name="Other")
+
+    resp = api_client.get(
+        configuration_url(client),
+        HTTP_AUTHORIZATION=basic(other.client_id, other.client_secret),
+    )
+
+    assert resp.status_code == 401
+    assert resp["WWW-Authenticate"] == 'Basic realm="oauth2"'
+    assert resp.json() == wrong_secret_response(api_client, client).json()
+
+
+@pytest.mark.django_db
+def test_unknown_client_is_not_revealed(api_client, client):
+    url = reverse("client-configuration", args=["no-such-client"])
+
+    resp = api_client.get(
+        url, HTTP_AUTHORIZATION=basic(client.client_id, client.client_secret)
+    )
+    unauthenticated = api_client.get(url)
+
+    assert resp.status_code == 401
+    assert resp.json() == wrong_secret_response(api_client, client).json()
+    assert unauthenticated.status_code == 401
+    assert unauthenticated.json()["error"] == "invalid_client"
+
+
+@pytest.mark.django_db
+def test_lockout_is_per_address(api_client, client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "AUTH_LOCKOUT_CLIENT_FAILURES": 2}
+    url = configuration_url(client)
+    for _ in range(2):
+        api_client.get(url, HTTP_AUTHORIZATION=basic(client.client_id, "wrong"))
+    good = basic(client.client_id, client.client_secret)
+
+    locked = api_client.get(url, HTTP_AUTHORIZATION=good)
+    elsewhere = api_client.get(url, HTTP_AUTHORIZATION=good, REMOTE_ADDR="10.0.0.9")
+
+    assert locked.status_code == 401
+    assert int(locked["Retry-After"]) > 0
+    assert elsewhere.status_code == 200
+
+
+@pytest.mark.django_db
+def test_rate_limited_per_client(api_client, make_client):
+    limited = make_client(rate_limit=60, rate_limit_burst=1)
+    auth = basic(limited.client_id, limited.client_secret)
+
+    first = api_client.get(configuration_url(limited), HTTP_AUTHORIZATION=auth)
+    second = api_client.get(configuration_url(limited), HTTP_AUTHORIZATION=auth)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second["Retry-After"]) >= 1
+
+
+@pytest.mark.django_db
+def test_failed_attempts_do_not_use_up_the_rate_limit(api_client, make_client):
+    limited = make_client(rate_limit=60, rate_limit_burst=1)
+    url = configuration_url(limited)
+    for _ in range(3):
+        api_client.get(
+            url,
+            HTTP_AUTHORIZATION=basic(limited.client_id, "wrong"),
+            REMOTE_ADDR="10.0.0.9",
+        )
+
+    resp = api_client.get(
+        url, HTTP_AUTHORIZATION=basic(limited.client_id, limited.client_secret)
+    )
+
+    assert resp.status_code == 200
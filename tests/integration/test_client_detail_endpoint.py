@@ -0,0 +1,100 @@
+import pytest
+from django.urls import reverse
+from oauth2.models import Client, Scope
+from oauth2.serializers import ClientSerializer
+
+
+@pytest.fixture
+def platform_client(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+    return api_client
+
+
+@pytest.fixture
+def client(db):
+    client = Client.objects.create(
+        client_type="confidential",
+        name="Detail",
+        redirect_uris=["https://example.com/callback"],
+    )
+    client.scopes.set([Scope.objects.create(name="read")])
+    client.refresh_from_db()
+    return client
+
+
+def detail_url(client):
+    return reverse("client-detail", args=[client.client_id])
+
+
+def test_requires_platform_token(api_client, client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    assert api_client.get(detail_url(client)).status_code == 403
+
+
+def test_returns_metadata(platform_client, client):
+    resp = platform_client.get(detail_url(client))
+
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/json"
+    assert resp["Cache-Control"] == "no-cache"
+    assert resp.json() == ClientSerializer().serialize_clients([client])[0]
+    assert resp.json()["scope"] == "read"
+    assert "client_secret" not in resp.json()
+
+
+def test_unknown_or_inactive_client(platform_client, client):
+    Client.objects.filter(pk=client.pk).update(is_active=False)
+
+    assert platform_client.get(detail_url(client)).status_code == 404
+    resp = platform_client.get(reverse("client-detail", args=["missing"]))
+    assert resp.status_code == 404
+
+
+def test_repeated_requests_skip_the_orm(
+    platform_client, client, django_assert_num_queries
+):
+    first = platform_client.get(detail_url(client))
+    etag = first["ETag"]
+
+    with django_assert_num_queries(0):
+        again = platform_client.get(detail_url(client))
+        conditional = platform_client.get(detail_url(client), HTTP_IF_NONE_MATCH=etag)
+
+    assert again.content == first.content
+    assert again["ETag"] == etag
+    assert conditional.status_code == 304
+    assert conditional["ETag"] == etag
+    assert conditional.content == b""
+
+
+def test_weak_and_wildcard_validators_match(platform_client, client):
+    etag = platform_client.get(detail_url(client))["ETag"]
+
+    for header in [f"W/{etag}", f'"other", {etag}', "*"]:
+        resp = platform_client.get(detail_url(client), HTTP_IF_NONE_MATCH=header)
+        assert resp.status_code == 304
+
+
+def test_change_moves_etag(platform_client, client):
+    etag = platform_client.get(detail_url(client))["ETag"]
+    client.name = "Renamed"
+    client.save()
+
+    resp = platform_client.get(detail_url(client), HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 200
+    assert resp["ETag"] != etag
+    assert resp.json()["name"] == "Renamed"
+
+
+def test_scope_rename_moves_etag(platform_client, client):
+    etag = platform_client.get(detail_url(client))["ETag"]
+    scope = Scope.objects.get(name="read")
+    scope.name = "profile"
+    scope.save()
+
+    resp = platform_client.get(detail_url(client), HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 200
+    assert resp.json()["scope"] == "profile"
@@ -0,0 +1,104 @@
+import hashlib
+import hmac
+
+import pytest
+from django.urls import reverse
+from oauth2.export import decode_export
+from oauth2.models import Client
+
+
+@pytest.fixture
+def platform_client(api_client, settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "CHANGE_FEED_SETTLE": 0,
+        "EDGE_EXPORT_SIGNING_KEY": "edge-key",
+        "PLATFORM_API_TOKENS": ["platform-token"],
+    }
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+    return api_client
+
+
+@pytest.mark.django_db
+def test_disabled_without_signing_key(platform_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "EDGE_EXPORT_SIGNING_KEY": None}
+    assert platform_client.get(reverse("client-export")).status_code == 404
+
+
+@pytest.mark.django_db
+def test_requires_platform_token(api_client, settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "EDGE_EXPORT_SIGNING_KEY": "edge-key",
+        "PLATFORM_API_TOKENS": ["platform-token"],
+    }
+    assert api_client.get(reverse("client-export")).status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_and_conditional_request(platform_client):
+    client = Client.objects.create(
+        client_type="public", name="App", redirect_uris=["https://example.com/cb"]
+    )
+
+    resp = platform_client.get(reverse("client-export"))
+
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/octet-stream"
+    version, clients = decode_export(resp.content, key="edge-key")
+    assert version == resp["X-Export-Version"]
+    assert client.client_id in clients
+
+    resp = platform_client.get(
+        reverse("client-export"), HTTP_IF_NONE_MATCH=resp["ETag"]
+    )
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_export_is_cacheable_by_shared_caches(platform_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "EDGE_EXPORT_TTL": 45}
+
+    resp = platform_client.get(reverse("client-export"))
+
+    directives = {d.strip() for d in resp["Cache-Control"].split(",")}
+    assert directives == {"public", "max-age=45", "s-maxage=45"}
+    assert "Authorization" in resp["Vary"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "if_none_match", ['"stale", {etag}', "W/{etag}", "*", '{etag}, "other"']
+)
+def test_conditional_request_parses_validators(platform_client, if_none_match):
+    etag = platform_client.get(reverse("client-export"))["ETag"]
+
+    resp = platform_client.get(
+        reverse("client-export"),
+        HTTP_IF_NONE_MATCH=if_none_match.format(etag=etag),
+    )
+
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_signed_delta(platform_client):
+    version = platform_client.get(reverse("client-export"))["X-Export-Version"]
+    client = Client.objects.create(
+        client_type="public", name="App", redirect_uris=["https://example.com/cb"]
+    )
+
+    resp = platform_client.get(reverse("client-export-delta"), {"since": version})
+
+    assert resp.status_code == 200
+    expected = hmac.new(b"edge-key", resp.content, hashlib.sha256).hexdigest()
+    assert resp["X-Content-Signature"] == f"sha256={expected}"
+    assert [item["client_id"] for item in resp.json()["upserts"]] == [client.client_id]
+
+
+@pytest.mark.django_db
+def test_delta_requires_valid_version(platform_client):
+    resp = platform_client.get(reverse("client-export-delta"))
+    assert resp.status_code == 400
+    resp = platform_client.get(reverse("client-export-delta"), {"since": "garbage!"})
+    assert resp.json()["error"] == "invalid_request"
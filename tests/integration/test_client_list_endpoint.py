@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from oauth2.models import Client
+
+
+@pytest.fixture
+def platform_client(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+    return api_client
+
+
+@pytest.fixture
+def make_clients(make_client):
+    def make(count, client_type="public", **kwargs):
+        clients = []
+        now = timezone.now()
+        for number in range(count):
+            client = make_client(
+                f"client-{number:02d}", client_type=client_type, **kwargs
+            )
+            # Pairs share a created_at so pages must break ties on id.
+            Client.objects.filter(pk=client.pk).update(
+                created_at=now - timedelta(seconds=number // 2)
+            )
+            clients.append(client)
+        return clients
+
+    return make
+
+
+def list_all(api_client, **params):
+    pages = []
+    while True:
+        body = api_client.get(reverse("client-list"), params).json()
+        pages.append(body["clients"])
+        if not body["has_more"]:
+            assert body["cursor"] is None
+            return pages
+        params["cursor"] = body["cursor"]
+
+
+@pytest.mark.django_db
+def test_requires_platform_token(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    assert api_client.get(reverse("client-list")).status_code == 403
+
+
+@pytest.mark.django_db
+class TestClientList:
+    def test_pages_newest_first(self, platform_client, make_clients):
+        clients = make_clients(7)
+
+        pages = list_all(platform_client, limit=3)
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        names = [client["name"] for page in pages for client in page]
+        for client in clients:
+            client.refresh_from_db()
+        clients.sort(key=lambda client: (client.created_at, client.pk), reverse=True)
+        assert names == [client.name for client in clients]
+
+    def test_filters(self, platform_client, make_clients):
+        make_clients(2)
+        make_clients(3, client_type="confidential")
+        make_clients(1, client_type="confidential", is_active=False)
+
+        resp = platform_client.get(
+            reverse("client-list"), {"client_type": "confidential", "is_active": "true"}
+        )
+
+        clients = resp.json()["clients"]
+        assert len(clients) == 3
+        assert {client["client_type"] for client in clients} == {"confidential"}
+        assert all(client["is_active"] for client in clients)
+
+    def test_fields_limit_selected_columns(self, platform_client, make_clients):
+        make_clients(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = platform_client.get(
+                reverse("client-list"), {"fields": "client_id,name"}
+            )
+
+        assert list(resp.json()["clients"][0]) == ["client_id", "name"]
+        [query] = queries.captured_queries
+        assert "description" not in query["sql"]
+        assert "redirect_uris" not in query["sql"]
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"cursor": "garbage!"},
+            {"limit": "many"},
+            {"fields": "client_id,client_secret"},
+            {"client_type": "robot"},
+            {"is_active": "maybe"},
+        ],
+    )
+    def test_rejects_invalid_parameters(self, platform_client, params):
+        resp = platform_client.get(reverse("client-list"), params)
+
+        assert resp.status_code == 400
+        assert resp.json()["error"] == "invalid_request"
+
+
+@pytest.mark.django_db(databases=["default", "shard1"])
+def test_pages_across_shards(platform_client, settings, make_clients):
+    settings.OAUTH2 = {**settings.OAUTH2, "CLIENT_SHARDS": ["default", "shard1"]}
+    settings.DATABASE_ROUTERS = ["oauth2.routers.ShardRouter"]
+    make_clients(12)
+
+    pages = list_all(platform_client, limit=5, fields="client_id")
+
+    client_ids = [client["client_id"] for page in pages for client in page]
+    assert len(client_ids) == len(set(client_ids)) == 12
@@ -0,0 +1,59 @@
+import pytest
+from django.urls import reverse
+from oauth2 import readiness as readiness_module
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ready(api_client):
+    resp = api_client.get(reverse("ready"))
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "ready"
+    assert set(body["checks"]) == {
+        "database",
+        "migrations",
+        "caches",
+        "signing_keys",
+        "client_cache",
+    }
+    assert all(check["status"] == "ok" for check in body["checks"].values())
+    assert resp["Cache-Control"] == "no-store"
+
+
+@pytest.mark.django_db
+def test_not_ready(api_client, monkeypatch):
+    def down():
+        raise readiness_module.ProbeFailed("database unreachable")
+
+    monkeypatch.setitem(readiness_module.readiness.probes, "database", down)
+
+    resp = api_client.get(reverse("ready"))
+
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "unavailable"
+    assert set(resp.json()["checks"]["database"]) == {"status", "latency_ms"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_details_are_hidden_from_the_public(api_client):
+    body = api_client.get(reverse("ready")).json()
+
+    assert all(
+        set(check) == {"status", "latency_ms"} for check in body["checks"].values()
+    )
+
+
+@pytest.mark.django_db
+def test_platform_services_see_details(api_client, settings, monkeypatch):
+    def down():
+        raise readiness_module.ProbeFailed("database unreachable")
+
+    monkeypatch.setitem(readiness_module.readiness.probes, "database", down)
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+
+    resp = api_client.get(reverse("ready"))
+
+    assert resp.status_code == 503
+    assert resp.json()["checks"]["database"]["detail"] == "database unreachable"
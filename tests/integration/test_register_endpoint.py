@@ -0,0 +1,161 @@
+import pytest
+from django.urls import reverse
+from oauth2.filters import client_id_filter
+from oauth2.models import Client, Scope
+from oauth2.registry import client_registry
+
+
+@pytest.fixture
+def platform_client(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    api_client.credentials(HTTP_AUTHORIZATION="Bearer platform-token")
+    return api_client
+
+
+def metadata(**kwargs):
+    return {
+        "redirect_uris": ["https://app.example.com/callback"],
+        "client_name": "Registered",
+        **kwargs,
+    }
+
+
+@pytest.mark.django_db
+def test_requires_platform_token(api_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "PLATFORM_API_TOKENS": ["platform-token"]}
+    resp = api_client.post(reverse("register"), metadata(), format="json")
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+class TestRegister:
+    def test_registers_confidential_client(self, platform_client):
+        Scope.objects.create(name="read")
+        Scope.objects.create(name="write")
+
+        resp = platform_client.post(
+            reverse("register"), metadata(scope="write read"), format="json"
+        )
+
+        assert resp.status_code == 201
+        assert resp["Cache-Control"] == "no-store"
+        body = resp.json()
+        client = Client.objects.get(client_id=body["client_id"])
+        assert body["client_secret"] == client.client_secret
+        assert body["client_secret_expires_at"] == 0
+        assert body["client_id_issued_at"] == int(client.created_at.timestamp())
+        assert body["token_endpoint_auth_method"] == "client_secret_basic"
+        assert body["scope"] == "write read"
+        assert client.client_type == "confidential"
+        assert client.name == "Registered"
+        assert sorted(client.scopes.values_list("name", flat=True)) == [
+            "read",
+            "write",
+        ]
+        assert client_registry.get(client.client_id).scope_mask == 0b11
+
+    def test_registers_public_client(self, platform_client):
+        resp = platform_client.post(
+            reverse("register"),
+            metadata(token_endpoint_auth_method="none"),
+            format="json",
+        )
+
+        assert resp.status_code == 201
+        body = resp.json()
+        assert "client_secret" not in body
+        assert Client.objects.get(client_id=body["client_id"]).client_type == "public"
+
+    @pytest.mark.parametrize(
+        "overrides, error",
+        [
+            ({"redirect_uris": []}, "invalid_redirect_uri"),
+            ({"redirect_uris": ["http://example.com/cb"]}, "invalid_redirect_uri"),
+            (
+                {"token_endpoint_auth_method": "private_key_jwt"},
+                "invalid_client_metadata",
+            ),
+            ({"scope": "unknown"}, "invalid_client_metadata"),
+            ({"client_name": ["x"]}, "invalid_client_metadata"),
+        ],
+    )
+    def test_rejects_invalid_metadata(self, platform_client, overrides, error):
+        resp = platform_client.post(
+            reverse("register"), metadata(**overrides), format="json"
+        )
+
+        assert resp.status_code == 400
+        assert resp.json()["error"] == error
+        assert not Client.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRegisterBatch:
+    def test_registers_valid_items(
+        self, platform_client, django_assert_max_num_queries
+    ):
+        Scope.objects.create(name="read")
+        items = [
+            metadata(client_name=f"client-{number}", scope="read")
+            for number in range(20)
+        ]
+        items.insert(3, metadata(redirect_uris=["not a uri"]))
+        items.append(metadata(token_endpoint_auth_method="none"))
+
+        with django_assert_max_num_queries(6):
+            resp = platform_client.post(
+                reverse("register-batch"), {"clients": items}, format="json"
+            )
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert (body["registered"], body["failed"]) == (21, 1)
+        results = body["results"]
+        assert [result["status"] for result in results[2:5]] == [201, 400, 201]
+        assert results[3]["error"] == "invalid_redirect_uri"
+        assert results[4]["client"]["client_name"] == "client-3"
+        assert "client_secret" not in results[-1]["client"]
+
+        first = Client.objects.get(client_id=results[0]["client"]["client_id"])
+        assert first.client_secret == results[0]["client"]["client_secret"]
+        assert list(first.scopes.values_list("name", flat=True)) == ["read"]
+        assert Client.objects.count() == 21
+        assert client_id_filter.might_contain(first.client_id)
+
+    @pytest.mark.parametrize("payload", [{}, {"clients": []}, {"clients": "x"}, []])
+    def test_rejects_malformed_batch(self, platform_client, payload):
+        resp = platform_client.post(reverse("register-batch"), payload, format="json")
+
+        assert resp.status_code == 400
+        assert resp.json()["error"] == "invalid_request"
+
+    def test_batch_limit(self, platform_client, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "REGISTRATION_BATCH_LIMIT": 2}
+
+        resp = platform_client.post(
+            reverse("register-batch"), {"clients": [metadata()] * 3}, format="json"
+        )
+
+        assert resp.status_code == 400
+        assert not Client.objects.exists()
+
+
+@pytest.mark.django_db(databases=["default", "shard1"])
+def test_batch_registers_across_shards(platform_client, settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "CLIENT_SHARDS": ["default", "shard1"]}
+    settings.DATABASE_ROUTERS = ["oauth2.routers.ShardRouter"]
+    Scope.objects.create(name="read")
+
+    resp = platform_client.post(
+        reverse("register-batch"),
+        {"clients": [metadata(scope="read") for _ in range(16)]},
+        format="json",
+    )
+
+    assert resp.json()["registered"] == 16
+    for result in resp.json()["results"]:
+        client = Client.objects.get(client_id=result["client"]["client_id"])
+        assert list(client.scopes.values_list("name", flat=True)) == ["read"]
+    assert {
+        alias for alias in ("default", "shard1") if Client.objects.using(alias).exists()
+    } == {"default", "shard1"}
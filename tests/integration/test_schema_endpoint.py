@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from myauthservice import schema as schema_module
+from myauthservice.schema import schema_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_schema_cache():
+    schema_cache.clear()
+    yield
+    schema_cache.clear()
+
+
+@pytest.mark.django_db
+def test_schema_rendered_once(api_client, monkeypatch):
+    calls = []
+    render = schema_module.render_schema
+    monkeypatch.setattr(
+        schema_module, "render_schema", lambda fmt: calls.append(fmt) or render(fmt)
+    )
+
+    first = api_client.get(reverse("schema"))
+    second = api_client.get(reverse("schema"))
+
+    assert first.status_code == 200
+    assert first["Content-Type"] == "application/vnd.oai.openapi; charset=utf-8"
+    assert b"openapi:" in first.content
+    assert second.content == first.content
+    assert calls == ["yaml"]
+
+
+@pytest.mark.django_db
+def test_json_format(api_client):
+    resp = api_client.get(reverse("schema"), {"format": "json"})
+
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/vnd.oai.openapi+json"
+    assert "paths" in resp.json()
+
+
+@pytest.mark.django_db
+def test_conditional_request(api_client):
+    etag = api_client.get(reverse("schema"))["ETag"]
+
+    resp = api_client.get(reverse("schema"), HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 304
+    assert resp["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_serves_pre_rendered_schema(api_client, settings, tmp_path):
+    call_command("render_schema", dir=str(tmp_path))
+    (tmp_path / "openapi.yaml").write_bytes(b"openapi: 3.0.3\n# pre-rendered\n")
+    settings.SCHEMA_CACHE_DIR = str(tmp_path)
+
+    resp = api_client.get(reverse("schema"))
+
+    assert resp.content == b"openapi: 3.0.3\n# pre-rendered\n"
+    assert (tmp_path / "openapi.json").exists()
+
+
+@pytest.mark.django_db
+def test_conditional_request_parses_validators(api_client):
+    etag = api_client.get(reverse("schema"))["ETag"]
+    partial = etag[:-5] + '"'
+
+    assert (
+        api_client.get(reverse("schema"), HTTP_IF_NONE_MATCH=partial).status_code == 200
+    )
+    resp = api_client.get(reverse("schema"), HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+    assert resp.status_code == 304
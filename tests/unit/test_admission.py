@@ -0,0 +1,206 @@
+import asyncio
+import json
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from oauth2.admission import (
+    AdaptiveLimit,
+    AdmissionControlMiddleware,
+    AdmissionController,
+    Overloaded,
+)
+from oauth2.metrics import metrics
+
+ROUTE_CLASSES = {
+    "token": {"prefixes": ["/api/token/"], "max_in_flight": 2},
+    "admin": {"prefixes": ["/admin/"], "max_in_flight": 1},
+    "default": {"max_in_flight": None},
+}
+
+
+@pytest.fixture
+def admission(settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "ADMISSION_ROUTE_CLASSES": ROUTE_CLASSES,
+        "ADMISSION_MAX_IN_FLIGHT": 3,
+        "ADMISSION_MIN_LIMIT": 1,
+    }
+    return AdmissionController()
+
+
+def nested_middleware(controller, paths):
+    """A middleware whose view issues the next request in ``paths`` while in flight."""
+    factory = RequestFactory()
+    responses = []
+
+    def view(request):
+        if paths:
+            responses.append(middleware(factory.get(paths.pop(0))))
+        return HttpResponse("ok")
+
+    middleware = AdmissionControlMiddleware(view)
+    middleware.controller = controller
+    return middleware, factory, responses
+
+
+class TestAdaptiveLimit:
+    def test_grows_to_max_while_latency_is_steady(self):
+        limit = AdaptiveLimit("test", max_limit=20, min_limit=2)
+        limit.limit = 4.0
+        for _ in range(50):
+            limit.in_flight = int(limit.limit)
+            limit.update(0.010)
+
+        assert limit.limit == 20
+
+    def test_idle_class_does_not_grow(self):
+        limit = AdaptiveLimit("test", max_limit=20, min_limit=2)
+        limit.limit = 4.0
+        for _ in range(50):
+            limit.update(0.010)
+
+        assert limit.limit == 4.0
+
+    def test_shrinks_when_latency_rises(self):
+        limit = AdaptiveLimit("test", max_limit=20, min_limit=2)
+        for _ in range(100):
+            limit.update(0.010)
+        assert limit.limit == 20
+        for _ in range(100):
+            limit.update(1.0)
+
+        assert limit.limit < 5
+        assert metrics.snapshot()["oauth2_admission_test_limit"] == int(limit.limit)
+
+    def test_never_below_min(self):
+        limit = AdaptiveLimit("test", max_limit=20, min_limit=8)
+        for _ in range(100):
+            limit.update(0.010)
+        for _ in range(100):
+            limit.update(1.0)
+
+        assert limit.limit == 8
+
+    def test_retry_after_follows_latency(self):
+        limit = AdaptiveLimit("test", max_limit=20)
+        assert limit.retry_after() == 1
+        limit.update(3.5)
+        assert limit.retry_after() == 4
+
+
+class TestAdmissionController:
+    def test_classifies_by_longest_prefix(self, admission):
+        assert admission.classify("/api/token/") == "token"
+        assert admission.classify("/admin/oauth2/client/") == "admin"
+        assert admission.classify("/api/clients/") == "default"
+        assert admission.classify("/api/health/") is None
+        assert admission.classify("/api/ready/") is None
+
+    def test_sheds_over_class_limit(self, admission):
+        admitted = [admission.acquire("/api/token/") for _ in range(2)]
+
+        with pytest.raises(Overloaded):
+            admission.acquire("/api/token/")
+        assert admission.acquire("/admin/")[0]
+        assert metrics.snapshot()["oauth2_admission_token_shed_total"] == 1
+
+        admission.release(admitted[0][1], 0.01)
+        assert admission.acquire("/api/token/")[0]
+
+    def test_sheds_over_worker_limit(self, admission):
+        for _ in range(3):
+            admission.acquire("/api/clients/")
+
+        with pytest.raises(Overloaded) as excinfo:
+            admission.acquire("/api/clients/")
+        assert excinfo.value.retry_after == 1
+        assert metrics.snapshot()["oauth2_admission_shed_total"] == 1
+
+    def test_exempt_paths_are_not_counted(self, admission):
+        for _ in range(3):
+            admission.acquire("/api/clients/")
+
+        assert admission.acquire("/api/health/") == (False, None)
+        assert admission.in_flight == 3
+
+    def test_settings_change_rebuilds_limits(self, admission, settings):
+        counted, limit = admission.acquire("/api/token/")
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "ADMISSION_ROUTE_CLASSES": {
+                **ROUTE_CLASSES,
+                "token": {"prefixes": ["/api/token/"], "max_in_flight": 5},
+            },
+        }
+
+        assert admission.limit_for("token").max_limit == 5
+        admission.release(limit, 0.01)
+        assert admission.limit_for("token").in_flight == 0
+        assert admission.in_flight == 0
+
+
+class TestAdmissionControlMiddleware:
+    def test_answers_503_with_retry_after_when_overloaded(self, admission):
+        middleware, factory, responses = nested_middleware(admission, ["/admin/login/"])
+
+        assert middleware(factory.get("/admin/")).status_code == 200
+        [response] = responses
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+        assert json.loads(response.content)["error"] == "temporarily_unavailable"
+        assert admission.in_flight == 0
+
+    def test_health_is_exempt(self, admission, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "ADMISSION_MAX_IN_FLIGHT": 1}
+        middleware, factory, responses = nested_middleware(
+            admission, ["/api/health/", "/api/clients/"]
+        )
+
+        middleware(factory.get("/api/token/"))
+
+        # Innermost first: /api/clients/ was shed while /api/health/ ran.
+        assert [response.status_code for response in responses] == [503, 200]
+
+    def test_disabled(self, admission, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "ADMISSION_ENABLED": False}
+        middleware, factory, responses = nested_middleware(admission, ["/admin/"])
+
+        middleware(factory.get("/admin/"))
+
+        assert [response.status_code for response in responses] == [200]
+
+    def test_releases_when_the_view_raises(self, admission):
+        def view(request):
+            raise RuntimeError
+
+        middleware = AdmissionControlMiddleware(view)
+        middleware.controller = admission
+
+        with pytest.raises(RuntimeError):
+            middleware(RequestFactory().get("/admin/"))
+        assert admission.in_flight == 0
+        assert admission.limit_for("admin").in_flight == 0
+
+    def test_async(self, admission):
+        async def view(request):
+            await asyncio.sleep(0.01)
+            return HttpResponse("ok")
+
+        middleware = AdmissionControlMiddleware(view)
+        middleware.controller = admission
+        factory = RequestFactory()
+
+        async def burst():
+            return await asyncio.gather(
+                *(middleware(factory.get("/api/token/")) for _ in range(3))
+            )
+
+        responses = asyncio.run(burst())
+        assert sorted(response.status_code for response in responses) == [
+            200,
+            200,
+            503,
+        ]
+        assert admission.in_flight == 0
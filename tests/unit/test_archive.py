@@ -0,0 +1,117 @@
+import re
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from oauth2.archive import measure
+from oauth2.models import ArchivedClient, Client, ClientTombstone, Scope
+
+
+def backdate(client, days):
+    Client.objects.filter(pk=client.pk).update(
+        updated_at=timezone.now() - timedelta(days=days)
+    )
+    return client
+
+
+def archive(*args):
+    out = StringIO()
+    call_command("archive_clients", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestArchiveClients:
+    def test_archives_only_long_inactive_clients(self, make_client):
+        scope = Scope.objects.create(name="read")
+        old = backdate(make_client("old", is_active=False, scopes=[scope]), 120)
+        recent = backdate(make_client("recent", is_active=False), 10)
+        active = backdate(make_client("active"), 400)
+
+        output = archive("--days", "90", "--batch-size", "1")
+
+        assert set(Client.objects.values_list("name", flat=True)) == {
+            "recent",
+            "active",
+        }
+        archived = ArchivedClient.objects.get()
+        assert archived.pk == old.pk
+        assert archived.client_secret == old.client_secret
+        assert archived.scope_ids == [scope.pk]
+        assert recent.pk != archived.pk and active.pk != archived.pk
+        assert ClientTombstone.objects.filter(client_id=old.client_id).exists()
+        assert "archived 1 client(s)" in output
+        assert re.search(r"rows +3 -> 2", output)
+
+    def test_dry_run(self, make_client):
+        backdate(make_client("old", is_active=False), 120)
+
+        output = archive("--dry-run")
+
+        assert Client.objects.count() == 1
+        assert "Would archive 1 client(s)." in output
+
+    def test_measure(self, make_client):
+        make_client("active")
+
+        stats = measure("default", repeat=1)
+
+        assert stats["rows"] == 1
+        assert stats["count_ms"] >= 0 and stats["scan_active_ms"] >= 0
+
+
+@pytest.mark.django_db
+class TestRestore:
+    def test_admin_restores_client(self, admin_client, make_client):
+        scope = Scope.objects.create(name="read")
+        client = make_client("old", is_active=False, scopes=[scope])
+        Client.objects.filter(pk=client.pk).update(
+            updated_at=timezone.now() - timedelta(days=120),
+            created_at=timezone.now() - timedelta(days=365),
+        )
+        created_at = Client.objects.get(pk=client.pk).created_at
+        archive()
+
+        response = admin_client.post(
+            "/admin/oauth2/archivedclient/",
+            {"action": "restore_selected", "_selected_action": [client.pk]},
+        )
+
+        assert response.status_code == 302
+        assert not ArchivedClient.objects.exists()
+        restored = Client.objects.get(pk=client.pk)
+        assert restored.client_id == client.client_id
+        assert restored.client_secret == client.client_secret
+        assert restored.created_at == created_at
+        assert restored.is_active is False
+        assert list(restored.scopes.all()) == [scope]
+
+    def test_archive_is_read_only(self, admin_client, make_client):
+        client = backdate(make_client("old", is_active=False), 120)
+        archive()
+
+        response = admin_client.get(f"/admin/oauth2/archivedclient/{client.pk}/change/")
+
+        assert response.status_code == 200
+        assert client.client_secret not in response.content.decode()
+        assert admin_client.get("/admin/oauth2/archivedclient/add/").status_code == 403
+
+
+@pytest.mark.django_db(databases=["default", "shard1"])
+def test_sharded_clients_are_archived_on_their_shard(settings, make_client):
+    settings.OAUTH2 = {**settings.OAUTH2, "CLIENT_SHARDS": ["default", "shard1"]}
+    settings.DATABASE_ROUTERS = ["oauth2.routers.ShardRouter"]
+    clients = [
+        backdate(make_client(f"old-{number}", is_active=False), 120)
+        for number in range(8)
+    ]
+
+    archive()
+
+    assert Client.objects.count() == 0
+    for client in clients:
+        assert (
+            ArchivedClient.objects.using(client._state.db).filter(pk=client.pk).exists()
+        )
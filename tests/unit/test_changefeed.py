@@ -0,0 +1,243 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.utils import timezone
+from oauth2.admin import ClientAdmin
+from oauth2.changefeed import (
+    ChangeFeedPoller,
+    Cursor,
+    CursorExpired,
+    InvalidCursor,
+    changes_since,
+    prune_tombstones,
+)
+from oauth2.entries import ClientEntry
+from oauth2.metrics import metrics
+from oauth2.models import Client, ClientTombstone, Scope
+from oauth2.registry import ClientRegistry
+from oauth2.scopes import scope_registry
+
+
+@pytest.fixture(autouse=True)
+def no_settle(settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "CHANGE_FEED_SETTLE": 0}
+
+
+class TestCursor:
+    def test_round_trip(self):
+        now = timezone.now()
+        cursor = Cursor(now, 42, now - timedelta(days=1), 7)
+        assert Cursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize("value", ["", "not-base64!", "WzEsMl0"])
+    def test_rejects_malformed(self, value):
+        with pytest.raises(InvalidCursor):
+            Cursor.decode(value)
+
+
+@pytest.mark.django_db
+class TestChangesSince:
+    def test_returns_changes_in_order_and_advances(self, make_client):
+        first = make_client()
+        second = make_client()
+
+        batch = changes_since()
+
+        assert [e.client_id for e in batch.upserts] == [
+            first.client_id,
+            second.client_id,
+        ]
+        assert batch.has_more is False
+        assert len(changes_since(batch.cursor)) == 0
+
+    def test_update_is_reported_again(self, make_client):
+        client = make_client()
+        cursor = changes_since().cursor
+        client.name = "Renamed"
+        client.save()
+        assert [e.client_id for e in changes_since(cursor).upserts] == [
+            client.client_id
+        ]
+
+    def test_pagination(self, make_client):
+        for _ in range(5):
+            make_client()
+        seen = []
+        cursor = None
+        while True:
+            batch = changes_since(cursor, limit=2)
+            seen.extend(e.client_id for e in batch.upserts)
+            cursor = batch.cursor
+            if not batch.has_more:
+                break
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_delete_is_reported_through_tombstone(self, make_client):
+        client = make_client()
+        cursor = changes_since().cursor
+        client_id = client.client_id
+        client.delete()
+
+        batch = changes_since(cursor)
+
+        assert batch.deletes == [client_id]
+        assert ClientTombstone.objects.filter(client_id=client_id).exists()
+
+    def test_unsettled_changes_are_held_back(self, settings, make_client):
+        settings.OAUTH2 = {**settings.OAUTH2, "CHANGE_FEED_SETTLE": 60}
+        make_client()
+        assert len(changes_since()) == 0
+
+    def test_scope_grant_change_is_reported(self, make_client):
+        read = Scope.objects.create(name="read")
+        client = make_client()
+        cursor = changes_since().cursor
+        Client.objects.filter(pk=client.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        client.scopes.add(read)
+
+        [entry] = changes_since(cursor).upserts
+        assert entry.scope_mask == 0b1
+
+    def test_reverse_scope_grant_change_is_reported(self, make_client):
+        read = Scope.objects.create(name="read")
+        client = make_client()
+        cursor = changes_since().cursor
+        Client.objects.filter(pk=client.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        read.clients.add(client)
+
+        assert [e.client_id for e in changes_since(cursor).upserts] == [
+            client.client_id
+        ]
+
+    def test_admin_bulk_action_is_reported(self, rf, make_client):
+        client = make_client()
+        cursor = changes_since().cursor
+        admin = ClientAdmin(Client, AdminSite())
+        admin.message_user = lambda *args, **kwargs: None
+
+        admin.deactivate_clients(rf.get("/"), Client.objects.filter(pk=client.pk))
+
+        [entry] = changes_since(cursor).upserts
+        assert entry.is_active is False
+
+
+def make_tombstone(client_id, age):
+    tombstone = ClientTombstone.objects.create(client_id=client_id)
+    deleted_at = timezone.now() - timedelta(seconds=age)
+    ClientTombstone.objects.filter(pk=tombstone.pk).update(deleted_at=deleted_at)
+    tombstone.deleted_at = deleted_at
+    return tombstone
+
+
+def cursor_at(tombstone):
+    return Cursor(timezone.now(), 0, tombstone.deleted_at, tombstone.pk)
+
+
+@pytest.mark.django_db
+class TestRetention:
+    @pytest.fixture(autouse=True)
+    def retention(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "CHANGE_FEED_RETENTION": 3600}
+
+    def test_prune_keeps_recent_tombstones_and_the_watermark(self):
+        make_tombstone("oldest", 9000)
+        watermark = make_tombstone("old", 8000)
+        recent = make_tombstone("recent", 60)
+
+        assert prune_tombstones() == 1
+
+        assert list(
+            ClientTombstone.objects.order_by("pk").values_list("pk", flat=True)
+        ) == [watermark.pk, recent.pk]
+        assert prune_tombstones() == 0
+
+    def test_cursor_behind_the_watermark_expires(self):
+        pruned = make_tombstone("oldest", 9000)
+        watermark = make_tombstone("old", 8000)
+        prune_tombstones()
+
+        with pytest.raises(CursorExpired):
+            changes_since(cursor_at(pruned))
+        assert changes_since(cursor_at(watermark)).deletes == []
+        assert changes_since(Cursor.start()).deletes == ["old"]
+
+    def test_disabled_retention_keeps_everything(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "CHANGE_FEED_RETENTION": None}
+        first = make_tombstone("oldest", 9000)
+        make_tombstone("old", 8000)
+
+        assert prune_tombstones() == 0
+        assert changes_since(cursor_at(first)).deletes == ["old"]
+
+    def test_poller_resyncs_an_expired_cursor(self):
+        pruned = make_tombstone("oldest", 9000)
+        make_tombstone("old", 8000)
+        prune_tombstones()
+        registry = RecordingRegistry()
+        registry.get("cached")
+        poller = ChangeFeedPoller(cursor=cursor_at(pruned), registry=registry)
+
+        assert poller.poll() == 0
+
+        assert len(registry) == 0
+        assert poller.cursor.deleted_at > timezone.now() - timedelta(minutes=1)
+
+
+class RecordingRegistry(ClientRegistry):
+    def __init__(self):
+        super().__init__(ttl=60)
+        self.invalidated = []
+
+    def load(self, client_id):
+        return ClientEntry(client_id, "public", None, [], 0)
+
+    def invalidate(self, client_id):
+        self.invalidated.append(client_id)
+        super().invalidate(client_id)
+
+
+@pytest.mark.django_db
+class TestChangeFeedPoller:
+    def test_applies_upserts_and_deletes(self, make_client):
+        registry = RecordingRegistry()
+        poller = ChangeFeedPoller(cursor=Cursor.start(), registry=registry)
+        changed = make_client()
+        deleted = make_client()
+        deleted_id = deleted.client_id
+        deleted.delete()
+
+        registry.invalidated.clear()
+        applied = poller.poll()
+
+        assert applied == 2
+        assert set(registry.invalidated) == {changed.client_id, deleted_id}
+        snapshot = metrics.snapshot()
+        assert snapshot["oauth2_changefeed_changes_total"] == 2
+        assert snapshot["oauth2_changefeed_lag_seconds"] >= 0
+        assert snapshot["oauth2_changefeed_last_poll_timestamp"] > 0
+
+    def test_starts_from_now(self, make_client):
+        make_client()
+        poller = ChangeFeedPoller(registry=RecordingRegistry())
+        assert poller.poll() == 0
+
+    def test_reloads_scopes_added_elsewhere(self):
+        Scope.objects.create(name="read")
+        poller = ChangeFeedPoller(registry=RecordingRegistry())
+        poller.poll()
+        scope_registry.load()
+        # Simulate a scope created by another node: no local signal fires.
+        Scope.objects.bulk_create([Scope(name="write", bit=1)])
+        assert "write" not in scope_registry._mapping()[0]
+
+        poller.poll()
+
+        assert scope_registry.encode(["write"]) == 0b10
@@ -0,0 +1,258 @@
+import base64
+
+import pytest
+from django.test import RequestFactory
+from oauth2.authentication import (
+    ClientAuthError,
+    authenticate_client,
+    client_address,
+    client_credentials,
+)
+from oauth2.entries import ClientEntry
+from oauth2.lockout import FailureTracker, address_failures, client_failures
+from oauth2.metrics import metrics
+from oauth2.models import Client
+
+
+def basic(client_id, secret):
+    credentials = base64.b64encode(f"{client_id}:{secret}".encode()).decode()
+    return f"Basic {credentials}"
+
+
+def token_request(
+    client_id=None, secret=None, address="10.0.0.1", header=None, forwarded=None
+):
+    data = {}
+    if client_id is not None:
+        data["client_id"] = client_id
+    if secret is not None:
+        data["client_secret"] = secret
+    extra = {"HTTP_AUTHORIZATION": header} if header else {}
+    if forwarded is not None:
+        extra["HTTP_X_FORWARDED_FOR"] = forwarded
+    return RequestFactory().post("/token", data, REMOTE_ADDR=address, **extra)
+
+
+class TestFailureTracker:
+    @pytest.fixture(autouse=True)
+    def limits(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "AUTH_LOCKOUT_CLIENT_FAILURES": 3}
+
+    def test_locks_after_limit_within_window(self):
+        tracker = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES", window=60)
+        for now in (0, 10, 20):
+            assert tracker.locked_for("a", now=now) == 0.0
+            tracker.record("a", now=now)
+
+        assert tracker.locked_for("a", now=30) == 30
+        assert tracker.locked_for("b", now=30) == 0.0
+        assert tracker.locked_for("a", now=60) == 0.0
+
+    def test_window_slides(self):
+        tracker = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES", window=60)
+        for now in (0, 50, 70, 80):
+            tracker.record("a", now=now)
+
+        # Failures at 50, 70 and 80 are all within 60 seconds of 100.
+        assert tracker.locked_for("a", now=100) == 10
+        assert tracker.locked_for("a", now=110) == 0.0
+
+    def test_clear(self):
+        tracker = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES", window=60)
+        for _ in range(3):
+            tracker.record("a", now=0)
+        tracker.clear("a")
+
+        assert tracker.locked_for("a", now=1) == 0.0
+
+    def test_disabled(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "AUTH_LOCKOUT_CLIENT_FAILURES": None}
+        tracker = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES", window=60)
+        for _ in range(100):
+            tracker.record("a", now=0)
+
+        assert tracker.locked_for("a", now=1) == 0.0
+        assert len(tracker) == 0
+
+    def test_compaction_drops_expired_keys(self):
+        tracker = FailureTracker("AUTH_LOCKOUT_CLIENT_FAILURES", window=60)
+        tracker.record("old", now=0)
+        tracker.record("recent", now=50)
+
+        tracker.compact(now=100)
+
+        assert len(tracker) == 1
+        assert metrics.snapshot()["oauth2_auth_failure_keys"] == 1
+
+    def test_memory_stays_bounded_under_a_flood(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "AUTH_LOCKOUT_COMPACT_INTERVAL": 1e9}
+        tracker = FailureTracker(
+            "AUTH_LOCKOUT_CLIENT_FAILURES", window=60, max_keys=100
+        )
+        for number in range(1000):
+            tracker.record(f"key-{number}", now=number * 0.01)
+
+        assert len(tracker) <= 100
+        # The most recent keys are kept.
+        tracker.record("key-999", now=10)
+        tracker.record("key-999", now=10)
+        assert tracker.locked_for("key-999", now=10) > 0
+
+
+class TestClientCredentials:
+    def test_basic_credentials_are_form_decoded(self):
+        request = token_request(header=basic("my%3Aclient", "s%20cret"))
+
+        assert client_credentials(request) == ("my:client", "s cret")
+
+    def test_form_parameters(self):
+        request = token_request("abc", "secret")
+
+        assert client_credentials(request) == ("abc", "secret")
+
+    @pytest.mark.parametrize("header", ["Basic !!!", "Basic YWJj"])
+    def test_malformed_basic(self, header):
+        assert client_credentials(token_request(header=header)) == (None, None)
+
+
+class TestClientAddress:
+    def test_remote_addr_without_trusted_proxies(self):
+        request = token_request(forwarded="203.0.113.7")
+
+        assert client_address(request) == "10.0.0.1"
+
+    @pytest.mark.parametrize(
+        "hops, forwarded, expected",
+        [
+            (1, "203.0.113.7", "203.0.113.7"),
+            (1, "198.51.100.1, 203.0.113.7", "203.0.113.7"),
+            (2, "198.51.100.1, 203.0.113.7, 10.0.0.2", "203.0.113.7"),
+            (2, "203.0.113.7", "203.0.113.7"),
+            (1, "", "10.0.0.1"),
+        ],
+    )
+    def test_trusted_proxy_hops(self, settings, hops, forwarded, expected):
+        settings.OAUTH2 = {**settings.OAUTH2, "AUTH_TRUSTED_PROXY_HOPS": hops}
+
+        assert client_address(token_request(forwarded=forwarded)) == expected
+
+
+@pytest.mark.django_db
+class TestAuthenticateClient:
+    @pytest.fixture(autouse=True)
+    def limits(self, settings):
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "AUTH_LOCKOUT_CLIENT_FAILURES": 3,
+            "AUTH_LOCKOUT_ADDRESS_FAILURES": 5,
+        }
+
+    @pytest.fixture
+    def client(self):
+        return Client.objects.create(
+            client_type="confidential",
+            name="Authenticated",
+            redirect_uris=["https://example.com/callback"],
+        )
+
+    def test_confidential_client(self, client):
+        entry = authenticate_client(
+            token_request(header=basic(client.client_id, client.client_secret))
+        )
+
+        assert entry.client_id == client.client_id
+
+    def test_public_client_without_secret(self):
+        public = Client.objects.create(
+            client_type="public",
+            name="Public",
+            redirect_uris=["https://example.com/callback"],
+        )
+
+        assert (
+            authenticate_client(token_request(public.client_id)).is_confidential
+            is False
+        )
+        with pytest.raises(ClientAuthError):
+            authenticate_client(token_request(public.client_id, "secret"))
+
+    @pytest.mark.parametrize("client_id, secret", [(None, None), ("unknown", "x")])
+    def test_rejects_missing_or_unknown_client(self, client_id, secret):
+        with pytest.raises(ClientAuthError) as excinfo:
+            authenticate_client(token_request(client_id, secret))
+
+        assert excinfo.value.as_dict()["error"] == "invalid_client"
+        assert excinfo.value.retry_after is None
+
+    def test_locks_client_out_before_checking_secret(self, client, monkeypatch):
+        for _ in range(3):
+            with pytest.raises(ClientAuthError):
+                authenticate_client(token_request(client.client_id, "wrong"))
+
+        def check_secret(self, secret):
+            raise AssertionError("secret checked during lockout")
+
+        monkeypatch.setattr(ClientEntry, "check_secret", check_secret)
+        with pytest.raises(ClientAuthError) as excinfo:
+            authenticate_client(token_request(client.client_id, client.client_secret))
+
+        assert excinfo.value.retry_after > 0
+        assert metrics.snapshot()["oauth2_auth_lockout_refusals_total"] == 1
+
+    def test_client_lockout_only_applies_to_failing_addresses(self, client):
+        for _ in range(3):
+            with pytest.raises(ClientAuthError):
+                authenticate_client(token_request(client.client_id, "wrong"))
+
+        entry = authenticate_client(
+            token_request(client.client_id, client.client_secret, "10.0.0.2")
+        )
+
+        assert entry.client_id == client.client_id
+        with pytest.raises(ClientAuthError) as excinfo:
+            authenticate_client(token_request(client.client_id, client.client_secret))
+        assert excinfo.value.retry_after > 0
+
+    def test_locks_address_out_across_client_ids(self, client):
+        for number in range(5):
+            with pytest.raises(ClientAuthError):
+                authenticate_client(token_request(f"guess-{number}", "x"))
+
+        with pytest.raises(ClientAuthError) as excinfo:
+            authenticate_client(
+                token_request(client.client_id, client.client_secret, "10.0.0.1")
+            )
+        assert excinfo.value.retry_after > 0
+        assert authenticate_client(
+            token_request(client.client_id, client.client_secret, "10.0.0.9")
+        )
+
+    def test_locks_out_forwarded_addresses_behind_a_proxy(self, client, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "AUTH_TRUSTED_PROXY_HOPS": 1}
+        for number in range(5):
+            with pytest.raises(ClientAuthError):
+                authenticate_client(
+                    token_request(f"guess-{number}", "x", forwarded="203.0.113.7")
+                )
+
+        with pytest.raises(ClientAuthError):
+            authenticate_client(
+                token_request(
+                    client.client_id, client.client_secret, forwarded="203.0.113.7"
+                )
+            )
+        assert authenticate_client(
+            token_request(
+                client.client_id, client.client_secret, forwarded="198.51.100.1"
+            )
+        )
+
+    def test_success_clears_client_failures(self, client):
+        for _ in range(2):
+            with pytest.raises(ClientAuthError):
+                authenticate_client(token_request(client.client_id, "wrong"))
+        authenticate_client(token_request(client.client_id, client.client_secret))
+
+        assert client_failures.locked_for((client.client_id, "10.0.0.1")) == 0.0
+        assert len(client_failures) == 0
+        assert len(address_failures) == 1
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from oauth2.export import build_delta, build_export, decode_export, encode_export
+
+
+@pytest.fixture(autouse=True)
+def export_settings(settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "CHANGE_FEED_SETTLE": 0,
+        "EDGE_EXPORT_SIGNING_KEY": "edge-key",
+    }
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        data = encode_export(
+            [
+                ("a", "public", ["https://a.example/2", "https://a.example/1"]),
+                ("b", "confidential", []),
+            ],
+            "v1",
+        )
+
+        version, clients = decode_export(data)
+
+        assert version == "v1"
+        assert clients == {
+            "a": ("public", frozenset({"https://a.example/1", "https://a.example/2"})),
+            "b": ("confidential", frozenset()),
+        }
+
+    def test_tampered_export_is_rejected(self):
+        data = bytearray(encode_export([("a", "public", [])], "v1"))
+        data[-40] ^= 1
+        with pytest.raises(ValueError):
+            decode_export(bytes(data))
+
+    def test_wrong_key_is_rejected(self):
+        data = encode_export([("a", "public", [])], "v1")
+        with pytest.raises(ValueError):
+            decode_export(data, key="other-key")
+
+
+@pytest.mark.django_db
+class TestBuildExport:
+    def test_contains_active_clients_without_secrets(self, make_client):
+        active = make_client(redirect_uris=["https://example.com/a"])
+        make_client(is_active=False)
+
+        version, data = build_export()
+
+        decoded_version, clients = decode_export(data)
+        assert decoded_version == version
+        assert clients == {
+            active.client_id: ("confidential", frozenset({"https://example.com/a"}))
+        }
+        assert active.client_secret.encode() not in data
+
+    def test_version_is_stable_without_changes(self, make_client):
+        make_client()
+        assert build_export()[0] == build_export()[0]
+
+
+@pytest.mark.django_db
+class TestBuildDelta:
+    def test_delta_from_export_version(self, make_client):
+        changed = make_client()
+        deactivated = make_client()
+        deleted = make_client()
+        version, _ = build_export()
+
+        new = make_client(client_type="public")
+        changed.redirect_uris = ["https://example.com/new"]
+        changed.save()
+        deactivated.is_active = False
+        deactivated.save()
+        deleted_id = deleted.client_id
+        deleted.delete()
+
+        data, _ = build_delta(version)
+
+        document = json.loads(data)
+        assert document["from"] == version
+        assert {item["client_id"]: item for item in document["upserts"]} == {
+            changed.client_id: {
+                "client_id": changed.client_id,
+                "client_type": "confidential",
+                "redirect_uris": ["https://example.com/new"],
+            },
+            new.client_id: {
+                "client_id": new.client_id,
+                "client_type": "public",
+                "redirect_uris": ["https://example.com/callback"],
+            },
+        }
+        assert sorted(document["removed"]) == sorted(
+            [deactivated.client_id, deleted_id]
+        )
+        assert document["has_more"] is False
+
+        data, _ = build_delta(document["to"])
+        assert json.loads(data)["upserts"] == []
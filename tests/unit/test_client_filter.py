@@ -0,0 +1,190 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from oauth2.filters import CuckooFilter, FilterFull, client_id_filter
+from oauth2.metrics import metrics
+from oauth2.registry import client_registry
+
+
+class TestCuckooFilter:
+    def test_contains_added_items(self):
+        cuckoo = CuckooFilter(1000)
+        items = [f"client-{i}" for i in range(900)]
+        for item in items:
+            cuckoo.add(item)
+        assert all(item in cuckoo for item in items)
+        assert len(cuckoo) == 900
+
+    def test_false_positive_rate_is_low(self):
+        cuckoo = CuckooFilter(10_000)
+        for i in range(9_000):
+            cuckoo.add(f"known-{i}")
+        false_positives = sum(f"unknown-{i}" in cuckoo for i in range(20_000))
+        assert false_positives / 20_000 < 0.005
+
+    def test_remove(self):
+        cuckoo = CuckooFilter(100)
+        cuckoo.add("a")
+        cuckoo.add("b")
+        assert cuckoo.remove("a") is True
+        assert "a" not in cuckoo
+        assert "b" in cuckoo
+        assert len(cuckoo) == 1
+
+    def test_remove_missing_item(self):
+        cuckoo = CuckooFilter(100)
+        assert cuckoo.remove("missing") is False
+
+    def test_full_filter_raises_and_keeps_items(self):
+        cuckoo = CuckooFilter(8)
+        added = []
+        with pytest.raises(FilterFull):
+            for i in range(1000):
+                cuckoo.add(f"item-{i}")
+                added.append(f"item-{i}")
+        assert all(item in cuckoo for item in added)
+
+
+@pytest.mark.django_db
+class TestClientIdFilter:
+    @pytest.fixture(autouse=True)
+    def enable_filter(self, settings):
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "CLIENT_FILTER_ENABLED": True,
+            "CLIENT_FILTER_REFRESH_INTERVAL": 3600,
+            "CLIENT_FILTER_REBUILD_INTERVAL": 3600,
+        }
+
+    def test_disabled_filter_allows_everything(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "CLIENT_FILTER_ENABLED": False}
+        assert client_id_filter.might_contain("anything") is True
+
+    def test_rebuild_loads_existing_clients(self, make_client):
+        client = make_client()
+        client_id_filter.rebuild()
+        assert client_id_filter.might_contain(client.client_id) is True
+        assert client_id_filter.might_contain("unknown") is False
+
+    def test_registry_rejects_unknown_client_after_top_up(
+        self, django_assert_num_queries, make_client
+    ):
+        make_client()
+        client_id_filter.rebuild()
+        # The top-up, not a lookup of the client itself.
+        with django_assert_num_queries(1):
+            assert client_registry.get("random-client-id") is None
+        assert metrics.snapshot()["oauth2_client_filter_rejections_total"] == 1
+
+    def test_further_misses_in_the_interval_cost_no_query(
+        self, django_assert_num_queries
+    ):
+        client_id_filter.rebuild()
+        assert client_registry.get("first-unknown") is None
+
+        with django_assert_num_queries(0):
+            for number in range(20):
+                assert client_registry.get(f"unknown-{number}") is None
+        assert metrics.snapshot()["oauth2_client_filter_rejections_total"] == 21
+
+    def test_misses_share_a_later_top_up(self, django_assert_num_queries):
+        client_id_filter.rebuild()
+        missed_at = time.monotonic()
+        client_id_filter.top_up()
+
+        with django_assert_num_queries(0):
+            client_id_filter.top_up(started_after=missed_at)
+
+    def test_new_client_is_added_on_save(self, make_client):
+        client_id_filter.rebuild()
+        client = make_client()
+        assert client_registry.get(client.client_id).client_id == client.client_id
+
+    def test_deleted_client_is_removed_on_commit(
+        self, django_capture_on_commit_callbacks, make_client
+    ):
+        client = make_client()
+        client_id_filter.rebuild()
+        with django_capture_on_commit_callbacks(execute=True):
+            client.delete()
+        assert client_id_filter.might_contain(client.client_id) is False
+
+    def test_top_up_picks_up_clients_created_elsewhere(self, make_client):
+        client_id_filter.rebuild()
+        client = make_client()
+        # Simulate a client created by another worker process.
+        client_id_filter.remove(client.client_id)
+
+        client_id_filter.top_up()
+
+        assert client.client_id in client_id_filter._filter
+
+    def test_miss_catches_up_before_rejecting(self, make_client):
+        client_id_filter.rebuild()
+        client = make_client()
+        # Created by another worker, whose next top-up is not due yet.
+        client_id_filter.remove(client.client_id)
+
+        assert client_id_filter.might_contain(client.client_id) is True
+        assert client_registry.get(client.client_id).client_id == client.client_id
+        assert metrics.snapshot()["oauth2_client_filter_rejections_total"] == 0
+
+    def test_clients_created_elsewhere_are_stale_for_one_interval(self, make_client):
+        client_id_filter.rebuild()
+        assert client_id_filter.might_contain("unknown") is False
+        client = make_client()
+        client_id_filter.remove(client.client_id)
+
+        # Rejected until the next top-up or the next interval's confirmation.
+        assert client_id_filter.might_contain(client.client_id) is False
+        client_id_filter._confirmed_at -= 3600
+        assert client_id_filter.might_contain(client.client_id) is True
+
+    def test_async_miss_catches_up(self, make_client):
+        client_id_filter.rebuild()
+        client = make_client()
+        client_id_filter.remove(client.client_id)
+
+        assert async_to_sync(client_id_filter.amight_contain)(client.client_id)
+
+    def test_fingerprint_collision_does_not_hide_a_client(
+        self, make_client, monkeypatch
+    ):
+        client_id_filter.rebuild()
+        local = make_client()
+        remote = make_client()
+        client_id_filter.remove(remote.client_id)
+        # Give both IDs the same fingerprint and buckets.
+        locate = CuckooFilter._locate
+        monkeypatch.setattr(
+            CuckooFilter,
+            "_locate",
+            lambda self, item: locate(self, local.client_id),
+        )
+        assert remote.client_id in client_id_filter._filter
+
+        client_id_filter.top_up()
+        client_id_filter.remove(local.client_id)
+
+        assert remote.client_id in client_id_filter._filter
+
+    def test_false_positive_counter_for_inactive_client(self, make_client):
+        client = make_client(is_active=False)
+        client_id_filter.rebuild()
+        assert client_registry.get(client.client_id) is None
+        assert metrics.snapshot()["oauth2_client_filter_false_positives_total"] == 1
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    def test_disabled_by_default(self, client, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "METRICS_ENABLED": False}
+        assert client.get("/api/metrics/").status_code == 404
+
+    def test_renders_prometheus_text(self, client, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "METRICS_ENABLED": True}
+        resp = client.get("/api/metrics/")
+        assert resp.status_code == 200
+        assert resp["Content-Type"].startswith("text/plain")
+        assert b"# TYPE oauth2_client_filter_rejections_total counter" in resp.content
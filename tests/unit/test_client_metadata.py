@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+from oauth2.metadata import MetadataCache, metadata_etag
+
+NOW = datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def test_etag_is_strong_and_follows_updated_at():
+    etag = metadata_etag(NOW)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert metadata_etag(NOW) == etag
+    assert metadata_etag(NOW + timedelta(microseconds=1)) != etag
+
+
+class TestMetadataCache:
+    def test_serves_only_the_cached_version(self):
+        cache = MetadataCache(size=10)
+        cache.put("a", NOW, b"{}")
+
+        assert cache.get("a", NOW) == b"{}"
+        assert cache.get("a", NOW + timedelta(seconds=1)) is None
+        assert cache.get("b", NOW) is None
+
+    def test_evicts_least_recently_used(self):
+        cache = MetadataCache(size=2)
+        cache.put("a", NOW, b"a")
+        cache.put("b", NOW, b"b")
+        cache.get("a", NOW)
+        cache.put("c", NOW, b"c")
+
+        assert len(cache) == 2
+        assert cache.get("b", NOW) is None
+        assert cache.get("a", NOW) == b"a"
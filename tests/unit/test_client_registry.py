@@ -0,0 +1,99 @@
+import pytest
+from oauth2.models import Scope
+from oauth2.entries import ClientEntry, hash_secret
+from oauth2.registry import ClientRegistry
+
+
+class TestClientEntry:
+    def setup_method(self):
+        self.entry = ClientEntry(
+            client_id="abc",
+            client_type="confidential",
+            secret_hash=hash_secret("s3cret"),
+            redirect_uris=["https://example.com/callback"],
+            scope_mask=0,
+        )
+
+    def test_check_secret(self):
+        assert self.entry.check_secret("s3cret") is True
+        assert self.entry.check_secret("wrong") is False
+        assert self.entry.check_secret("") is False
+
+    def test_public_entry_never_matches_secret(self):
+        entry = ClientEntry("abc", "public", None, [], 0)
+        assert entry.check_secret("anything") is False
+
+    def test_redirect_uri_exact_match(self):
+        assert self.entry.is_valid_redirect_uri("https://example.com/callback")
+        assert not self.entry.is_valid_redirect_uri("https://example.com/callback/")
+
+    def test_is_confidential(self):
+        assert self.entry.is_confidential is True
+
+    def test_is_read_only(self):
+        with pytest.raises(AttributeError):
+            self.entry.is_active = False
+        with pytest.raises(AttributeError):
+            del self.entry.secret_hash
+        assert not hasattr(self.entry, "__dict__")
+
+
+@pytest.mark.django_db
+class TestClientRegistry:
+    def setup_method(self):
+        self.registry = ClientRegistry(ttl=60)
+
+    def test_get_returns_compiled_entry(self, make_client):
+        client = make_client()
+        entry = self.registry.get(client.client_id)
+        assert entry.client_id == client.client_id
+        assert entry.check_secret(client.client_secret)
+        assert entry.redirect_uris == frozenset(["https://example.com/callback"])
+
+    def test_get_unknown_client(self):
+        assert self.registry.get("missing") is None
+        assert len(self.registry) == 0
+
+    def test_load_uses_one_query(self, django_assert_num_queries, make_client):
+        client = make_client()
+        client.scopes.set(
+            [Scope.objects.create(name="read"), Scope.objects.create(name="write")]
+        )
+        with django_assert_num_queries(1):
+            entry = self.registry.get(client.client_id)
+        assert entry.scope_mask == 0b11
+
+    def test_get_inactive_client(self, make_client):
+        client = make_client(is_active=False)
+        assert self.registry.get(client.client_id) is None
+
+    def test_cached_lookup_skips_database(self, django_assert_num_queries, make_client):
+        client = make_client()
+        self.registry.get(client.client_id)
+        with django_assert_num_queries(0):
+            self.registry.get(client.client_id)
+
+    def test_expired_entry_is_reloaded(
+        self, django_assert_max_num_queries, make_client
+    ):
+        registry = ClientRegistry(ttl=-1)
+        client = make_client()
+        registry.get(client.client_id)
+        with django_assert_max_num_queries(2) as ctx:
+            registry.get(client.client_id)
+        assert len(ctx.captured_queries) > 0
+
+    def test_invalidate(self, make_client):
+        client = make_client()
+        self.registry.get(client.client_id)
+        self.registry.invalidate(client.client_id)
+        assert len(self.registry) == 0
+
+    def test_save_invalidates_global_registry(self, make_client):
+        from oauth2.registry import client_registry
+
+        client = make_client()
+        client_registry.get(client.client_id)
+        client.is_active = False
+        client.save()
+        assert client_registry.get(client.client_id) is None
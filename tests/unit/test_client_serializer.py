@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from oauth2.models import Client, Scope
+from oauth2.scopes import scope_registry
+from oauth2.serializers import ClientSerializer
+
+
+def expected(client):
+    datetime = serializers.DateTimeField()
+    return {
+        "client_id": client.client_id,
+        "client_type": client.client_type,
+        "name": client.name,
+        "description": client.description,
+        "redirect_uris": client.redirect_uris,
+        "scope": " ".join(scope.name for scope in client.scopes.order_by("bit")),
+        "is_active": client.is_active,
+        "created_at": datetime.to_representation(client.created_at),
+        "updated_at": datetime.to_representation(client.updated_at),
+    }
+
+
+@pytest.mark.django_db
+class TestClientSerializer:
+    def test_serializes_queryset(self, make_client):
+        read = Scope.objects.create(name="read")
+        write = Scope.objects.create(name="write")
+        first = make_client("first", scopes=[write, read])
+        second = make_client("second", client_type="public", description="Public")
+
+        data = ClientSerializer().serialize_queryset(Client.objects.order_by("id"))
+
+        assert data == [expected(first), expected(second)]
+        assert data[0]["scope"] == "read write"
+        assert data[0]["created_at"].endswith("Z")
+        assert "client_secret" not in data[0]
+
+    def test_uses_two_queries(self, make_client):
+        scope = Scope.objects.create(name="read")
+        for number in range(5):
+            make_client(f"client-{number}", scopes=[scope])
+        scope_registry.load()
+
+        with CaptureQueriesContext(connection) as queries:
+            data = ClientSerializer().serialize_queryset(Client.objects.all())
+
+        assert len(data) == 5
+        assert len(queries) == 2
+
+    def test_sliced_queryset(self, make_client):
+        clients = [make_client(f"client-{number}") for number in range(3)]
+
+        data = ClientSerializer(["name"]).serialize_queryset(
+            Client.objects.order_by("id")[1:]
+        )
+
+        assert data == [{"name": client.name} for client in clients[1:]]
+
+    def test_field_subset_skips_scope_query(self, make_client):
+        make_client(scopes=[Scope.objects.create(name="read")])
+
+        with CaptureQueriesContext(connection) as queries:
+            data = ClientSerializer(["client_id", "is_active"]).serialize_queryset(
+                Client.objects.all()
+            )
+
+        assert list(data[0]) == ["client_id", "is_active"]
+        assert len(queries) == 1
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match="client_secret"):
+            ClientSerializer(["client_id", "client_secret"])
+
+    def test_serialize_clients(self, make_client):
+        client = make_client(scopes=[Scope.objects.create(name="read")])
+
+        assert ClientSerializer().serialize_clients([client]) == [expected(client)]
+        assert ClientSerializer().serialize_clients([]) == []
+
+
+@pytest.mark.django_db
+class TestDRFSerializer:
+    def test_matches_fast_path(self, make_client):
+        scope = Scope.objects.create(name="read")
+        clients = [
+            make_client(f"client-{number}", scopes=[scope]) for number in range(3)
+        ]
+        serializer_class = ClientSerializer.drf_serializer()
+
+        many = serializer_class(Client.objects.order_by("id"), many=True).data
+        one = serializer_class(clients[0]).data
+
+        assert many == [expected(client) for client in clients]
+        assert one == expected(clients[0])
+
+    def test_declares_fields(self):
+        serializer_class = ClientSerializer.drf_serializer(["client_id", "scope"])
+
+        assert list(serializer_class().fields) == ["client_id", "scope"]
+        assert serializer_class is ClientSerializer.drf_serializer(
+            ["client_id", "scope"]
+        )
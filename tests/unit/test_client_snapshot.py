@@ -0,0 +1,195 @@
+import os
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from oauth2.entries import ClientEntry, hash_secret
+from oauth2.models import Client, Scope
+from oauth2.registry import ClientRegistry, client_registry
+from oauth2.snapshot import (
+    ClientSnapshot,
+    MappedSnapshot,
+    SnapshotError,
+    SnapshotPublisher,
+    client_snapshot,
+    write_snapshot,
+)
+
+
+def make_entry(client_id, **kwargs):
+    defaults = {
+        "client_type": "confidential",
+        "secret_hash": hash_secret(f"secret-{client_id}"),
+        "redirect_uris": ["https://example.com/callback", "com.example.app:/cb"],
+        "scope_mask": 0b101,
+        "updated_at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    }
+    defaults.update(kwargs)
+    return ClientEntry(client_id, **defaults)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "clients.snapshot")
+
+
+class TestSnapshotFormat:
+    def test_round_trip(self, snapshot_path):
+        entries = [make_entry(f"client-{i}") for i in range(50)]
+        entries.append(make_entry("public-one", client_type="public", secret_hash=None))
+        entries.append(make_entry("limited", rate_limit=120, rate_limit_burst=0))
+        write_snapshot(snapshot_path, entries, version=7)
+
+        mapped = MappedSnapshot(snapshot_path)
+
+        assert mapped.version == 7
+        assert len(mapped) == 52
+        entry = mapped.get("client-13")
+        assert entry.client_type == "confidential"
+        assert entry.check_secret("secret-client-13")
+        assert entry.redirect_uris == frozenset(
+            ["https://example.com/callback", "com.example.app:/cb"]
+        )
+        assert entry.scope_mask == 0b101
+        assert entry.updated_at == entries[0].updated_at
+        public = mapped.get("public-one")
+        assert public.client_type == "public"
+        assert public.secret_hash is None
+        assert (public.rate_limit, public.rate_limit_burst) == (None, None)
+        limited = mapped.get("limited")
+        assert (limited.rate_limit, limited.rate_limit_burst) == (120, 0)
+
+    def test_missing_client(self, snapshot_path):
+        write_snapshot(snapshot_path, [make_entry("a")])
+        assert MappedSnapshot(snapshot_path).get("b") is None
+
+    def test_empty_snapshot(self, snapshot_path):
+        write_snapshot(snapshot_path, [])
+        assert MappedSnapshot(snapshot_path).get("a") is None
+
+    def test_rejects_foreign_file(self, snapshot_path):
+        with open(snapshot_path, "wb") as f:
+            f.write(b"not a snapshot at all, definitely")
+        with pytest.raises(SnapshotError):
+            MappedSnapshot(snapshot_path)
+
+    def test_write_is_atomic_rename(self, snapshot_path):
+        write_snapshot(snapshot_path, [make_entry("a")])
+        directory = os.path.dirname(snapshot_path)
+        assert os.listdir(directory) == ["clients.snapshot"]
+
+
+class TestClientSnapshot:
+    def test_disabled_without_path(self):
+        assert ClientSnapshot().get("a") is None
+
+    def test_hot_swaps_new_version(self, snapshot_path, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "SNAPSHOT_CHECK_INTERVAL": 0}
+        snapshot = ClientSnapshot(snapshot_path)
+        write_snapshot(snapshot_path, [make_entry("a")], version=1)
+        assert snapshot.get("a") is not None
+        old = snapshot.mapped()
+
+        write_snapshot(snapshot_path, [make_entry("b")], version=2)
+
+        assert snapshot.version == 1
+        assert snapshot.get("a") is None
+        assert snapshot.get("b") is not None
+        assert snapshot.version == 2
+        # Lookups that started on the old mapping keep working.
+        assert old.get("a") is not None
+
+
+@pytest.mark.django_db
+class TestRegistryWithSnapshot:
+    @pytest.fixture(autouse=True)
+    def configure(self, settings, snapshot_path):
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "SNAPSHOT_PATH": snapshot_path,
+            "SNAPSHOT_CHECK_INTERVAL": 0,
+        }
+
+    def test_lookup_served_from_snapshot(
+        self, snapshot_path, django_assert_num_queries
+    ):
+        write_snapshot(snapshot_path, [make_entry("snap-client")])
+        registry = ClientRegistry()
+        with django_assert_num_queries(0):
+            entry = registry.get("snap-client")
+        assert entry.check_secret("secret-snap-client")
+        assert len(registry) == 0
+
+    def test_snapshot_miss_falls_back_to_database(self, snapshot_path):
+        write_snapshot(snapshot_path, [])
+        client = Client.objects.create(
+            client_type="public",
+            name="Fresh Client",
+            redirect_uris=["https://example.com/callback"],
+        )
+        assert client_registry.get(client.client_id).client_id == client.client_id
+
+    def test_local_invalidation_bypasses_snapshot(self, snapshot_path):
+        client = Client.objects.create(
+            client_type="public",
+            name="Snapshotted",
+            redirect_uris=["https://example.com/callback"],
+        )
+        call_command("build_client_snapshot", path=snapshot_path, stdout=StringIO())
+        assert client_registry.get(client.client_id) is not None
+
+        client.is_active = False
+        client.save()
+        assert client_registry.get(client.client_id) is None
+
+        call_command("build_client_snapshot", path=snapshot_path, stdout=StringIO())
+        client_snapshot.mapped()
+        assert client_registry.get(client.client_id) is None
+
+    def test_build_command_includes_scopes(self, snapshot_path):
+        read = Scope.objects.create(name="read")
+        client = Client.objects.create(
+            client_type="confidential",
+            name="Scoped",
+            redirect_uris=["https://example.com/callback"],
+        )
+        client.scopes.set([read])
+        Client.objects.create(
+            client_type="public",
+            name="Inactive",
+            redirect_uris=["https://example.com/callback"],
+            is_active=False,
+        )
+
+        call_command("build_client_snapshot", path=snapshot_path, stdout=StringIO())
+
+        mapped = MappedSnapshot(snapshot_path)
+        assert len(mapped) == 1
+        entry = mapped.get(client.client_id)
+        assert entry.scope_mask == 0b1
+        assert entry.check_secret(client.client_secret)
+
+
+@pytest.mark.django_db
+class TestSnapshotPublisher:
+    def test_single_leader(self, snapshot_path):
+        first = SnapshotPublisher(snapshot_path)
+        second = SnapshotPublisher(snapshot_path)
+        try:
+            assert first.try_acquire() is True
+            assert second.try_acquire() is False
+            assert second.run_once() is None
+        finally:
+            first.stop()
+        assert second.try_acquire() is True
+        second.stop()
+
+    def test_leader_builds_snapshot(self, snapshot_path):
+        publisher = SnapshotPublisher(snapshot_path)
+        try:
+            version, count = publisher.run_once()
+        finally:
+            publisher.stop()
+        assert count == 0
+        assert MappedSnapshot(snapshot_path).version == version
@@ -0,0 +1,199 @@
+import threading
+
+import pytest
+from django.db import DatabaseError
+from django.db.utils import ConnectionHandler
+from myauthservice.db import pool as pool_module
+from myauthservice.db.pool import ConnectionPool, PoolTimeout
+from oauth2.metrics import metrics
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(validate=lambda connection: True, **kwargs):
+    opened = []
+
+    def connect():
+        connection = FakeConnection(len(opened))
+        opened.append(connection)
+        return connection
+
+    kwargs.setdefault("size", 2)
+    pool = ConnectionPool(connect, validate, **kwargs)
+    return pool, opened
+
+
+class TestConnectionPool:
+    def test_reuses_returned_connections(self):
+        pool, opened = make_pool()
+
+        first = pool.checkout()
+        pool.checkin(first)
+        second = pool.checkout()
+
+        assert second is first
+        assert len(opened) == 1
+        assert pool.stats()["checkouts"] == 2
+        assert metrics.snapshot()["db_pool_connections_created_total"] == 1
+
+    def test_times_out_when_exhausted(self):
+        pool, _ = make_pool(size=1, timeout=0.05)
+        pool.checkout()
+
+        with pytest.raises(PoolTimeout):
+            pool.checkout()
+
+        assert pool.stats()["timeouts"] == 1
+        assert pool.stats()["waits"] == 1
+
+    def test_waiter_gets_returned_connection(self):
+        pool, opened = make_pool(size=1, timeout=5)
+        held = pool.checkout()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.checkout()))
+        waiter.start()
+
+        pool.checkin(held)
+        waiter.join(5)
+
+        assert result == [held]
+        assert len(opened) == 1
+        assert pool.stats()["waits"] == 1
+
+    def test_discard_frees_a_slot(self):
+        pool, opened = make_pool(size=1)
+        connection = pool.checkout()
+
+        pool.checkin(connection, discard=True)
+
+        assert connection.closed
+        assert pool.checkout() is not connection
+        assert pool.stats()["open"] == 1
+
+    def test_expired_connections_are_replaced(self):
+        pool, opened = make_pool(max_lifetime=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        assert pool.checkout() is not connection
+        assert connection.closed
+
+    def test_idle_connections_are_validated(self):
+        checked = []
+
+        def validate(connection):
+            checked.append(connection)
+            return False
+
+        pool, opened = make_pool(validate=validate, check_idle=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        assert pool.checkout() is not connection
+        assert checked == [connection]
+        assert metrics.snapshot()["db_pool_connections_discarded_total"] == 1
+
+    def test_gauges(self):
+        pool, _ = make_pool()
+        connection = pool.checkout()
+        pool.checkout()
+        pool.checkin(connection)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["db_pool_connections_open"] == 2
+        assert snapshot["db_pool_connections_idle"] == 1
+        assert pool.stats()["in_use"] == 1
+
+    def test_connections_are_not_shared_after_fork(self, monkeypatch):
+        pool, opened = make_pool()
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        monkeypatch.setattr(pool_module.os, "getpid", lambda: -1)
+
+        assert pool.checkout() is not connection
+        assert not connection.closed  # still the parent's
+        assert pool.stats()["open"] == 1
+
+
+@pytest.fixture
+def pooled_connection(tmp_path, django_db_blocker):
+    handler = ConnectionHandler(
+        {
+            "default": {},
+            "pooled": {
+                "ENGINE": "myauthservice.db.backends.sqlite3",
+                "NAME": str(tmp_path / "pool.sqlite3"),
+                "POOL": {"SIZE": 2},
+            },
+        }
+    )
+    connection = handler["pooled"]
+    with django_db_blocker.unblock():
+        yield connection
+        connection.close()
+    pool_module._pools.pop("pooled").close()
+
+
+class TestPooledBackend:
+    def test_close_returns_connection_to_pool(self, pooled_connection):
+        pooled_connection.ensure_connection()
+        raw = pooled_connection.connection
+        pooled_connection.close()
+
+        pooled_connection.ensure_connection()
+
+        assert pooled_connection.connection is raw
+        assert pooled_connection.pool.stats()["open"] == 1
+
+    def test_connection_with_errors_is_discarded(self, pooled_connection):
+        pooled_connection.ensure_connection()
+        raw = pooled_connection.connection
+        with pytest.raises(DatabaseError):
+            with pooled_connection.cursor() as cursor:
+                cursor.execute("SELECT * FROM missing_table")
+        pooled_connection.close()
+
+        pooled_connection.ensure_connection()
+
+        assert pooled_connection.connection is not raw
+
+    def test_queries_work_on_reused_connections(self, pooled_connection):
+        for _ in range(3):
+            with pooled_connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                assert cursor.fetchone() == (1,)
+            pooled_connection.close()
+        assert pooled_connection.pool.stats()["checkouts"] == 3
+
+
+class TestDatabaseConnectionSettings:
+    def test_defaults(self, monkeypatch):
+        from myauthservice.settings.base import database_connection_settings
+
+        for name in ("DB_POOL_SIZE", "DB_CONN_MAX_AGE", "DB_CONN_HEALTH_CHECKS"):
+            monkeypatch.delenv(name, raising=False)
+
+        options = database_connection_settings(max_age=60, health_checks=True)
+
+        assert options["CONN_MAX_AGE"] == 60
+        assert options["CONN_HEALTH_CHECKS"] is True
+        assert options["POOL"]["SIZE"] == 0
+
+    def test_pool_size_disables_persistent_connections(self, monkeypatch):
+        from myauthservice.settings.base import database_connection_settings
+
+        monkeypatch.delenv("DB_CONN_MAX_AGE", raising=False)
+        monkeypatch.setenv("DB_POOL_SIZE", "8")
+
+        options = database_connection_settings(max_age=60)
+
+        assert options["CONN_MAX_AGE"] == 0
+        assert options["POOL"]["SIZE"] == 8
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+from django.test import Client as DjangoClient
+from myauthservice.fastpath import FastPathASGI, FastPathWSGI, wrap_wsgi
+
+
+def wsgi_fallback(environ, start_response):
+    start_response("418 I'm a teapot", [])
+    return [b"django"]
+
+
+def call_wsgi(app, path, method="GET"):
+    captured = {}
+
+    def start_response(status, headers):
+        captured["status"] = status
+        captured["headers"] = dict(headers)
+
+    body = b"".join(app({"REQUEST_METHOD": method, "PATH_INFO": path}, start_response))
+    return captured["status"], captured["headers"], body
+
+
+def call_asgi(app, path, method="GET"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path}
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+class TestFastPathWSGI:
+    def test_serves_health_and_version(self, settings):
+        app = FastPathWSGI(wsgi_fallback)
+
+        status, headers, body = call_wsgi(app, "/api/health/")
+        assert status == "200 OK"
+        assert headers["Content-Type"] == "application/json"
+        assert headers["X-Content-Type-Options"] == "nosniff"
+        assert json.loads(body) == {"status": "ok"}
+
+        _, _, body = call_wsgi(app, "/api/version/")
+        assert json.loads(body) == {
+            "service": "MyAuthService",
+            "version": settings.SERVICE_VERSION,
+        }
+
+    def test_head_has_no_body(self):
+        status, headers, body = call_wsgi(
+            FastPathWSGI(wsgi_fallback), "/api/health/", "HEAD"
+        )
+        assert status == "200 OK"
+        assert headers["Content-Length"] == "15"
+        assert body == b""
+
+    @pytest.mark.parametrize(
+        "path, method",
+        [("/api/health/", "POST"), ("/api/health", "GET"), ("/admin/", "GET")],
+    )
+    def test_other_requests_reach_django(self, path, method):
+        status, _, body = call_wsgi(FastPathWSGI(wsgi_fallback), path, method)
+        assert status.startswith("418")
+        assert body == b"django"
+
+    def test_can_be_disabled(self, settings):
+        settings.FAST_PATH_ENABLED = False
+        assert wrap_wsgi(wsgi_fallback) is wsgi_fallback
+
+
+class TestFastPathASGI:
+    def test_serves_health(self):
+        async def fallback(scope, receive, send):
+            raise AssertionError("Django should not be called")
+
+        start, body = call_asgi(FastPathASGI(fallback), "/api/health/")
+        assert start["status"] == 200
+        assert (b"content-type", b"application/json") in start["headers"]
+        assert body["body"] == b'{"status":"ok"}'
+
+    def test_other_requests_reach_django(self):
+        async def fallback(scope, receive, send):
+            await send({"type": "fallback", "path": scope["path"]})
+
+        assert call_asgi(FastPathASGI(fallback), "/api/clients/changes/") == [
+            {"type": "fallback", "path": "/api/clients/changes/"}
+        ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("path", ["/api/health/", "/api/version/"])
+def test_matches_django_response(path):
+    django_resp = DjangoClient().get(path)
+    _, headers, body = call_wsgi(FastPathWSGI(wsgi_fallback), path)
+
+    assert body == django_resp.content
+    for name, value in headers.items():
+        assert django_resp.headers[name] == value
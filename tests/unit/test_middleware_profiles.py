@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from django.test import RequestFactory
+from myauthservice.handlers import ProfiledASGIHandler, ProfiledWSGIHandler
+
+SESSION = "django.contrib.sessions.middleware.SessionMiddleware"
+
+
+@pytest.fixture
+def handler():
+    return ProfiledWSGIHandler()
+
+
+def middleware_names(profile_handler):
+    return [path.rsplit(".", 1)[-1] for path in profile_handler.middleware]
+
+
+class TestProfiledWSGIHandler:
+    def test_api_uses_lean_profile(self, handler, settings):
+        profile = handler.profile_for("/api/clients/changes/")
+
+        assert profile is not None
+        assert SESSION not in profile.middleware
+        assert profile.middleware == settings.MIDDLEWARE_PROFILES["/api/"]
+
+    def test_other_paths_use_full_chain(self, handler):
+        assert handler.profile_for("/admin/") is None
+        assert handler.profile_for("/schema/") is None
+
+    def test_longest_prefix_wins(self, settings):
+        settings.MIDDLEWARE_PROFILES = {
+            "/api/": ["django.middleware.common.CommonMiddleware"],
+            "/api/clients/": [],
+        }
+        handler = ProfiledWSGIHandler()
+
+        assert handler.profile_for("/api/clients/export/").middleware == []
+        assert middleware_names(handler.profile_for("/api/version/")) == [
+            "CommonMiddleware"
+        ]
+
+    def test_loading_profiles_keeps_middleware_setting(self, settings):
+        before = list(settings.MIDDLEWARE)
+        ProfiledWSGIHandler()
+        assert settings.MIDDLEWARE == before
+
+    @pytest.mark.django_db
+    def test_api_request_skips_session_middleware(self, handler):
+        request = RequestFactory().get("/api/version/")
+
+        response = handler.get_response(request)
+
+        assert response.status_code == 200
+        assert not hasattr(request, "session")
+        assert response["X-Frame-Options"] == "DENY"
+
+    @pytest.mark.django_db
+    def test_admin_request_runs_full_chain(self, handler):
+        request = RequestFactory().get("/admin/login/")
+
+        response = handler.get_response(request)
+
+        assert response.status_code == 200
+        assert hasattr(request, "session")
+        assert hasattr(request, "user")
+
+
+@pytest.mark.django_db
+def test_asgi_handler_uses_profiles():
+    handler = ProfiledASGIHandler()
+    request = RequestFactory().get("/api/version/")
+
+    response = asyncio.run(handler.get_response_async(request))
+
+    assert response.status_code == 200
+    assert not hasattr(request, "session")
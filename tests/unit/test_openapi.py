@@ -0,0 +1,67 @@
+import yaml
+from django.core.management import call_command
+from django.urls import path
+from drf_spectacular.utils import extend_schema
+from myauthservice.generators import SchemaGenerator
+from myauthservice.openapi import DeferredSchema
+from rest_framework import serializers
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+
+class GreetingSerializer(serializers.Serializer):
+    greeting = serializers.CharField()
+
+
+@extend_schema(operation_id="greet", responses=GreetingSerializer)
+@api_view(["GET"])
+def greet(request):
+    return Response({"greeting": "hello"})
+
+
+@api_view(["GET"])
+def plain(request):
+    return Response({})
+
+
+def generate(**views):
+    patterns = [path(f"{name}/", view) for name, view in views.items()]
+    return SchemaGenerator(patterns=patterns).get_schema(request=None, public=True)
+
+
+def test_views_are_created_with_the_placeholder():
+    assert isinstance(plain.cls.schema, DeferredSchema)
+
+
+def test_extend_schema_override_is_applied():
+    schema = generate(greet=greet)
+
+    operation = schema["paths"]["/greet/"]["get"]
+    assert operation["operationId"] == "greet"
+    assert operation["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/Greeting"
+    }
+    assert "greeting" in schema["components"]["schemas"]["Greeting"]["properties"]
+
+
+def test_plain_view_is_generated():
+    schema = generate(plain=plain)
+
+    assert schema["paths"]["/plain/"]["get"]["operationId"] == "plain_retrieve"
+
+
+def test_api_schema_generates_without_warnings(tmp_path):
+    path = tmp_path / "openapi.yaml"
+
+    # --fail-on-warn raises on any generator warning or error.
+    call_command("spectacular", "--fail-on-warn", "--file", str(path))
+
+    paths = yaml.safe_load(path.read_text())["paths"]
+    operations = [op["operationId"] for item in paths.values() for op in item.values()]
+    assert len(set(operations)) == len(operations)
+    assert paths["/api/clients/{client_id}/"]["get"]["responses"]["200"]["content"][
+        "application/json"
+    ]["schema"] == {"$ref": "#/components/schemas/Client"}
+    assert paths["/api/register/"]["post"]["requestBody"]["content"][
+        "application/json"
+    ]["schema"] == {"$ref": "#/components/schemas/ClientMetadata"}
@@ -0,0 +1,107 @@
+import gc
+
+import pytest
+from django.apps import apps
+from django.core.signals import request_started
+from myauthservice import preload
+from oauth2 import apps as oauth2_apps
+from oauth2.warmup import warmup_state
+
+
+@pytest.fixture
+def gc_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(gc, "freeze", lambda: calls.append("freeze"))
+    monkeypatch.setattr(gc, "disable", lambda: calls.append("disable"))
+    monkeypatch.setattr(gc, "enable", lambda: calls.append("enable"))
+    return calls
+
+
+@pytest.fixture
+def fork_hooks(monkeypatch):
+    hooks = []
+    monkeypatch.setattr(
+        preload.os,
+        "register_at_fork",
+        lambda after_in_child: hooks.append(after_in_child),
+    )
+    return hooks
+
+
+@pytest.fixture
+def started(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        oauth2_apps,
+        "start_background_services",
+        lambda warm_up=True: calls.append(warm_up),
+    )
+    monkeypatch.setattr(preload, "_master_pid", None)
+    monkeypatch.setattr(preload, "_services_pid", None)
+    yield calls
+    request_started.disconnect(dispatch_uid=preload.__name__)
+
+
+def test_gc_thresholds(settings):
+    previous = gc.get_threshold()
+    settings.GC_THRESHOLDS = (50000, 20, 20)
+    try:
+        preload.configure_gc()
+        assert gc.get_threshold() == (50000, 20, 20)
+    finally:
+        gc.set_threshold(*previous)
+
+
+def test_without_preload_nothing_is_frozen(settings, gc_calls, fork_hooks, started):
+    settings.PRELOAD_ENABLED = False
+    with preload.boot():
+        assert started == []
+    assert gc_calls == []
+    assert fork_hooks == []
+    assert started == [True]
+
+
+@pytest.mark.django_db
+def test_preload_warms_and_freezes(settings, gc_calls, fork_hooks, started):
+    settings.PRELOAD_ENABLED = True
+    settings.OAUTH2 = {**settings.OAUTH2, "WARMUP_ENABLED": True}
+    warmup_state.status = warmup_state.PENDING
+
+    with preload.boot():
+        assert gc_calls == ["disable"]
+
+    assert gc_calls == ["disable", "freeze", "enable"]
+    assert warmup_state.status == warmup_state.DONE
+    [hook] = fork_hooks
+
+    hook()
+    assert started == []  # not a worker forked by this master
+
+    preload._master_pid = preload.os.getppid()
+    hook()
+    assert started == [False]
+    request_started.send(sender=None)
+    assert started == [False]  # a worker, not the preloaded process
+    warmup_state.status = warmup_state.PENDING
+
+
+@pytest.mark.django_db
+def test_preloaded_process_that_never_forks(settings, gc_calls, fork_hooks, started):
+    settings.PRELOAD_ENABLED = True
+
+    with preload.boot():
+        pass
+
+    assert gc_calls[-1] == "enable"
+    assert started == []
+    request_started.send(sender=None)
+    request_started.send(sender=None)
+    assert started == [False]
+
+
+@pytest.mark.parametrize("preload_enabled", [False, True])
+def test_ready_starts_no_services(settings, started, preload_enabled):
+    # manage.py commands and test runs load the app without a server.
+    settings.PRELOAD_ENABLED = preload_enabled
+    apps.get_app_config("oauth2").ready()
+    assert started == []
@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import caches
+from oauth2.entries import ClientEntry
+from oauth2.metrics import metrics
+from oauth2.models import Client
+from oauth2.ratelimit import (
+    CacheBuckets,
+    LocalBuckets,
+    RateLimiter,
+    limits_for,
+    throttle_client,
+)
+from oauth2.registry import client_registry
+from rest_framework.exceptions import Throttled
+
+NOW = 1_700_000_000.0
+
+
+def entry(rate_limit=None, rate_limit_burst=None):
+    return ClientEntry(
+        "client-a",
+        "public",
+        None,
+        [],
+        0,
+        rate_limit=rate_limit,
+        rate_limit_burst=rate_limit_burst,
+    )
+
+
+class TestRateLimiter:
+    def test_allows_a_burst_then_refills_at_the_rate(self):
+        limiter = RateLimiter(LocalBuckets())
+
+        assert [limiter.check("a", 60, 3, now=NOW) for _ in range(3)] == [0.0] * 3
+        assert limiter.check("a", 60, 3, now=NOW) == pytest.approx(1.0)
+        assert limiter.check("a", 60, 3, now=NOW + 1) == 0.0
+        assert limiter.check("a", 60, 3, now=NOW + 1) > 0
+        assert limiter.check("b", 60, 3, now=NOW) == 0.0
+
+    def test_bucket_is_full_again_after_idling(self):
+        limiter = RateLimiter(LocalBuckets())
+        for _ in range(3):
+            limiter.check("a", 60, 3, now=NOW)
+
+        later = NOW + 3
+        assert [limiter.check("a", 60, 3, now=later) for _ in range(4)][-1] > 0
+
+    def test_zero_rate_blocks(self):
+        limiter = RateLimiter(LocalBuckets())
+
+        assert limiter.check("a", 0, 10, now=NOW) == 60.0
+
+    def test_refusals_are_counted(self):
+        limiter = RateLimiter(LocalBuckets())
+        limiter.check("a", 60, 1, now=NOW)
+        limiter.check("a", 60, 1, now=NOW)
+
+        assert metrics.snapshot()["oauth2_rate_limited_total"] == 1
+
+    def test_local_state_is_bounded(self):
+        buckets = LocalBuckets(max_clients=2)
+        limiter = RateLimiter(buckets)
+        limiter.check("a", 60, 5, now=NOW)
+        limiter.check("b", 60, 5, now=NOW + 100)
+        # "a" is full again by now and is dropped to make room.
+        limiter.check("c", 60, 5, now=NOW + 100)
+
+        assert len(buckets) == 2
+        assert buckets.get("a") is None
+
+    def test_shared_cache_backend(self):
+        cache = caches["default"]
+        first, second = (RateLimiter(CacheBuckets("default")) for _ in range(2))
+
+        assert first.check("a", 60, 1) == 0.0
+        assert second.check("a", 60, 1) > 0
+        cache.delete("oauth2:ratelimit:a")
+
+    def test_cache_backend_from_settings(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "RATE_LIMIT_CACHE": "default"}
+        limiter = RateLimiter()
+
+        assert isinstance(limiter.buckets, CacheBuckets)
+        caches["default"].delete("oauth2:ratelimit:a")
+
+
+class TestLimits:
+    def test_client_limits_override_defaults(self, settings):
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "RATE_LIMIT_DEFAULT": 600,
+            "RATE_LIMIT_BURST": 60,
+        }
+
+        assert limits_for(entry()) == (600, 60)
+        assert limits_for(entry(rate_limit=10)) == (10, 60)
+        assert limits_for(entry(rate_limit=10, rate_limit_burst=0)) == (10, 1)
+
+    def test_no_default_leaves_clients_unlimited(self, settings):
+        settings.OAUTH2 = {**settings.OAUTH2, "RATE_LIMIT_DEFAULT": None}
+
+        assert limits_for(entry()) is None
+        assert RateLimiter(LocalBuckets()).check_entry(entry()) == 0.0
+        assert limits_for(entry(rate_limit=10)) == (10, 60)
+
+
+@pytest.mark.django_db
+def test_throttle_uses_client_limits():
+    client = Client.objects.create(
+        client_type="public",
+        name="Limited",
+        redirect_uris=["https://example.com/callback"],
+        rate_limit=60,
+        rate_limit_burst=2,
+    )
+    limited = client_registry.get(client.client_id)
+
+    throttle_client(limited)
+    throttle_client(limited)
+    with pytest.raises(Throttled) as excinfo:
+        throttle_client(limited)
+
+    assert 0 < excinfo.value.wait <= 1
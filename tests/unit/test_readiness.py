@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+from oauth2.readiness import ProbeFailed, ReadinessChecker, check_migrations
+
+
+@pytest.fixture(autouse=True)
+def ready_settings(settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "READY_PROBE_TIMEOUT": 0.2,
+        "READY_CACHE_TTL": 60,
+    }
+
+
+def ok():
+    return None
+
+
+def failing():
+    raise ProbeFailed("down")
+
+
+class TestReadinessChecker:
+    def test_all_ok(self):
+        ready, checks = ReadinessChecker({"a": ok, "b": lambda: {"x": 1}}).check()
+
+        assert ready is True
+        assert checks["a"]["status"] == "ok"
+        assert checks["a"]["latency_ms"] >= 0
+        assert checks["b"]["detail"] == {"x": 1}
+
+    def test_failure_is_reported(self):
+        ready, checks = ReadinessChecker({"a": ok, "b": failing}).check()
+
+        assert ready is False
+        assert checks["b"] == {
+            "status": "failed",
+            "latency_ms": checks["b"]["latency_ms"],
+            "detail": "down",
+        }
+
+    def test_probes_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        def meet():
+            barrier.wait()
+
+        ready, _ = ReadinessChecker({"a": meet, "b": meet}).check()
+        assert ready is True
+
+    def test_slow_probe_times_out_and_is_not_restarted(self):
+        release = threading.Event()
+        calls = []
+
+        def hang():
+            calls.append(1)
+            release.wait(5)
+
+        checker = ReadinessChecker({"a": ok, "slow": hang})
+        ready, checks = checker.check()
+        assert ready is False
+        assert checks["slow"]["status"] == "timeout"
+        assert checks["a"]["status"] == "ok"
+
+        checker.reset()
+        _, checks = checker.check()
+        assert checks["slow"]["status"] == "timeout"
+        assert len(calls) == 1
+
+        release.set()
+
+    def test_result_is_cached(self):
+        calls = []
+        checker = ReadinessChecker({"a": lambda: calls.append(1)})
+
+        checker.check()
+        checker.check()
+
+        assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_check_migrations_passes_when_applied():
+    assert check_migrations() is None
@@ -0,0 +1,168 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import transaction
+from oauth2.models import Client, Scope
+from oauth2.registry import ClientRegistry
+from oauth2.sharding import ShardedQuerySet
+from oauth2.signals import end_route_request, route_request
+from oauth2.routers import (
+    ReplicaMonitor,
+    ReplicaRouter,
+    ReplicaSet,
+    is_pinned,
+    replica_set,
+    use_primary,
+)
+from myauthservice.settings.base import replica_databases
+
+
+@pytest.fixture(autouse=True)
+def replica_settings(settings):
+    settings.OAUTH2 = {**settings.OAUTH2, "READ_REPLICAS": ["replica1", "replica2"]}
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+def start(method="GET", path="/api/clients/"):
+    route_request(sender=None, environ={"REQUEST_METHOD": method, "PATH_INFO": path})
+
+
+class TestReplicaRouter:
+    def test_reads_spread_across_requests(self, router):
+        chosen = []
+        for _ in range(4):
+            start()
+            chosen.append(router.db_for_read(Client))
+            end_route_request(sender=None)
+
+        assert sorted(chosen) == ["replica1", "replica1", "replica2", "replica2"]
+
+    def test_request_sticks_to_one_replica(self, router):
+        start()
+
+        assert router.db_for_read(Client) == router.db_for_read(Scope)
+
+    def test_other_apps_use_default_routing(self, router):
+        start()
+
+        assert router.db_for_read(User) is None
+        assert router.db_for_write(User) is None
+
+    def test_writes_go_to_primary_and_pin_the_request(self, router):
+        start()
+
+        assert router.db_for_write(Client) == "default"
+        assert router.db_for_read(Client) == "default"
+
+        end_route_request(sender=None)
+        start()
+        assert router.db_for_read(Client) != "default"
+
+    @pytest.mark.parametrize(
+        "method, path",
+        [("POST", "/api/clients/"), ("GET", "/admin/oauth2/client/")],
+    )
+    def test_pinned_requests(self, router, method, path):
+        start(method, path)
+
+        assert is_pinned()
+        assert router.db_for_read(Client) == "default"
+
+    def test_asgi_scope(self, router):
+        route_request(sender=None, scope={"method": "GET", "path": "/admin/"})
+
+        assert router.db_for_read(Client) == "default"
+
+    def test_use_primary(self, router):
+        start()
+        with use_primary():
+            assert router.db_for_read(Client) == "default"
+        assert router.db_for_read(Client) != "default"
+
+    @pytest.mark.django_db
+    def test_transaction_on_primary_pins_reads(self, router):
+        start()
+        with transaction.atomic():
+            assert router.db_for_read(Client) == "default"
+
+    def test_unhealthy_replicas_are_skipped(self, router):
+        replica_set.mark_down("replica1")
+        for _ in range(3):
+            start()
+            assert router.db_for_read(Client) == "replica2"
+
+        replica_set.mark_down("replica2")
+        start()
+        assert router.db_for_read(Client) == "default"
+
+    def test_request_moves_off_a_failed_replica(self, router):
+        start()
+        alias = router.db_for_read(Client)
+        replica_set.mark_down(alias)
+
+        assert router.db_for_read(Client) not in (alias, "default")
+
+    def test_no_migrations_on_replicas(self, router):
+        assert router.allow_migrate("replica1", "oauth2") is False
+        assert router.allow_migrate("default", "oauth2") is None
+
+    def test_relations_within_the_replica_set(self, router):
+        client, scope = Client(), Scope()
+        client._state.db, scope._state.db = "replica1", "default"
+
+        assert router.allow_relation(client, scope) is True
+
+
+class TestReplicaMonitor:
+    def test_check_marks_replicas(self):
+        replicas = ReplicaSet()
+        down = {"replica2"}
+
+        def probe(alias):
+            if alias in down:
+                raise ConnectionError("unreachable")
+
+        monitor = ReplicaMonitor(replicas, probe=probe)
+
+        assert monitor.check() == ["replica1"]
+        down.clear()
+        assert monitor.check() == ["replica1", "replica2"]
+
+
+class TestRegistryReadYourWrites:
+    def test_recently_changed_clients_load_from_primary(self, settings, monkeypatch):
+        settings.OAUTH2 = {**settings.OAUTH2, "REPLICA_PIN_SECONDS": 60}
+        pinned = []
+
+        def fetch_all(queryset):
+            if queryset._result_cache is None:
+                pinned.append(is_pinned())
+                queryset._result_cache = []
+
+        monkeypatch.setattr(ShardedQuerySet, "_fetch_all", fetch_all)
+        registry = ClientRegistry()
+
+        registry.load("stable")
+        registry.invalidate("changed")
+        registry.load("changed")
+        registry.clear()
+        registry.load("stable")
+
+        assert pinned == [False, True, True]
+
+
+def test_replica_databases():
+    primary = {"ENGINE": "mysql", "HOST": "primary", "NAME": "auth"}
+
+    replicas = replica_databases(primary, [{"HOST": "r1"}, {"HOST": "r2"}])
+
+    assert list(replicas) == ["replica1", "replica2"]
+    assert replicas["replica2"] == {
+        "ENGINE": "mysql",
+        "HOST": "r2",
+        "NAME": "auth",
+        "TEST": {"MIRROR": "default"},
+    }
@@ -0,0 +1,156 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from oauth2.models import Client, Scope
+from oauth2.registry import client_registry
+from oauth2.scopes import (
+    InvalidScope,
+    ScopeRegistry,
+    downscope,
+    is_subset,
+    scope_registry,
+)
+
+
+class TestScopeRegistry:
+    def setup_method(self):
+        self.registry = ScopeRegistry({"read": 0, "write": 1, "admin": 5})
+
+    def test_encode(self):
+        assert self.registry.encode(["read", "admin"]) == 0b100001
+
+    def test_encode_rejects_unknown_scope(self):
+        with pytest.raises(InvalidScope) as exc_info:
+            self.registry.encode(["read", "delete", "boom"])
+        assert exc_info.value.names == ["boom", "delete"]
+
+    def test_parse_scope_string(self):
+        assert self.registry.parse("write  read") == 0b11
+
+    def test_parse_empty_scope_string(self):
+        assert self.registry.parse("") == 0
+
+    def test_parse_caches_result(self):
+        self.registry.parse("read write")
+        assert self.registry._parsed["read write"] == 0b11
+
+    def test_decode_orders_by_bit(self):
+        assert self.registry.decode(0b100011) == ["read", "write", "admin"]
+
+    def test_decode_skips_unassigned_bits(self):
+        assert self.registry.decode(0b1100) == []
+
+    def test_format_round_trip(self):
+        mask = self.registry.parse("admin read")
+        assert self.registry.format(mask) == "read admin"
+
+    def test_clear_keeps_static_mapping(self):
+        self.registry.clear()
+        assert self.registry.encode(["write"]) == 0b10
+
+
+class TestScopeMaskOperations:
+    def test_is_subset(self):
+        assert is_subset(0b001, 0b011)
+        assert is_subset(0, 0b011)
+        assert not is_subset(0b100, 0b011)
+
+    def test_downscope(self):
+        assert downscope(0b111, 0b101) == 0b101
+        assert downscope(0b010, 0b101) == 0
+
+
+@pytest.mark.django_db
+class TestScopeModel:
+    def test_bits_assigned_sequentially(self):
+        read = Scope.objects.create(name="read")
+        write = Scope.objects.create(name="write")
+        assert read.bit == 0
+        assert write.bit == 1
+
+    def test_bit_is_kept_on_update(self):
+        scope = Scope.objects.create(name="read")
+        scope.description = "Read access"
+        scope.save()
+        scope.refresh_from_db()
+        assert scope.bit == 0
+
+    def test_rejects_scope_beyond_max_bit(self):
+        Scope.objects.create(name="last", bit=Scope.MAX_BIT)
+        with pytest.raises(ValidationError):
+            Scope.objects.create(name="overflow")
+
+    def test_bit_taken_concurrently_is_retried(self, monkeypatch):
+        Scope.objects.create(name="read")
+        next_bit = Scope.next_bit
+        reads = []
+
+        def stale_next_bit(using):
+            # The first read misses "read", as if it was created concurrently.
+            reads.append(using)
+            return 0 if len(reads) == 1 else next_bit(using)
+
+        monkeypatch.setattr(Scope, "next_bit", staticmethod(stale_next_bit))
+
+        write = Scope.objects.create(name="write")
+
+        assert write.bit == 1
+        assert len(reads) == 2
+
+    def test_duplicate_name_is_not_retried(self):
+        Scope.objects.create(name="read")
+        with pytest.raises(IntegrityError):
+            Scope.objects.create(name="read")
+        assert Scope.objects.count() == 1
+
+    def test_name_validation(self):
+        scope = Scope(name='bad"scope', bit=0)
+        with pytest.raises(ValidationError) as exc_info:
+            scope.full_clean()
+        assert "name" in exc_info.value.error_dict
+
+    def test_global_registry_loads_from_database(self):
+        Scope.objects.create(name="read")
+        Scope.objects.create(name="write")
+        assert scope_registry.parse("write") == 0b10
+
+    def test_global_registry_reloads_on_scope_change(self):
+        Scope.objects.create(name="read")
+        assert scope_registry.encode(["read"]) == 0b1
+        Scope.objects.create(name="write")
+        assert scope_registry.encode(["write"]) == 0b10
+
+
+@pytest.mark.django_db
+class TestClientScopeGrant:
+    def test_entry_carries_scope_mask(self):
+        read = Scope.objects.create(name="read")
+        Scope.objects.create(name="write")
+        admin = Scope.objects.create(name="admin")
+        client = Client.objects.create(
+            client_type="public",
+            name="Scoped Client",
+            redirect_uris=["https://example.com/callback"],
+        )
+        client.scopes.set([read, admin])
+
+        entry = client_registry.get(client.client_id)
+
+        assert entry.scope_mask == 0b101
+        assert is_subset(scope_registry.parse("admin read"), entry.scope_mask)
+        assert not is_subset(scope_registry.parse("write"), entry.scope_mask)
+
+    def test_grant_change_invalidates_entry(self):
+        read = Scope.objects.create(name="read")
+        write = Scope.objects.create(name="write")
+        client = Client.objects.create(
+            client_type="public",
+            name="Scoped Client",
+            redirect_uris=["https://example.com/callback"],
+        )
+        client.scopes.set([read])
+        assert client_registry.get(client.client_id).scope_mask == 0b01
+
+        client.scopes.add(write)
+
+        assert client_registry.get(client.client_id).scope_mask == 0b11
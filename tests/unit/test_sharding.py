@@ -0,0 +1,331 @@
+import itertools
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import NotSupportedError, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from oauth2 import sharding
+from oauth2.changefeed import changes_since
+from oauth2.models import Client, ClientTombstone, IdWorkerLease, Scope
+from oauth2.registry import ClientRegistry
+from oauth2.sharding import (
+    SLOTS,
+    IdAllocator,
+    IdLeaseKeeper,
+    allocate_id,
+    shard_for,
+    slot_table,
+)
+
+SHARDS = ["default", "shard1"]
+
+pytestmark = pytest.mark.django_db(databases=SHARDS)
+
+
+@pytest.fixture
+def sharded(settings):
+    settings.OAUTH2 = {
+        **settings.OAUTH2,
+        "CLIENT_SHARDS": SHARDS,
+        "CHANGE_FEED_SETTLE": 0,
+    }
+    settings.DATABASE_ROUTERS = ["oauth2.routers.ShardRouter"]
+    return settings
+
+
+@pytest.fixture
+def make_clients(make_client):
+    def make(count):
+        # Every test below needs clients on both shards, so pick client ids
+        # that alternate between them rather than relying on random ones.
+        candidates = (f"client-id-{number}" for number in itertools.count())
+        client_ids = [
+            next(cid for cid in candidates if shard_for(cid) == SHARDS[number % 2])
+            for number in range(count)
+        ]
+        return [
+            make_client(
+                f"client-{number:02d}", client_type="public", client_id=client_id
+            )
+            for number, client_id in enumerate(client_ids)
+        ]
+
+    return make
+
+
+def stored_on(client):
+    return [
+        alias
+        for alias in SHARDS
+        if Client.objects.using(alias).filter(pk=client.pk).exists()
+    ]
+
+
+class TestPlacement:
+    def test_slots_spread_over_shards(self):
+        owners = Counter(slot_table(("default", "shard1", "shard2")))
+
+        assert sum(owners.values()) == SLOTS
+        assert min(owners.values()) > SLOTS / 3 * 0.8
+
+    def test_adding_a_shard_only_moves_slots_to_it(self):
+        before = slot_table(("default", "shard1"))
+        after = slot_table(("default", "shard1", "shard2"))
+
+        moved = [slot for slot in range(SLOTS) if before[slot] != after[slot]]
+
+        assert all(after[slot] == "shard2" for slot in moved)
+        assert 0.25 < len(moved) / SLOTS < 0.42
+
+    def test_unsharded_clients_use_default(self):
+        assert shard_for("anything") == "default"
+
+    def test_allocated_ids_are_unique_and_increasing(self):
+        first, second = allocate_id(), allocate_id()
+
+        assert first < second
+        assert 0 < first < 2**63
+
+    def test_large_batch_of_ids_is_unique(self):
+        ids = [allocate_id() for _ in range(100_000)]
+
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+
+    def test_ids_stay_unique_when_the_clock_stalls(self, monkeypatch):
+        # More keys in one millisecond than the sequence holds, then the
+        # clock stepping back.
+        monkeypatch.setattr(sharding.time, "time", lambda: 1_800_000_000.0)
+        ids = [allocate_id() for _ in range(10_000)]
+        monkeypatch.setattr(sharding.time, "time", lambda: 1_799_999_999.0)
+        ids.append(allocate_id())
+
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+
+    def test_ids_carry_the_leased_worker_id(self):
+        worker_id = allocate_id() >> 12 & 0x3FF
+
+        assert IdWorkerLease.objects.get().worker_id == worker_id
+
+    def test_processes_lease_distinct_worker_ids(self):
+        allocators = [IdAllocator() for _ in range(20)]
+
+        worker_ids = {allocator.worker_id() for allocator in allocators}
+
+        assert len(worker_ids) == 20
+        assert IdWorkerLease.objects.count() == 20
+
+    def test_lost_lease_is_replaced(self):
+        allocator = IdAllocator()
+        worker_id = allocator.worker_id()
+        IdWorkerLease.objects.filter(worker_id=worker_id).update(holder="other")
+
+        assert allocator.renew() != worker_id
+
+    def test_expired_lease_can_be_taken_over(self):
+        now = timezone.now()
+        IdWorkerLease.objects.bulk_create(
+            IdWorkerLease(
+                worker_id=n,
+                holder="other",
+                expires_at=now + timedelta(hours=-1 if n == 7 else 1),
+            )
+            for n in range(1024)
+        )
+
+        assert IdAllocator().worker_id() == 7
+
+    def test_refuses_to_start_without_a_free_worker_id(self):
+        expires_at = timezone.now() + timedelta(hours=1)
+        IdWorkerLease.objects.bulk_create(
+            IdWorkerLease(worker_id=n, holder="other", expires_at=expires_at)
+            for n in range(1024)
+        )
+
+        with pytest.raises(RuntimeError):
+            IdLeaseKeeper(IdAllocator()).start()
+
+    def test_clients_are_stored_on_their_shard(self, sharded, make_clients):
+        for client in make_clients(8):
+            assert stored_on(client) == [shard_for(client.client_id)]
+            assert client._state.db == shard_for(client.client_id)
+
+    def test_primary_keys_are_unique_across_shards(self, sharded, make_clients):
+        clients = make_clients(8)
+
+        assert len({client.pk for client in clients}) == len(clients)
+
+
+class TestCrossShardQueries:
+    def test_lookup_by_client_id_queries_one_shard(self, sharded, make_clients):
+        client = make_clients(8)[3]
+        other = next(alias for alias in SHARDS if alias != client._state.db)
+
+        with CaptureQueriesContext(connections[other]) as queries:
+            assert Client.objects.get(client_id=client.client_id) == client
+
+        assert len(queries) == 0
+
+    def test_listing_is_merged_in_order(self, sharded, make_clients):
+        clients = make_clients(8)
+        names = sorted(client.name for client in clients)
+
+        assert Client.objects.count() == 8
+        assert [c.name for c in Client.objects.order_by("name")] == names
+        assert [c.name for c in Client.objects.order_by("-name")[1:4]] == (
+            names[::-1][1:4]
+        )
+        assert (
+            list(Client.objects.order_by("name").values_list("name", flat=True)[:3])
+            == names[:3]
+        )
+        assert Client.objects.order_by("name").first().name == names[0]
+
+    def test_default_ordering_is_merged(self, sharded, make_clients):
+        make_clients(8)
+        created = [client.created_at for client in Client.objects.all()]
+
+        assert created == sorted(created, reverse=True)
+
+    def test_iterator_merges_values(self, sharded, make_clients):
+        clients = make_clients(8)
+
+        pks = [
+            row["id"] for row in Client.objects.order_by("id").values("id").iterator()
+        ]
+
+        assert pks == sorted(client.pk for client in clients)
+
+    def test_update_and_delete_span_shards(self, sharded, make_clients):
+        make_clients(8)
+
+        assert Client.objects.update(is_active=False) == 8
+        assert not Client.objects.filter(is_active=True).exists()
+        deleted, _ = Client.objects.all().delete()
+        assert Client.objects.count() == 0
+        assert ClientTombstone.objects.count() == 8
+
+    def test_aggregate_needs_a_single_shard(self, sharded):
+        from django.db.models import Count
+
+        with pytest.raises(NotSupportedError):
+            Client.objects.aggregate(count=Count("id"))
+
+    def test_ordering_field_must_be_selected(self, sharded, make_clients):
+        make_clients(8)
+
+        with pytest.raises(NotSupportedError):
+            list(Client.objects.order_by("name").values_list("client_id"))
+
+
+class TestDependentTables:
+    def test_scopes_are_copied_and_grants_stay_with_the_client(
+        self, sharded, make_clients
+    ):
+        read = Scope.objects.create(name="read")
+        clients = make_clients(8)
+        for client in clients:
+            client.scopes.add(read)
+
+        assert Scope.objects.using("shard1").get(pk=read.pk).bit == read.bit
+        registry = ClientRegistry()
+        for client in clients:
+            assert registry.get(client.client_id).scope_mask == 1 << read.bit
+
+    def test_tombstone_is_written_on_the_client_shard(self, sharded, make_clients):
+        client = make_clients(8)[0]
+        client.delete()
+
+        assert (
+            ClientTombstone.objects.using(client._state.db)
+            .filter(client_id=client.client_id)
+            .exists()
+        )
+
+    def test_change_feed_reads_every_shard(self, sharded, make_clients):
+        clients = make_clients(8)
+
+        batch = changes_since(limit=5)
+        rest = changes_since(batch.cursor, limit=5)
+
+        seen = [entry.client_id for entry in batch.upserts + rest.upserts]
+        assert sorted(seen) == sorted(client.client_id for client in clients)
+        assert batch.has_more and not rest.has_more
+
+
+class TestRebalance:
+    def test_moves_clients_to_their_shard(self, sharded, make_client):
+        read = Scope.objects.create(name="read")
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": ["default"]}
+        clients = [
+            make_client(f"client-{number}", client_type="public")
+            for number in range(12)
+        ]
+        for client in clients:
+            client.scopes.add(read)
+
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": SHARDS}
+        call_command("rebalance_client_shards", batch_size=5, stdout=None)
+
+        moved = [c for c in clients if shard_for(c.client_id) == "shard1"]
+        assert moved
+        for client in clients:
+            assert stored_on(client) == [shard_for(client.client_id)]
+            stored = Client.objects.get(client_id=client.client_id)
+            assert list(stored.scopes.all()) == [read]
+        assert ClientTombstone.objects.count() == 0
+
+    def test_dry_run_moves_nothing(self, sharded, capsys, make_client):
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": ["default"]}
+        clients = [
+            make_client(f"client-{number}", client_type="public")
+            for number in range(12)
+        ]
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": SHARDS}
+
+        call_command("rebalance_client_shards", dry_run=True)
+
+        assert all(stored_on(client) == ["default"] for client in clients)
+        assert "Would move" in capsys.readouterr().out
+
+    def test_registry_falls_back_while_rebalancing(self, sharded, make_client):
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": ["default"]}
+        clients = [
+            make_client(f"client-{number}", client_type="public")
+            for number in range(12)
+        ]
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARDS": SHARDS}
+        misplaced = next(c for c in clients if shard_for(c.client_id) == "shard1")
+
+        assert ClientRegistry().get(misplaced.client_id) is None
+        sharded.OAUTH2 = {**sharded.OAUTH2, "CLIENT_SHARD_FALLBACK": True}
+        assert ClientRegistry().get(misplaced.client_id).client_id == (
+            misplaced.client_id
+        )
+
+
+class TestAdmin:
+    def test_changelist_spans_shards(self, sharded, admin_client, make_clients):
+        clients = make_clients(8)
+
+        response = admin_client.get("/admin/oauth2/client/")
+
+        assert response.status_code == 200
+        content = response.content.decode()
+        for client in clients:
+            assert client.name in content
+        assert "shard1" in content
+
+    def test_change_view_finds_client_on_any_shard(
+        self, sharded, admin_client, make_clients
+    ):
+        client = next(c for c in make_clients(8) if c._state.db == "shard1")
+
+        response = admin_client.get(f"/admin/oauth2/client/{client.pk}/change/")
+
+        assert response.status_code == 200
+        assert client.name in response.content.decode()
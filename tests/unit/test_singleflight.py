@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from oauth2.entries import ClientEntry
+from oauth2.registry import ClientRegistry
+from oauth2.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def load(key):
+            calls.append(key)
+            started.set()
+            release.wait(5)
+            return f"value:{key}"
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(flight.do("k", load, "k"))
+        )
+        leader.start()
+        started.wait(5)
+
+        waiters = [
+            threading.Thread(target=lambda: results.append(flight.do("k", load, "k")))
+            for _ in range(8)
+        ]
+        for t in waiters:
+            t.start()
+        assert flight.in_flight("k")
+        release.set()
+        for t in [leader, *waiters]:
+            t.join(5)
+
+        assert calls == ["k"]
+        assert results == ["value:k"] * 9
+        assert not flight.in_flight("k")
+
+    def test_error_is_shared_and_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flight.do("k", fail)
+        assert flight.do("k", lambda: 42) == 42
+
+    def test_distinct_keys_do_not_coalesce(self):
+        flight = SingleFlight()
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+
+
+class TestAsyncSingleFlight:
+    def test_concurrent_coroutines_share_one_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def load(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        async def run():
+            return await asyncio.gather(*[flight.do("k", load, "k") for _ in range(10)])
+
+        assert asyncio.run(run()) == ["K"] * 10
+        assert calls == ["k"]
+        assert not flight.in_flight("k")
+
+    def test_cancelled_caller_does_not_cancel_load(self):
+        flight = AsyncSingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        async def run():
+            first = asyncio.ensure_future(flight.do("k", load))
+            second = asyncio.ensure_future(flight.do("k", load))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == "done"
+
+
+class CountingRegistry(ClientRegistry):
+    def __init__(self, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.loads = 0
+
+    def load(self, client_id):
+        self.loads += 1
+        time.sleep(self.delay)
+        return ClientEntry(client_id, "public", None, [], 0)
+
+
+class TestRegistryCoalescing:
+    def test_threaded_misses_issue_one_load(self):
+        registry = CountingRegistry(delay=0.05, ttl=60)
+        threads = [
+            threading.Thread(target=registry.get, args=("popular",)) for _ in range(20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        assert registry.loads == 1
+
+    def test_async_misses_issue_one_load(self):
+        registry = CountingRegistry(delay=0.05, ttl=60)
+
+        async def run():
+            return await asyncio.gather(*[registry.aget("popular") for _ in range(20)])
+
+        entries = asyncio.run(run())
+        assert registry.loads == 1
+        assert all(entry is entries[0] for entry in entries)
+
+    def test_early_refresh_reloads_before_expiry(self):
+        registry = CountingRegistry(delay=0.001, ttl=60, early_refresh_beta=1e9)
+        registry.get("popular")
+        registry.get("popular")
+        assert registry.loads == 2
+
+    def test_early_refresh_disabled(self):
+        registry = CountingRegistry(ttl=60, early_refresh_beta=0)
+        registry.get("popular")
+        registry.get("popular")
+        assert registry.loads == 1
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        registry = CountingRegistry(ttl=60)
+        original_load = registry.load
+
+        def racing_load(client_id):
+            entry = original_load(client_id)
+            registry.invalidate(client_id)
+            return entry
+
+        registry.load = racing_load
+        assert registry.get("popular") is not None
+        assert len(registry) == 0
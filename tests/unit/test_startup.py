@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from oauth2.management.commands.profile_startup import parse_importtime
+
+BOOT = """
+import sys
+import django
+django.setup()
+from oauth2 import views
+from myauthservice.handlers import get_wsgi_application
+get_wsgi_application()
+print(",".join(sorted(m for m in sys.modules if m.startswith(("drf_spectacular.", "oauth2.admin")))))
+"""
+
+
+def test_api_workers_do_not_load_docs_or_admin(settings):
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = result.stdout.strip().split(",")
+    assert "oauth2.admin" not in loaded
+    assert "drf_spectacular.openapi" not in loaded
+    assert "drf_spectacular.views" not in loaded
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   django.utils\n"
+        "import time:        80 |        200 | django\n"
+    )
+    assert parse_importtime(output) == [
+        ("django.utils", 120, 120),
+        ("django", 80, 200),
+    ]
+
+
+def test_profile_startup_command():
+    out = StringIO()
+    call_command("profile_startup", "--json", "--top", "3", stdout=out)
+
+    report = json.loads(out.getvalue())
+    assert report["status"] == "200 OK"
+    assert report["modules"] > 0
+    assert len(report["packages"]) == 3
+    assert report["total_seconds"] >= report["setup_seconds"]
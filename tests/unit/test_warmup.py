@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from oauth2 import warmup
+from oauth2.filters import client_id_filter
+from oauth2.metrics import metrics
+from oauth2.models import Scope
+from oauth2.registry import client_registry
+from oauth2.warmup import WarmupState, start_warm_up, warm_up
+
+
+@pytest.mark.django_db
+class TestWarmUp:
+    def test_preloads_active_clients(self, django_assert_num_queries, make_client):
+        read = Scope.objects.create(name="read")
+        write = Scope.objects.create(name="write")
+        scoped = make_client()
+        scoped.scopes.set([read, write])
+        plain = make_client(client_type="public")
+        make_client(is_active=False)
+        client_registry.clear()
+
+        count, duration = warm_up(chunk_size=1)
+
+        assert count == 2
+        assert duration >= 0
+        with django_assert_num_queries(0):
+            assert client_registry.get(scoped.client_id).scope_mask == 0b11
+            assert client_registry.get(plain.client_id).scope_mask == 0
+            assert client_registry.get(plain.client_id).check_secret("x") is False
+
+    def test_reports_metrics(self, make_client):
+        make_client()
+        warm_up()
+        snapshot = metrics.snapshot()
+        assert snapshot["oauth2_warmup_entries"] == 1
+        assert snapshot["oauth2_warmup_seconds"] >= 0
+
+    def test_builds_client_id_filter(self, settings, make_client):
+        settings.OAUTH2 = {
+            **settings.OAUTH2,
+            "CLIENT_FILTER_ENABLED": True,
+            "CLIENT_FILTER_REFRESH_INTERVAL": 3600,
+            "CLIENT_FILTER_REBUILD_INTERVAL": 3600,
+        }
+        inactive = make_client(is_active=False)
+        warm_up()
+        assert client_id_filter.is_built
+        assert client_id_filter.might_contain(inactive.client_id) is True
+        assert client_id_filter.might_contain("unknown") is False
+
+    def test_skips_priming_after_concurrent_invalidation(
+        self, monkeypatch, make_client
+    ):
+        make_client()
+        original_prime = client_registry.prime
+
+        def racing_prime(entries, generation=None):
+            client_registry.invalidate("someone-else")
+            return original_prime(entries, generation)
+
+        monkeypatch.setattr(client_registry, "prime", racing_prime)
+        warm_up()
+        assert len(client_registry) == 0
+
+
+class TestStartWarmUp:
+    def test_waits_for_fast_warm_up(self, monkeypatch):
+        monkeypatch.setattr(warmup, "warm_up", lambda: (3, 0.01))
+        state = WarmupState()
+        start_warm_up(budget=5, state=state).join(5)
+        assert state.as_dict() == {"status": "done", "entries": 3, "duration": 0.01}
+
+    def test_does_not_wait_past_budget(self, monkeypatch):
+        release = threading.Event()
+
+        def slow_warm_up():
+            release.wait(5)
+            return 1, 5.0
+
+        monkeypatch.setattr(warmup, "warm_up", slow_warm_up)
+        state = WarmupState()
+        thread = start_warm_up(budget=0.01, state=state)
+        assert state.status == WarmupState.RUNNING
+        release.set()
+        thread.join(5)
+        assert state.status == WarmupState.DONE
+
+    def test_failure_is_recorded(self, monkeypatch):
+        def broken():
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(warmup, "warm_up", broken)
+        state = WarmupState()
+        start_warm_up(budget=5, state=state).join(5)
+        assert state.status == WarmupState.FAILED